@@ -15,7 +15,8 @@ from django.http import HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 
 from core.models import Projet, UserProjet
-from geo.models import Admin2, Admin4, Admin5, Admin7, Admin8, CellulesGRDR
+from geo.annuaire import liste_niveau
+from geo.models import Admin4, Admin5, Admin7, Admin8, CellulesGRDR
 
 
 def landing_page(request: HttpRequest) -> HttpResponse:
@@ -67,11 +68,11 @@ def liste_projets(request: HttpRequest) -> HttpResponse:
     user_projets = UserProjet.objects.filter(
         user=request.user,
         actif=True
-    ).select_related('projet').order_by('-projet__date_creation')
+    ).select_related('projet').for_listing().order_by('-projet__date_creation')
 
     # Si l'utilisateur est superuser, afficher tous les projets
     if request.user.is_superuser:
-        projets = Projet.objects.filter(actif=True).order_by('-date_creation')
+        projets = Projet.objects.filter(actif=True).light().order_by('-date_creation')
         user_projets_data = [{'projet': p, 'role': 'Administrateur système'} for p in projets]
     else:
         user_projets_data = [
@@ -170,13 +171,13 @@ def creer_projet(request: HttpRequest) -> HttpResponse:
         # Rediriger vers le wizard de configuration
         return redirect('creer_thematiques')
 
-    # GET : afficher le formulaire avec les pays et cellules GRDR
-    pays_list = Admin2.objects.all().order_by('name')
+    # GET : afficher le formulaire avec les pays (annuaire en mémoire, sans géométrie)
+    pays_list = liste_niveau('admin2')
 
     # Gérer le cas où la table cellules_grdr n'existe pas encore
     try:
         # IMPORTANT : Forcer l'évaluation de la requête avec list()
-        cellules_grdr = list(CellulesGRDR.objects.all().order_by('nom'))
+        cellules_grdr = list(CellulesGRDR.objects.light().order_by('nom'))
     except Exception as e:
         # Si la table n'existe pas, on continue avec une liste vide
         cellules_grdr = []
@@ -4,6 +4,23 @@ Administration des modèles core (Users, Projets)
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from .models import User, Projet, UserProjet
+from .querysets import champs_lourds
+
+
+class ListeLegereMixin:
+    """
+    Liste d'administration sans colonnes lourdes (voir core.querysets)
+    Géométries, JSON et textes longs sont différés sur la page de liste,
+    sauf ceux affichés par list_display. Les formulaires lisent tout.
+    """
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        vue = request.resolver_match.url_name if request.resolver_match else ''
+        if vue and vue.endswith('_changelist'):
+            garder = tuple(nom for nom in self.get_list_display(request) if isinstance(nom, str))
+            queryset = queryset.defer(*champs_lourds(queryset.model, garder))
+        return queryset
 
 
 @admin.register(User)
@@ -34,7 +51,7 @@ class UserProjetInline(admin.TabularInline):
 
 
 @admin.register(Projet)
-class ProjetAdmin(admin.ModelAdmin):
+class ProjetAdmin(ListeLegereMixin, admin.ModelAdmin):
     """Administration des projets"""
     list_display = ('code_projet', 'libelle', 'date_debut', 'date_fin', 'statut', 'actif')
     list_filter = ('statut', 'actif', 'date_debut')
@@ -0,0 +1,246 @@
+"""
+Cache des résultats calculés, cloisonné par projet.
+
+Chaque projet possède un numéro de version (VersionProjet, en base). Les
+clés des résultats incluent ce numéro : incrémenter la version (voir
+core.signals) rend d'un coup obsolètes toutes les entrées du projet, sans
+avoir à les énumérer.
+
+La version est en base et non dans le cache : le backend par défaut
+(local-mémoire) est propre à chaque processus, et une invalidation faite
+par un worker ou une commande de gestion doit être vue par tous. Les
+résultats eux-mêmes peuvent rester dans un cache local : un processus
+qui lit une nouvelle version ne retrouve plus ses anciennes clés.
+
+La version et la date de dernière modification servent aussi de
+validateurs HTTP (ETag / Last-Modified) aux API du projet : une requête
+conditionnelle est résolue par une lecture de clé primaire, sans lire les
+tables de données.
+"""
+from __future__ import annotations
+
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Iterator
+
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db.models import F
+from django.http import HttpRequest
+from django.utils import timezone
+
+from .models import Projet, VersionProjet
+
+PREFIXE = 'projet'
+CLE_HITS = 'projet_cache:hits'
+CLE_MISSES = 'projet_cache:misses'
+
+_suspendue: ContextVar[bool] = ContextVar('invalidation_suspendue', default=False)
+
+
+def etat_projet(projet_id: int) -> tuple[int, datetime | None]:
+    """
+    Version et date de dernière modification des données d'un projet.
+
+    Args:
+        projet_id: ID du projet
+
+    Returns:
+        (version, date de modification) ; (0, None) si le projet n'existe pas
+    """
+    etat = VersionProjet.objects.filter(projet_id=projet_id).values_list(
+        'version', 'date_modification'
+    ).first()
+    if etat is None and Projet.objects.filter(pk=projet_id).exists():
+        ligne, _ = VersionProjet.objects.get_or_create(projet_id=projet_id)
+        etat = (ligne.version, ligne.date_modification)
+    return etat or (0, None)
+
+
+def version_projet(projet_id: int) -> int:
+    """
+    Version courante des données d'un projet.
+
+    Args:
+        projet_id: ID du projet
+
+    Returns:
+        Numéro de version
+    """
+    return etat_projet(projet_id)[0]
+
+
+def invalider_projet(projet_id: int) -> None:
+    """
+    Rendre obsolètes toutes les entrées en cache d'un projet.
+
+    Args:
+        projet_id: ID du projet
+    """
+    maintenant = timezone.now()
+    lignes = VersionProjet.objects.filter(projet_id=projet_id)
+    if lignes.update(version=F('version') + 1, date_modification=maintenant):
+        return
+    if Projet.objects.filter(pk=projet_id).exists():
+        _, cree = VersionProjet.objects.get_or_create(
+            projet_id=projet_id, defaults={'version': 1, 'date_modification': maintenant}
+        )
+        if not cree:
+            # Ligne créée entre-temps par une lecture concurrente
+            lignes.update(version=F('version') + 1, date_modification=maintenant)
+
+
+@contextmanager
+def invalidation_suspendue() -> Iterator[None]:
+    """
+    Suspend l'invalidation par signaux (core.signals) pendant une écriture
+    en masse.
+
+    L'appelant doit ensuite appeler invalider_projet pour chaque projet
+    concerné.
+    """
+    jeton = _suspendue.set(True)
+    try:
+        yield
+    finally:
+        _suspendue.reset(jeton)
+
+
+def invalidation_active() -> bool:
+    """Faux si l'invalidation par signaux est suspendue."""
+    return not _suspendue.get()
+
+
+def date_modification_projet(projet_id: int) -> datetime | None:
+    """
+    Date de la dernière modification connue des données d'un projet.
+
+    Args:
+        projet_id: ID du projet
+
+    Returns:
+        Date (celle de la création de la version si aucune modification
+        n'a été enregistrée depuis), None si le projet n'existe pas
+    """
+    return etat_projet(projet_id)[1]
+
+
+def cle_projet(projet_id: int, nom: str, *params: Any) -> str:
+    """
+    Clé de cache d'un résultat, incluant la version du projet.
+
+    Args:
+        projet_id: ID du projet
+        nom: Nom du résultat (ex: 'kpis', 'geojson:communes')
+        *params: Paramètres distinguant les variantes (filtres...)
+
+    Returns:
+        Clé de cache
+    """
+    cle = f"{PREFIXE}:{projet_id}:v{version_projet(projet_id)}:{nom}"
+    if params:
+        empreinte = hashlib.md5(repr(params).encode(), usedforsecurity=False).hexdigest()
+        cle = f"{cle}:{empreinte}"
+    return cle
+
+
+def _compter(cle: str) -> None:
+    # Compteurs indicatifs, propres au processus avec un cache local
+    cache.add(cle, 0)
+    try:
+        cache.incr(cle)
+    except ValueError:
+        pass
+
+
+def cache_projet(projet_id: int, nom: str, calcul: Callable[[], Any], *params: Any,
+                 timeout: Any = DEFAULT_TIMEOUT) -> Any:
+    """
+    Retourne un résultat en cache ou le calcule et le stocke.
+
+    Args:
+        projet_id: ID du projet
+        nom: Nom du résultat
+        calcul: Fonction sans argument produisant le résultat
+        *params: Paramètres distinguant les variantes
+        timeout: Durée de vie en secondes (défaut du backend si omis)
+
+    Returns:
+        Résultat (depuis le cache ou fraîchement calculé)
+    """
+    cle = cle_projet(projet_id, nom, *params)
+    resultat = cache.get(cle)
+    if resultat is not None:
+        _compter(CLE_HITS)
+        return resultat
+
+    _compter(CLE_MISSES)
+    resultat = calcul()
+    cache.set(cle, resultat, timeout=timeout)
+    return resultat
+
+
+def statistiques_cache() -> dict[str, Any]:
+    """
+    Compteurs de succès/échecs du cache projet.
+
+    Returns:
+        Dictionnaire avec hits, misses et taux de succès (en %)
+    """
+    hits = cache.get(CLE_HITS, 0)
+    misses = cache.get(CLE_MISSES, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'taux_succes': round(hits / total * 100, 1) if total else 0,
+    }
+
+
+def reinitialiser_statistiques() -> None:
+    """Remettre à zéro les compteurs de succès/échecs."""
+    cache.delete_many([CLE_HITS, CLE_MISSES])
+
+
+def _etat_requete(request: HttpRequest) -> tuple[int, int, datetime | None] | None:
+    """État du projet actif (id, version, date), lu une fois par requête"""
+    if not hasattr(request, '_etat_projet'):
+        projet = request.projet
+        request._etat_projet = (projet.id, *etat_projet(projet.id)) if projet else None
+    return request._etat_projet
+
+
+def etag_projet(request: HttpRequest, *args: Any, **kwargs: Any) -> str | None:
+    """
+    ETag fort des réponses dépendant du projet actif.
+
+    À utiliser avec django.views.decorators.http.condition. Dérivé de la
+    version en base : identique pour tous les workers.
+
+    Args:
+        request: Requête HTTP (projet actif : request.projet, voir
+            core.middleware)
+
+    Returns:
+        ETag (projet et version), None sans projet accessible
+    """
+    etat = _etat_requete(request)
+    if etat is None:
+        return None
+    return f"p{etat[0]}-v{etat[1]}"
+
+
+def derniere_modification(request: HttpRequest, *args: Any, **kwargs: Any) -> datetime | None:
+    """
+    Last-Modified des réponses dépendant du projet actif.
+
+    Args:
+        request: Requête HTTP (projet actif : request.projet)
+
+    Returns:
+        Date de dernière modification, None sans projet accessible
+    """
+    etat = _etat_requete(request)
+    return etat[2] if etat else None
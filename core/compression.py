@@ -0,0 +1,128 @@
+"""
+Réponses précompressées servies selon Accept-Encoding.
+
+Les documents volumineux mis en cache (couches GeoJSON, tuiles, document
+d'amorçage de la carte) sont stockés avec leurs variantes gzip et Brotli,
+calculées une seule fois au remplissage du cache. Chaque requête choisit
+la variante acceptée par le client : aucune compression n'a lieu pendant
+la réponse. Les entrées suivent la version du projet (core.cache) et ne
+sont donc régénérées qu'après une modification des données.
+
+Brotli est optionnel (paquet brotli) : sans lui, seules les variantes gzip
+et non compressée sont produites.
+"""
+from __future__ import annotations
+
+import gzip
+from typing import Any, Callable
+
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers, quote_etag
+
+from .cache import cache_projet
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Encodages par ordre de préférence du serveur
+ENCODAGES = ('br', 'gzip')
+
+# En dessous de cette taille, la compression ne vaut pas l'en-tête
+TAILLE_MIN = 512
+
+
+def compresser(contenu: bytes) -> dict[str, bytes]:
+    """
+    Variantes d'un contenu : non compressée, gzip et (si disponible) Brotli.
+
+    Les niveaux de compression maximaux sont utilisés : le coût n'est payé
+    qu'une fois par version des données.
+
+    Args:
+        contenu: Contenu à servir
+
+    Returns:
+        Dictionnaire {encodage: contenu} ('identity' toujours présent)
+    """
+    variantes = {'identity': contenu}
+    if len(contenu) < TAILLE_MIN:
+        return variantes
+    variantes['gzip'] = gzip.compress(contenu, compresslevel=9, mtime=0)
+    if brotli is not None:
+        variantes['br'] = brotli.compress(contenu, quality=11)
+    return variantes
+
+
+def encodages_acceptes(request: HttpRequest) -> set[str]:
+    """
+    Encodages acceptés par le client (en-tête Accept-Encoding, q=0 exclus).
+
+    Args:
+        request: Requête HTTP
+
+    Returns:
+        Ensemble des encodages acceptés
+    """
+    acceptes = set()
+    for element in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        nom, _, parametres = element.strip().partition(';')
+        parametres = parametres.replace(' ', '')
+        if nom and parametres not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            acceptes.add(nom.lower())
+    return acceptes
+
+
+def reponse_compressee(request: HttpRequest, variantes: dict[str, bytes],
+                       content_type: str = 'application/json', etag: str | None = None) -> HttpResponse:
+    """
+    Réponse avec la meilleure variante acceptée par le client.
+
+    Les variantes d'un même contenu diffèrent octet par octet : une variante
+    compressée reçoit un ETag faible (comme GZipMiddleware), qui reste
+    reconnu par la comparaison faible de If-None-Match (condition).
+
+    Args:
+        request: Requête HTTP
+        variantes: Résultat de compresser
+        content_type: Type MIME du contenu
+        etag: ETag fort du contenu (ex: etag_projet, guillemets ajoutés au
+            besoin), rendu faible si compressé
+
+    Returns:
+        HttpResponse (Content-Encoding renseigné si compressée)
+    """
+    acceptes = encodages_acceptes(request)
+    encodage = next((e for e in ENCODAGES if e in variantes and e in acceptes), 'identity')
+
+    response = HttpResponse(variantes[encodage], content_type=content_type)
+    if etag:
+        # Même forme que condition() (guillemets), sans quoi If-None-Match ne correspond jamais
+        etag = quote_etag(etag)
+    if encodage != 'identity':
+        response['Content-Encoding'] = encodage
+        if etag and not etag.startswith('W/'):
+            etag = f'W/{etag}'
+    if etag:
+        response['ETag'] = etag
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def cache_compresse(projet_id: int, nom: str, calcul: Callable[[], bytes], *params: Any,
+                    **kwargs: Any) -> dict[str, bytes]:
+    """
+    Variantes compressées d'un résultat, en cache projet.
+
+    Args:
+        projet_id: ID du projet
+        nom: Nom du résultat
+        calcul: Fonction sans argument produisant le contenu (bytes)
+        *params: Paramètres distinguant les variantes
+        **kwargs: Options de cache_projet (timeout)
+
+    Returns:
+        Dictionnaire {encodage: contenu}
+    """
+    return cache_projet(projet_id, f'{nom}:compresse', lambda: compresser(calcul()), *params, **kwargs)
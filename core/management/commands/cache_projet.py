@@ -0,0 +1,35 @@
+"""
+Consultation et invalidation du cache projet
+
+Usage:
+    python manage.py cache_projet
+    python manage.py cache_projet --invalider 3
+    python manage.py cache_projet --reinitialiser
+"""
+from django.core.management.base import BaseCommand
+
+from core.cache import invalider_projet, reinitialiser_statistiques, statistiques_cache
+
+
+class Command(BaseCommand):
+    help = "Affiche les compteurs du cache projet, ou invalide le cache d'un projet"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--invalider', type=int, metavar='PROJET_ID',
+                            help="Invalider toutes les entrées d'un projet")
+        parser.add_argument('--reinitialiser', action='store_true',
+                            help="Remettre à zéro les compteurs")
+
+    def handle(self, *args, **options):
+        if options['invalider']:
+            invalider_projet(options['invalider'])
+            self.stdout.write(self.style.SUCCESS(f"Cache du projet {options['invalider']} invalidé."))
+
+        stats = statistiques_cache()
+        self.stdout.write(
+            f"Succès : {stats['hits']} | Échecs : {stats['misses']} | Taux de succès : {stats['taux_succes']}%"
+        )
+
+        if options['reinitialiser']:
+            reinitialiser_statistiques()
+            self.stdout.write(self.style.SUCCESS("Compteurs remis à zéro."))
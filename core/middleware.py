@@ -0,0 +1,111 @@
+"""
+Contexte projet de la requête.
+
+Le projet actif (projet_id en session) et le rôle de l'utilisateur sur ce
+projet sont résolus une fois par requête et exposés sur request.projet et
+request.projet_role. Le couple est gardé quelques secondes dans le cache
+par utilisateur et par projet : une navigation ordinaire ne lit ni Projet
+ni UserProjet. Les entrées sont supprimées dès qu'un UserProjet ou le
+Projet change (core.signals).
+
+Avec le cache par défaut (local-mémoire, propre à chaque processus), la
+suppression n'atteint que le processus qui a traité l'écriture : un rôle
+retiré reste servi par les autres workers pendant au plus DUREE_CONTEXTE
+secondes. Pour une révocation immédiate, configurer un cache partagé
+(CACHE_BACKEND Redis ou Memcached, voir settings).
+"""
+from __future__ import annotations
+
+from typing import Callable
+
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+
+from .models import Projet, User, UserProjet
+
+# Durée de vie du contexte en cache (secondes)
+DUREE_CONTEXTE = 60
+
+# Rôle exposé aux superutilisateurs sans affectation au projet
+ROLE_SUPERUSER = 'SUPERUSER'
+
+# Rôles autorisés à modifier les données du projet actif
+ROLES_ECRITURE = ('ADMIN_PROJET', 'CONTRIBUTEUR', ROLE_SUPERUSER)
+
+
+def _cle_contexte(user_id: int, projet_id: int) -> str:
+    return f"contexte_projet:{user_id}:{projet_id}"
+
+
+def invalider_contexte(projet_id: int, user_ids: list[int] | None = None) -> None:
+    """
+    Supprimer le contexte en cache d'un projet.
+
+    Args:
+        projet_id: ID du projet
+        user_ids: Utilisateurs concernés (par défaut : affectés au projet et superutilisateurs)
+    """
+    if user_ids is None:
+        user_ids = list(UserProjet.objects.filter(projet_id=projet_id).values_list('user_id', flat=True))
+        user_ids += list(User.objects.filter(is_superuser=True).values_list('id', flat=True))
+    cache.delete_many([_cle_contexte(user_id, projet_id) for user_id in user_ids])
+
+
+def resoudre_contexte(user, projet_id: int) -> tuple[Projet | None, str | None]:
+    """
+    Projet actif et rôle de l'utilisateur, depuis le cache ou la base.
+
+    Args:
+        user: Utilisateur authentifié
+        projet_id: ID du projet en session
+
+    Returns:
+        (projet, rôle) ; (None, None) si le projet est inactif, inexistant
+        ou inaccessible à l'utilisateur
+    """
+    cle = _cle_contexte(user.pk, projet_id)
+    contexte = cache.get(cle)
+    if contexte is not None:
+        return contexte
+
+    projet = Projet.objects.light().filter(pk=projet_id, actif=True).first()
+    role = None
+    if projet is not None:
+        role = UserProjet.objects.filter(
+            user=user, projet=projet, actif=True
+        ).values_list('role', flat=True).first()
+        if role is None and user.is_superuser:
+            role = ROLE_SUPERUSER
+        if role is None:
+            projet = None
+
+    contexte = (projet, role)
+    cache.set(cle, contexte, timeout=DUREE_CONTEXTE)
+    return contexte
+
+
+def ecriture_autorisee(request: HttpRequest) -> bool:
+    """
+    Vrai si l'utilisateur peut modifier les données du projet actif.
+
+    Args:
+        request: Requête passée par ProjetMiddleware
+
+    Returns:
+        False sans projet accessible ou en lecture seule (LECTEUR)
+    """
+    return request.projet is not None and request.projet_role in ROLES_ECRITURE
+
+
+class ProjetMiddleware:
+    """Expose request.projet et request.projet_role (None sans projet accessible)"""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        request.projet, request.projet_role = None, None
+        projet_id = request.session.get('projet_id')
+        if projet_id and request.user.is_authenticated:
+            request.projet, request.projet_role = resoudre_contexte(request.user, projet_id)
+        return self.get_response(request)
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_cleanup_old_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionProjet',
+            fields=[
+                ('projet', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='version_donnees', serialize=False, to='core.projet')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('date_modification', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': "Version des données d'un projet",
+                'verbose_name_plural': 'Versions des données des projets',
+            },
+        ),
+    ]
@@ -5,6 +5,8 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.utils import timezone
 
+from .querysets import ListeQuerySet
+
 
 class User(AbstractUser):
     """
@@ -92,6 +94,8 @@ class Projet(models.Model):
     # Utilisateurs avec accès à ce projet (relation Many-to-Many via UserProjet)
     users = models.ManyToManyField(User, through='UserProjet', related_name='projets')
 
+    objects = ListeQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Projet"
         verbose_name_plural = "Projets"
@@ -160,6 +164,8 @@ class UserProjet(models.Model):
     actif = models.BooleanField(default=True,
                                help_text="Permet de désactiver l'accès sans supprimer")
 
+    objects = ListeQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Utilisateur-Projet"
         verbose_name_plural = "Utilisateurs-Projets"
@@ -168,3 +174,22 @@ class UserProjet(models.Model):
 
     def __str__(self):
         return f"{self.user.username} - {self.projet.code_projet} ({self.get_role_display()})"
+
+
+class VersionProjet(models.Model):
+    """
+    Version des données d'un projet (voir core.cache)
+    Incrémentée à chaque écriture ; stockée en base pour être partagée
+    par tous les processus (workers, commandes de gestion)
+    """
+    projet = models.OneToOneField(Projet, on_delete=models.CASCADE, primary_key=True,
+                                  related_name='version_donnees')
+    version = models.PositiveBigIntegerField(default=0)
+    date_modification = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Version des données d'un projet"
+        verbose_name_plural = "Versions des données des projets"
+
+    def __str__(self):
+        return f"Projet {self.projet_id} - v{self.version}"
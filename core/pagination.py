@@ -0,0 +1,107 @@
+"""
+Pagination par curseur (keyset).
+
+Une pagination OFFSET relit et jette toutes les lignes des pages
+précédentes : la page 200 coûte 200 pages. Ici, chaque page reprend
+strictement après la dernière ligne servie, repérée par ses valeurs de tri
+(date_creation, id) : la requête descend directement dans l'index composite
+correspondant, quelle que soit la profondeur.
+
+Le curseur est opaque pour le client (base64 de la date et de l'id) ; un
+curseur altéré lève ValueError.
+"""
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+from django.db.models import QuerySet
+
+# Taille de page par défaut et maximale
+TAILLE_PAGE = 50
+TAILLE_MAX = 200
+
+
+def encoder_curseur(date: datetime, id: int) -> str:
+    """
+    Curseur désignant une ligne (date_creation, id).
+
+    Args:
+        date: Date de création de la ligne
+        id: Clé primaire de la ligne
+
+    Returns:
+        Chaîne base64 sans remplissage, utilisable dans une URL
+    """
+    brut = json.dumps([date.isoformat(), id]).encode()
+    return base64.urlsafe_b64encode(brut).decode().rstrip('=')
+
+
+def decoder_curseur(curseur: str) -> tuple[datetime, int]:
+    """
+    Valeurs de tri d'un curseur.
+
+    Args:
+        curseur: Résultat de encoder_curseur
+
+    Returns:
+        (date_creation, id)
+
+    Raises:
+        ValueError: Curseur invalide
+    """
+    try:
+        brut = base64.urlsafe_b64decode(curseur + '=' * (-len(curseur) % 4))
+        date, id = json.loads(brut)
+        return datetime.fromisoformat(date), int(id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Curseur invalide") from e
+
+
+def taille_page(valeur: str | None) -> int:
+    """
+    Taille de page demandée, bornée à [1, TAILLE_MAX].
+
+    Args:
+        valeur: Paramètre brut (None : TAILLE_PAGE)
+
+    Returns:
+        Nombre de lignes par page
+
+    Raises:
+        ValueError: Valeur non entière
+    """
+    if not valeur:
+        return TAILLE_PAGE
+    return max(1, min(int(valeur), TAILLE_MAX))
+
+
+def page_keyset(queryset: QuerySet, curseur: str | None = None,
+                taille: int = TAILLE_PAGE) -> tuple[list[Any], str | None]:
+    """
+    Page d'un QuerySet trié par (date_creation, id) décroissants.
+
+    Args:
+        queryset: QuerySet filtré (son tri est remplacé)
+        curseur: Curseur de la dernière ligne de la page précédente
+        taille: Nombre de lignes de la page
+
+    Returns:
+        (lignes, curseur de la page suivante ou None en fin de liste)
+
+    Raises:
+        ValueError: Curseur invalide
+    """
+    queryset = queryset.order_by('-date_creation', '-id')
+    if curseur:
+        date, id = decoder_curseur(curseur)
+        # date_creation <= date : borne de parcours de l'index ; égalités départagées par id
+        queryset = queryset.filter(date_creation__lte=date).exclude(date_creation=date, id__gte=id)
+
+    lignes = list(queryset[:taille + 1])
+    if len(lignes) <= taille:
+        return lignes, None
+    lignes = lignes[:taille]
+    return lignes, encoder_curseur(lignes[-1].date_creation, lignes[-1].id)
@@ -0,0 +1,79 @@
+"""
+QuerySets allégés pour les pages de liste.
+
+Les pages de liste n'affichent que quelques colonnes courtes, mais un
+QuerySet ordinaire lit toute la ligne : multipolygones des contours,
+points, JSON de caractéristiques et textes longs (descriptions, notes
+confidentielles) sont transférés et décodés pour rien. Les modèles qui
+portent de telles colonnes utilisent ListeQuerySet comme manager :
+
+    Intervention.objects.filter(projet=projet).light()
+    Intervention.objects.select_related('commune').for_listing('description')
+
+Les champs différés restent accessibles (une requête par objet au premier
+accès) : une page qui en affiche un doit le nommer dans garder.
+"""
+from __future__ import annotations
+
+from django.contrib.gis.db.models import GeometryField
+from django.db import models
+
+# Types de colonnes différées par défaut
+TYPES_LOURDS = (GeometryField, models.JSONField, models.TextField, models.BinaryField)
+
+
+def champs_lourds(modele: type[models.Model], garder: tuple[str, ...] = (), prefixe: str = '') -> list[str]:
+    """
+    Champs lourds d'un modèle (géométrie, JSON, texte long, binaire).
+
+    Args:
+        modele: Classe du modèle
+        garder: Noms de champs à ne pas différer (chemins complets)
+        prefixe: Chemin de la relation (ex: 'commune__')
+
+    Returns:
+        Noms à passer à defer()
+    """
+    return [
+        f'{prefixe}{champ.name}'
+        for champ in modele._meta.concrete_fields
+        if isinstance(champ, TYPES_LOURDS) and not champ.primary_key
+        and f'{prefixe}{champ.name}' not in garder
+    ]
+
+
+def _relations(modele: type[models.Model], arbre: dict, prefixe: str = ''):
+    """Parcourt l'arbre select_related : (préfixe, modèle lié)."""
+    for nom, sous_arbre in arbre.items():
+        lie = modele._meta.get_field(nom).related_model
+        yield f'{prefixe}{nom}__', lie
+        yield from _relations(lie, sous_arbre, f'{prefixe}{nom}__')
+
+
+class ListeQuerySet(models.QuerySet):
+    """QuerySet avec variantes allégées pour les listes"""
+
+    def light(self, *garder: str) -> ListeQuerySet:
+        """
+        Différer les colonnes lourdes du modèle.
+
+        Args:
+            *garder: Champs lourds affichés malgré tout
+        """
+        return self.defer(*champs_lourds(self.model, garder))
+
+    def for_listing(self, *garder: str) -> ListeQuerySet:
+        """
+        light() étendu aux relations déjà demandées par select_related().
+
+        À appeler après select_related() ; select_related() sans argument
+        (toutes les relations) n'est pas parcouru.
+
+        Args:
+            *garder: Champs lourds affichés malgré tout (ex: 'commune__geom')
+        """
+        champs = champs_lourds(self.model, garder)
+        if isinstance(self.query.select_related, dict):
+            for prefixe, modele in _relations(self.model, self.query.select_related):
+                champs += champs_lourds(modele, garder, prefixe)
+        return self.defer(*champs)
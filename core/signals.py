@@ -0,0 +1,97 @@
+"""
+Signaux de l'application core
+
+Invalidation du cache projet (core.cache) à chaque écriture sur les données
+affichées par les tableaux de bord et la cartographie. Les émetteurs sont
+référencés par leur label pour ne pas faire dépendre core des autres apps.
+Les écritures en masse suspendent ces récepteurs (invalidation_suspendue)
+et invalident leurs projets une seule fois.
+
+Invalidation du contexte projet de la requête (core.middleware) à chaque
+écriture sur Projet ou UserProjet.
+"""
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .cache import invalidation_active, invalider_projet
+from .middleware import invalider_contexte
+from .models import Projet, UserProjet
+
+# Modèles portant directement un champ projet
+MODELES_PROJET = [
+    'suivi.Thematique', 'suivi.Indicateur', 'suivi.Intervention',
+    'geo.Infrastructure', 'geo.Acteur', 'referentiels.ProjetCommune',
+]
+
+# Modèles rattachés au projet via leur indicateur
+MODELES_INDICATEUR = ['suivi.CibleIndicateur', 'suivi.ValeurIndicateur']
+
+# Référentiel partagé : invalide tous les projets de la commune
+MODELES_COMMUNE = ['referentiels.Commune', 'referentiels.CommuneGeom']
+
+
+def _invalider_apres_commit(projet_id):
+    """Incrémenter la version une fois la transaction validée."""
+    if projet_id:
+        transaction.on_commit(lambda: invalider_projet(projet_id))
+
+
+def invalider_depuis_projet(sender, instance, raw=False, **kwargs):
+    """Invalider le cache du projet de l'instance"""
+    if not raw and invalidation_active():
+        _invalider_apres_commit(instance.projet_id)
+
+
+def invalider_depuis_indicateur(sender, instance, raw=False, **kwargs):
+    """Invalider le cache du projet de l'indicateur de l'instance"""
+    if raw or not invalidation_active():
+        return
+    Indicateur = apps.get_model('suivi', 'Indicateur')
+    projet_id = Indicateur.objects.filter(
+        pk=instance.indicateur_id
+    ).values_list('projet_id', flat=True).first()
+    _invalider_apres_commit(projet_id)
+
+
+def invalider_depuis_commune(sender, instance, raw=False, **kwargs):
+    """Invalider le cache de chaque projet couvrant la commune de l'instance"""
+    if raw or not invalidation_active():
+        return
+    ProjetCommune = apps.get_model('referentiels', 'ProjetCommune')
+    commune_id = instance.pk if sender._meta.model_name == 'commune' else instance.commune_id
+    for projet_id in ProjetCommune.objects.filter(
+        commune_id=commune_id
+    ).values_list('projet_id', flat=True):
+        _invalider_apres_commit(projet_id)
+
+
+for modele in MODELES_PROJET:
+    post_save.connect(invalider_depuis_projet, sender=modele, dispatch_uid=f'cache_projet_{modele}')
+    post_delete.connect(invalider_depuis_projet, sender=modele, dispatch_uid=f'cache_projet_{modele}')
+
+for modele in MODELES_INDICATEUR:
+    post_save.connect(invalider_depuis_indicateur, sender=modele, dispatch_uid=f'cache_projet_{modele}')
+    post_delete.connect(invalider_depuis_indicateur, sender=modele, dispatch_uid=f'cache_projet_{modele}')
+
+for modele in MODELES_COMMUNE:
+    post_save.connect(invalider_depuis_commune, sender=modele, dispatch_uid=f'cache_projet_{modele}')
+    post_delete.connect(invalider_depuis_commune, sender=modele, dispatch_uid=f'cache_projet_{modele}')
+
+
+def invalider_contexte_affectation(sender, instance, raw=False, **kwargs):
+    """Rôle modifié : supprimer le contexte en cache de l'utilisateur"""
+    if not raw:
+        invalider_contexte(instance.projet_id, [instance.user_id])
+
+
+def invalider_contexte_projet(sender, instance, raw=False, **kwargs):
+    """Projet modifié : supprimer le contexte en cache de ses utilisateurs"""
+    if not raw:
+        invalider_contexte(instance.pk)
+
+
+post_save.connect(invalider_contexte_affectation, sender=UserProjet, dispatch_uid='contexte_userprojet')
+post_delete.connect(invalider_contexte_affectation, sender=UserProjet, dispatch_uid='contexte_userprojet')
+post_save.connect(invalider_contexte_projet, sender=Projet, dispatch_uid='contexte_projet')
+post_delete.connect(invalider_contexte_projet, sender=Projet, dispatch_uid='contexte_projet')
@@ -0,0 +1,124 @@
+"""
+Réponses JSON et GeoJSON diffusées au fil de l'eau.
+
+Les listes volumineuses ne sont jamais construites en mémoire : les
+éléments sont lus par lots (curseur serveur PostgreSQL), sérialisés un
+par un et envoyés par StreamingHttpResponse dans des blocs de taille
+bornée. La mémoire d'un worker reste de l'ordre
+d'un lot, quelle que soit la taille de la réponse.
+
+Les éléments de la liste peuvent être des objets Python (sérialisés avec
+DjangoJSONEncoder) ou des fragments JSON déjà sérialisés (str), par
+exemple produits par PostgreSQL avec json_build_object.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.http import StreamingHttpResponse
+
+# Lignes lues par aller-retour avec la base
+TAILLE_LOT = 2000
+
+# Taille (octets) à partir de laquelle un bloc est envoyé au client
+TAILLE_BLOC = 64 * 1024
+
+
+def _json(valeur: Any) -> str:
+    """Fragment JSON d'une valeur (inchangée si déjà sérialisée)."""
+    if isinstance(valeur, str):
+        return valeur
+    return json.dumps(valeur, cls=DjangoJSONEncoder)
+
+
+def lignes_sql(sql: str, params: Sequence[Any] = (), chunk_size: int = TAILLE_LOT) -> Iterator[tuple]:
+    """
+    Parcourt le résultat d'une requête SQL par lots (curseur serveur).
+
+    Args:
+        sql: Requête SQL
+        params: Paramètres de la requête
+        chunk_size: Lignes lues par lot
+
+    Returns:
+        Itérateur des lignes (tuples)
+    """
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(sql, params)
+        while lignes := cursor.fetchmany(chunk_size):
+            yield from lignes
+
+
+def iterer_json(elements: Iterable[Any], cle: str = 'features',
+                entete: dict[str, Any] | None = None,
+                pied: Callable[[], dict[str, Any]] | None = None) -> Iterator[bytes]:
+    """
+    Blocs d'un objet JSON dont le membre cle est la liste des éléments.
+
+    Args:
+        elements: Éléments de la liste (objets ou fragments JSON)
+        cle: Nom du membre portant la liste
+        entete: Membres écrits avant la liste
+        pied: Fonction appelée après le dernier élément, retournant les
+            membres écrits après la liste (ex. curseur de page suivante)
+
+    Returns:
+        Itérateur de blocs encodés en UTF-8
+    """
+    bloc = ['{']
+    taille = 1
+    for nom, valeur in (entete or {}).items():
+        bloc.append(f'{json.dumps(nom)}: {json.dumps(valeur, cls=DjangoJSONEncoder)}, ')
+    bloc.append(f'{json.dumps(cle)}: [')
+
+    premier = True
+    for element in elements:
+        fragment = _json(element)
+        bloc.append(fragment if premier else ', ' + fragment)
+        taille += len(fragment)
+        premier = False
+        if taille >= TAILLE_BLOC:
+            yield ''.join(bloc).encode()
+            bloc, taille = [], 0
+
+    bloc.append(']')
+    for nom, valeur in (pied() if pied else {}).items():
+        bloc.append(f', {json.dumps(nom)}: {json.dumps(valeur, cls=DjangoJSONEncoder)}')
+    bloc.append('}')
+    yield ''.join(bloc).encode()
+
+
+def reponse_json_streaming(elements: Iterable[Any], cle: str, **kwargs: Any) -> StreamingHttpResponse:
+    """
+    Réponse JSON {cle: [...]} diffusée au fil de l'eau.
+
+    Args:
+        elements: Éléments de la liste (objets ou fragments JSON)
+        cle: Nom du membre portant la liste
+        **kwargs: entete et pied (voir iterer_json)
+
+    Returns:
+        StreamingHttpResponse application/json
+    """
+    return StreamingHttpResponse(iterer_json(elements, cle, **kwargs), content_type='application/json')
+
+
+def reponse_geojson_streaming(features: Iterable[Any],
+                              pied: Callable[[], dict[str, Any]] | None = None) -> StreamingHttpResponse:
+    """
+    FeatureCollection GeoJSON diffusée au fil de l'eau.
+
+    Args:
+        features: Features GeoJSON (dictionnaires ou fragments JSON)
+        pied: Membres écrits après la liste (voir iterer_json)
+
+    Returns:
+        StreamingHttpResponse application/json
+    """
+    return reponse_json_streaming(
+        features, 'features', entete={'type': 'FeatureCollection'}, pied=pied
+    )
+
@@ -1,10 +1,18 @@
 """
 Tests unitaires pour l'application core (multi-projets & utilisateurs)
 """
-from datetime import date, timedelta
-from django.test import TestCase
+import gzip
+import io
+import json
+from datetime import date, datetime, timedelta
+from django.test import RequestFactory, TestCase
 from django.contrib.auth import get_user_model
+from .compression import compresser, reponse_compressee
+from .middleware import ProjetMiddleware
 from .models import Projet, UserProjet
+from .pagination import TAILLE_MAX, TAILLE_PAGE, decoder_curseur, encoder_curseur, taille_page
+from .querysets import champs_lourds
+from .streaming import iterer_json, reponse_geojson_streaming, reponse_json_streaming
 
 User = get_user_model()
 
@@ -206,3 +214,343 @@ class ProjetManagerTest(TestCase):
         """Filtrer les projets actifs"""
         projets_actifs = Projet.objects.filter(actif=True)
         self.assertEqual(projets_actifs.count(), 2)
+
+
+class CacheProjetTest(TestCase):
+    """Tests pour le cache cloisonné par projet (core.cache)"""
+
+    def setUp(self):
+        """Vider le cache et créer un projet"""
+        from django.core.cache import cache
+        cache.clear()
+        self.projet = Projet.objects.create(
+            libelle='Projet Test',
+            bailleurs='Bailleur Test',
+            date_debut=date.today(),
+            date_fin=date.today() + timedelta(days=365)
+        )
+
+    def test_hit_et_miss(self):
+        """Le second appel est servi depuis le cache"""
+        from .cache import cache_projet, statistiques_cache
+
+        appels = []
+        calcul = lambda: appels.append(1) or {'total': 42}  # noqa: E731
+
+        self.assertEqual(cache_projet(self.projet.id, 'kpis', calcul), {'total': 42})
+        self.assertEqual(cache_projet(self.projet.id, 'kpis', calcul), {'total': 42})
+        self.assertEqual(len(appels), 1)
+        self.assertEqual(statistiques_cache()['hits'], 1)
+        self.assertEqual(statistiques_cache()['misses'], 1)
+
+    def test_parametres_distincts(self):
+        """Des paramètres différents donnent des entrées différentes"""
+        from .cache import cache_projet
+
+        self.assertEqual(cache_projet(self.projet.id, 'geojson', lambda: 'a', 'TERMINE'), 'a')
+        self.assertEqual(cache_projet(self.projet.id, 'geojson', lambda: 'b', 'PROGRAMME'), 'b')
+
+    def test_invalidation_par_signal(self):
+        """Une écriture sur ProjetCommune invalide le cache du projet"""
+        from referentiels.models import Commune, ProjetCommune
+        from .cache import cache_projet, version_projet
+
+        cache_projet(self.projet.id, 'stats', lambda: 'ancien')
+        version = version_projet(self.projet.id)
+
+        commune = Commune.objects.create(nom='Gathiary', code_commune='SN-KED-GAT')
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjetCommune.objects.create(projet=self.projet, commune=commune)
+
+        self.assertGreater(version_projet(self.projet.id), version)
+        self.assertEqual(cache_projet(self.projet.id, 'stats', lambda: 'nouveau'), 'nouveau')
+
+    def test_validateurs_http(self):
+        """ETag et Last-Modified suivent la version du projet"""
+        from django.test import RequestFactory
+        from .cache import derniere_modification, etag_projet, invalider_projet
+
+        request = RequestFactory().get('/dashboard/api/geojson/communes/')
+        request.projet = None
+        self.assertIsNone(etag_projet(request))
+
+        request = RequestFactory().get('/dashboard/api/geojson/communes/')
+        request.projet = self.projet
+        etag = etag_projet(request)
+        self.assertEqual(etag, etag_projet(request))
+        self.assertIsNotNone(derniere_modification(request))
+
+        invalider_projet(self.projet.id)
+        request = RequestFactory().get('/dashboard/api/geojson/communes/')
+        request.projet = self.projet
+        self.assertNotEqual(etag_projet(request), etag)
+
+    def test_version_partagee(self):
+        """La version est en base : vider le cache local ne la perd pas"""
+        from django.core.cache import cache
+        from .cache import invalider_projet, version_projet
+        from .models import VersionProjet
+
+        version = version_projet(self.projet.id)
+        invalider_projet(self.projet.id)
+        cache.clear()
+        self.assertEqual(version_projet(self.projet.id), version + 1)
+        self.assertEqual(VersionProjet.objects.get(projet=self.projet).version, version + 1)
+
+    def test_invalidation_projet_inexistant(self):
+        """Invalider un projet supprimé ne crée pas de version"""
+        from .cache import invalider_projet, version_projet
+        from .models import VersionProjet
+
+        invalider_projet(999999)
+        self.assertEqual(version_projet(999999), 0)
+        self.assertFalse(VersionProjet.objects.filter(projet_id=999999).exists())
+
+    def test_validateurs_apres_invalidation_externe(self):
+        """Une invalidation hors de ce processus (commande) change l'ETag servi"""
+        from django.core.cache import cache
+        from django.core.management import call_command
+        from django.test import Client
+
+        client = Client()
+        client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        session = client.session
+        session['projet_id'] = self.projet.id
+        session.save()
+        url = '/dashboard/api/geojson/communes/'
+
+        etag = client.get(url)['ETag']
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        call_command('cache_projet', invalider=self.projet.id, stdout=io.StringIO())
+        # Un autre worker n'a pas ce cache local : seule la base est commune
+        cache.clear()
+        reponse = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(reponse.status_code, 200)
+        self.assertNotEqual(reponse['ETag'], etag)
+
+    def test_invalidation_par_commune(self):
+        """Modifier une commune invalide les projets qui la couvrent"""
+        from referentiels.models import Commune, ProjetCommune
+        from .cache import version_projet
+
+        commune = Commune.objects.create(nom='Gathiary', code_commune='SN-KED-GAT')
+        ProjetCommune.objects.create(projet=self.projet, commune=commune)
+        version = version_projet(self.projet.id)
+
+        commune.nom = 'Gathiary Centre'
+        with self.captureOnCommitCallbacks(execute=True):
+            commune.save()
+
+        self.assertGreater(version_projet(self.projet.id), version)
+
+
+class StreamingJsonTest(TestCase):
+    """Tests des réponses JSON diffusées au fil de l'eau"""
+
+    def _contenu(self, reponse):
+        return json.loads(b''.join(reponse.streaming_content))
+
+    def test_elements_et_fragments(self):
+        """Objets Python et fragments déjà sérialisés sont combinés"""
+        reponse = reponse_json_streaming(
+            iter([{'id': 1, 'date': date(2025, 1, 2)}, '{"id": 2}']), 'communes'
+        )
+        self.assertEqual(reponse['Content-Type'], 'application/json')
+        self.assertEqual(
+            self._contenu(reponse),
+            {'communes': [{'id': 1, 'date': '2025-01-02'}, {'id': 2}]},
+        )
+
+    def test_feature_collection_vide_et_pied(self):
+        """Liste vide valide, membres de pied évalués en fin de flux"""
+        reponse = reponse_geojson_streaming(iter([]), lambda: {'next_after_id': None})
+        self.assertEqual(
+            self._contenu(reponse),
+            {'type': 'FeatureCollection', 'features': [], 'next_after_id': None},
+        )
+
+    def test_blocs_bornes(self):
+        """Les gros volumes sont découpés en plusieurs blocs"""
+        elements = ({'id': i, 'libelle': 'x' * 100} for i in range(5000))
+        blocs = list(iterer_json(elements, 'features'))
+        self.assertGreater(len(blocs), 1)
+        self.assertEqual(len(json.loads(b''.join(blocs))['features']), 5000)
+
+
+class CompressionTest(TestCase):
+    """Tests des réponses précompressées"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.contenu = json.dumps({'features': [{'id': i} for i in range(200)]}).encode()
+
+    def test_variantes(self):
+        """Les variantes compressées restituent le contenu"""
+        variantes = compresser(self.contenu)
+        self.assertEqual(variantes['identity'], self.contenu)
+        self.assertEqual(gzip.decompress(variantes['gzip']), self.contenu)
+        self.assertEqual(compresser(b'{}'), {'identity': b'{}'})
+
+    def test_negociation(self):
+        """La variante servie suit Accept-Encoding"""
+        variantes = compresser(self.contenu)
+
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        response = reponse_compressee(request, variantes)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.contenu)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+        response = reponse_compressee(request, variantes)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, self.contenu)
+
+    def test_etag_par_variante(self):
+        """Une variante compressée porte un ETag faible, la variante brute l'ETag fort"""
+        variantes = compresser(self.contenu)
+
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(reponse_compressee(request, variantes, etag='"p1-v2"')['ETag'], 'W/"p1-v2"')
+
+        request = self.factory.get('/')
+        self.assertEqual(reponse_compressee(request, variantes, etag='p1-v2')['ETag'], '"p1-v2"')
+
+    def test_etag_projet_revalide(self):
+        """L'ETag servi pour etag_projet est reconnu par If-None-Match (304)"""
+        from django.views.decorators.http import condition
+        from .cache import derniere_modification, etag_projet
+
+        projet = Projet.objects.create(
+            libelle='Projet Compression', bailleurs='Bailleur',
+            date_debut=date.today(), date_fin=date.today() + timedelta(days=365),
+        )
+        variantes = compresser(self.contenu)
+
+        @condition(etag_func=etag_projet, last_modified_func=derniere_modification)
+        def vue(request):
+            return reponse_compressee(request, variantes, etag=etag_projet(request))
+
+        for encodage in ('gzip', 'identity'):
+            request = self.factory.get('/', HTTP_ACCEPT_ENCODING=encodage)
+            request.projet = projet
+            etag = vue(request)['ETag']
+            self.assertRegex(etag, rf'^(W/)?"p{projet.id}-v\d+"$')
+            self.assertEqual(etag.startswith('W/'), encodage == 'gzip')
+
+            request = self.factory.get('/', HTTP_ACCEPT_ENCODING=encodage, HTTP_IF_NONE_MATCH=etag)
+            request.projet = projet
+            self.assertEqual(vue(request).status_code, 304)
+
+
+class ListeQuerySetTest(TestCase):
+    """Tests des QuerySets allégés pour les listes"""
+
+    def test_champs_lourds(self):
+        """Textes longs différés, sauf ceux à garder"""
+        self.assertEqual(champs_lourds(Projet), ['description', 'bailleurs'])
+        self.assertEqual(champs_lourds(Projet, ('bailleurs',)), ['description'])
+        self.assertEqual(champs_lourds(UserProjet), [])
+
+    def test_light(self):
+        """light() diffère les colonnes lourdes du modèle"""
+        differes, est_defer = Projet.objects.light().query.deferred_loading
+        self.assertTrue(est_defer)
+        self.assertEqual(differes, {'description', 'bailleurs'})
+
+    def test_for_listing(self):
+        """for_listing() parcourt les relations de select_related()"""
+        queryset = UserProjet.objects.select_related('projet').for_listing('projet__bailleurs')
+        differes, _ = queryset.query.deferred_loading
+        self.assertEqual(differes, {'projet__description'})
+
+
+class ProjetMiddlewareTest(TestCase):
+    """Tests du contexte projet de la requête"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = ProjetMiddleware(lambda request: None)
+        self.user = User.objects.create_user(username='lecteur', password='testpass123')
+        self.projet = Projet.objects.create(
+            libelle='Projet Contexte',
+            bailleurs='Bailleur',
+            date_debut=date.today(),
+            date_fin=date.today() + timedelta(days=365),
+        )
+        self.affectation = UserProjet.objects.create(user=self.user, projet=self.projet, role='LECTEUR')
+
+    def _requete(self, user, projet_id):
+        request = self.factory.get('/')
+        request.user = user
+        request.session = {'projet_id': projet_id}
+        self.middleware(request)
+        return request
+
+    def test_projet_et_role(self):
+        """Le projet en session et le rôle sont exposés sur la requête"""
+        request = self._requete(self.user, self.projet.id)
+        self.assertEqual(request.projet, self.projet)
+        self.assertEqual(request.projet_role, 'LECTEUR')
+
+    def test_contexte_en_cache(self):
+        """Une seconde requête ne lit pas la base"""
+        self._requete(self.user, self.projet.id)
+        with self.assertNumQueries(0):
+            request = self._requete(self.user, self.projet.id)
+        self.assertEqual(request.projet_role, 'LECTEUR')
+
+    def test_invalidation_role(self):
+        """Un changement d'affectation est visible immédiatement"""
+        self._requete(self.user, self.projet.id)
+        self.affectation.role = 'CONTRIBUTEUR'
+        self.affectation.save()
+        self.assertEqual(self._requete(self.user, self.projet.id).projet_role, 'CONTRIBUTEUR')
+
+        self.affectation.delete()
+        request = self._requete(self.user, self.projet.id)
+        self.assertIsNone(request.projet)
+        self.assertIsNone(request.projet_role)
+
+    def test_api_refusee_apres_retrait(self):
+        """Les API et le tableau de bord refusent un projet retiré à l'utilisateur"""
+        from django.test import Client
+
+        client = Client()
+        client.force_login(self.user)
+        session = client.session
+        session['projet_id'] = self.projet.id
+        session.save()
+
+        self.assertEqual(client.get('/dashboard/api/geojson/communes/').status_code, 200)
+
+        self.affectation.actif = False
+        self.affectation.save()
+        self.assertEqual(client.get('/dashboard/api/geojson/communes/').status_code, 403)
+        self.assertEqual(client.get('/dashboard/').status_code, 302)
+
+
+class PaginationKeysetTest(TestCase):
+    """Tests pour la pagination par curseur"""
+
+    def test_curseur_aller_retour(self):
+        """Un curseur restitue la date et l'id encodés"""
+        moment = datetime(2026, 3, 14, 9, 26, 53, 589793)
+        curseur = encoder_curseur(moment, 42)
+        self.assertNotIn('=', curseur)
+        self.assertEqual(decoder_curseur(curseur), (moment, 42))
+
+    def test_curseur_invalide(self):
+        """Un curseur altéré lève ValueError"""
+        for curseur in ('abc', 'bm9uLWpzb24', encoder_curseur(datetime(2026, 1, 1), 1)[:-3]):
+            with self.assertRaises(ValueError):
+                decoder_curseur(curseur)
+
+    def test_taille_page_bornee(self):
+        """La taille demandée est ramenée à [1, TAILLE_MAX]"""
+        self.assertEqual(taille_page(None), TAILLE_PAGE)
+        self.assertEqual(taille_page('0'), 1)
+        self.assertEqual(taille_page('10000'), TAILLE_MAX)
+        with self.assertRaises(ValueError):
+            taille_page('dix')
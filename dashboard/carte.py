@@ -0,0 +1,67 @@
+"""
+Document d'amorçage de la carte SIG.
+
+Un seul document regroupe les contours des communes (format compact),
+l'emprise du projet et les KPIs du panneau latéral. Les couches ponctuelles
+n'en font pas partie : la carte les lit en tuiles vectorielles (MVT). Le
+document est revalidé par l'ETag du projet (304 tant que rien ne change).
+"""
+from __future__ import annotations
+
+import json
+
+from django.contrib.gis.db.models import Extent
+
+from geo.zones import emprise_zone
+from referentiels.models import CommuneGeom
+from suivi.aggregations import calculer_kpis_projet
+
+from .couches import PRECISION_COMPACTE, geojson_couche
+
+# Propriétés des communes : celles du style et des étiquettes, le détail est
+# chargé au clic (api_detail_entite)
+CHAMPS_COMMUNES = ('nom', 'avancement')
+
+
+def emprise_projet(projet_id: int) -> list[float] | None:
+    """
+    Emprise de la zone matérialisée du projet, à défaut de ses communes.
+
+    Args:
+        projet_id: ID du projet
+
+    Returns:
+        [lon_min, lat_min, lon_max, lat_max], None sans géométrie
+    """
+    emprise = emprise_zone(projet_id)
+    if emprise:
+        return emprise
+    emprise = CommuneGeom.objects.filter(
+        commune__commune_projets__projet_id=projet_id
+    ).aggregate(emprise=Extent('geom'))['emprise']
+    return list(emprise) if emprise else None
+
+
+def calculer_amorcage(projet_id: int, tolerance: float | None = None) -> bytes:
+    """
+    Document d'amorçage de la carte (à mettre en cache).
+
+    Les communes, déjà sérialisées par PostgreSQL, sont insérées telles
+    quelles.
+
+    Args:
+        projet_id: ID du projet
+        tolerance: Tolérance des contours de communes simplifiés
+
+    Returns:
+        JSON {extent, kpis, communes} encodé en UTF-8
+    """
+    communes = geojson_couche(
+        'communes', projet_id, tolerance=tolerance,
+        precision=PRECISION_COMPACTE, champs=CHAMPS_COMMUNES,
+    )
+    entete = json.dumps({
+        'extent': emprise_projet(projet_id),
+        'kpis': calculer_kpis_projet(projet_id),
+    })
+    return b'%s, "communes": %s}' % (entete[:-1].encode(), communes)
@@ -0,0 +1,567 @@
+"""
+Définition SQL des couches cartographiques du projet.
+
+Chaque couche décrit sa source (tables et jointures), ses propriétés
+(nom, expression SQL, paramètres) et les filtres qu'elle accepte. Ces
+définitions sont partagées par la sérialisation GeoJSON (construite par
+PostgreSQL avec ST_AsGeoJSON + json_build_object + json_agg) et par les
+tuiles vectorielles (dashboard.tuiles). Les couches de contours peuvent
+être servies dans une variante simplifiée (geo.GeometrieSimplifiee).
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Iterator, Sequence
+
+from django.db import connection
+
+from core.streaming import lignes_sql
+from geo.models import (
+    Acteur,
+    Admin2,
+    Admin4,
+    Admin5,
+    Admin7,
+    Admin8,
+    GeometrieSimplifiee,
+    Infrastructure,
+)
+from referentiels.models import (
+    Commune,
+    CommuneGeom,
+    ProjetCommune,
+    TypeActeur,
+    TypeInfrastructure,
+    TypeIntervention,
+)
+from suivi.aggregations import ANNEE_CIBLE
+from suivi.models import Indicateur, Intervention, ProgressionIndicateur, Thematique
+
+# Décimales des coordonnées GeoJSON : 1e-9 degré (précision des données)
+# par défaut, 6 décimales (~10 cm) pour les chargements de carte
+PRECISION = 9
+PRECISION_COMPACTE = 6
+
+# Propriété : (nom, expression SQL, paramètres de l'expression)
+Propriete = tuple[str, str, list[Any]]
+
+
+def _table(modele: Any) -> str:
+    return connection.ops.quote_name(modele._meta.db_table)
+
+
+def _libelle_choix(colonne: str, choix: list[tuple[str, str]]) -> tuple[str, list[str]]:
+    """Expression SQL CASE traduisant un code en libellé (équivalent de get_FOO_display)."""
+    sql = ' '.join(['WHEN %s THEN %s'] * len(choix))
+    params = [valeur for paire in choix for valeur in paire]
+    return f"CASE {colonne} {sql} ELSE {colonne} END", params
+
+
+def _date(colonne: str) -> str:
+    return f"to_char({colonne}, 'YYYY-MM-DD')"
+
+
+def _couche_communes(projet_id: int) -> dict[str, Any]:
+    avancement = (
+        "CASE WHEN COALESCE(s.cible, 0) > 0 "
+        "THEN ROUND(s.realise::numeric / s.cible * 100, 1) ELSE 0 END"
+    )
+    return {
+        'source': f"""
+            {_table(CommuneGeom)} t
+            JOIN {_table(Commune)} c ON c.id = t.commune_id
+            JOIN {_table(ProjetCommune)} pc ON pc.commune_id = t.commune_id AND pc.projet_id = %s
+            LEFT JOIN (
+                SELECT commune_id,
+                       SUM(total_realise) AS realise,
+                       SUM(nb_interventions) AS nombre,
+                       SUM(total_cible) FILTER (WHERE annee = %s) AS cible
+                FROM {_table(ProgressionIndicateur)}
+                WHERE projet_id = %s AND commune_id IS NOT NULL
+                GROUP BY commune_id
+            ) s ON s.commune_id = t.commune_id
+        """,
+        'params_source': [projet_id, ANNEE_CIBLE, projet_id],
+        'conditions': [],
+        'params_conditions': [],
+        'proprietes': [
+            ('id', 'c.id', []),
+            ('nom', 'c.nom', []),
+            ('code_commune', 'c.code_commune', []),
+            ('departement', 'c.departement', []),
+            ('region', 'c.region', []),
+            ('interventions_count', 'COALESCE(s.nombre, 0)', []),
+            ('beneficiaires', 'COALESCE(s.realise, 0)', []),
+            ('cibles', 'COALESCE(s.cible, 0)', []),
+            ('avancement', avancement, []),
+        ],
+        'ordre': 'c.nom, c.id',
+        'filtres': {},
+        'niveau_simplifie': 'commune',
+    }
+
+
+def _couche_interventions(projet_id: int) -> dict[str, Any]:
+    statut_display, params_statut = _libelle_choix('t.statut', Intervention.STATUT_CHOICES)
+    return {
+        'source': f"""
+            {_table(Intervention)} t
+            LEFT JOIN {_table(TypeIntervention)} ti ON ti.id = t.type_intervention_id
+            LEFT JOIN {_table(Commune)} c ON c.id = t.commune_id
+            LEFT JOIN {_table(Indicateur)} i ON i.id = t.indicateur_id
+            LEFT JOIN {_table(Thematique)} th ON th.id = i.thematique_id
+        """,
+        'params_source': [],
+        'conditions': ['t.projet_id = %s', 't.geom IS NOT NULL'],
+        'params_conditions': [projet_id],
+        'proprietes': [
+            ('id', 't.id', []),
+            ('libelle', 't.libelle', []),
+            ('description', 't.description', []),
+            ('nature', 't.nature', []),
+            ('statut', 't.statut', []),
+            ('statut_display', statut_display, params_statut),
+            ('type_intervention', 'ti.libelle', []),
+            ('commune', 'c.nom', []),
+            ('thematique', 'th.code', []),
+            ('indicateur', 'i.libelle', []),
+            ('valeur_quantitative', 'COALESCE(t.valeur_quantitative, 0)', []),
+            ('date_intervention', _date('t.date_intervention'), []),
+            ('date_creation', _date("t.date_creation AT TIME ZONE 'UTC'"), []),
+        ],
+        'ordre': 't.date_intervention DESC, t.id',
+        'filtres': {
+            'statut': 't.statut = %s',
+            'commune_id': 't.commune_id = %s',
+            # Emprise (lon_min, lat_min, lon_max, lat_max) : && utilise l'index GiST de geom
+            'bbox': 't.geom && ST_MakeEnvelope(%s, %s, %s, %s, 4326)',
+            'date_debut': 't.date_intervention >= %s',
+            'date_fin': 't.date_intervention <= %s',
+        },
+    }
+
+
+def _couche_infrastructures(projet_id: int) -> dict[str, Any]:
+    statut_display, params_statut = _libelle_choix('t.statut', Infrastructure.STATUT_CHOICES)
+    return {
+        'source': f"""
+            {_table(Infrastructure)} t
+            LEFT JOIN {_table(TypeInfrastructure)} ty ON ty.id = t.type_infrastructure_id
+            LEFT JOIN {_table(Commune)} c ON c.id = t.commune_id
+        """,
+        'params_source': [],
+        'conditions': ['t.projet_id = %s', 't.geom IS NOT NULL'],
+        'params_conditions': [projet_id],
+        'proprietes': [
+            ('id', 't.id', []),
+            ('libelle', 't.nom', []),
+            ('type', 'ty.libelle', []),
+            ('commune', 'c.nom', []),
+            ('statut', 't.statut', []),
+            ('statut_display', statut_display, params_statut),
+            ('nb_beneficiaires', 't.nb_beneficiaires', []),
+            ('cout_construction', 'NULLIF(t.cout_construction, 0)::float8', []),
+            ('date_construction', _date('t.date_construction'), []),
+        ],
+        'ordre': 'c.nom, t.nom, t.id',
+        'filtres': {'statut': 't.statut = %s', 'commune_id': 't.commune_id = %s'},
+    }
+
+
+def _couche_acteurs(projet_id: int) -> dict[str, Any]:
+    return {
+        'source': f"""
+            {_table(Acteur)} t
+            LEFT JOIN {_table(TypeActeur)} ty ON ty.id = t.type_acteur_id
+            LEFT JOIN {_table(Commune)} c ON c.id = t.commune_id
+        """,
+        'params_source': [],
+        'conditions': ['t.projet_id = %s', 't.geom IS NOT NULL'],
+        'params_conditions': [projet_id],
+        'proprietes': [
+            ('id', 't.id', []),
+            ('libelle', 't.denomination', []),
+            ('type', 'ty.libelle', []),
+            ('commune', 'c.nom', []),
+            ('nb_adherents', 't.nb_adherents', []),
+            ('nb_femmes', 't.nb_femmes', []),
+            ('nb_hommes', 't.nb_hommes', []),
+            ('nb_jeunes', 't.nb_jeunes', []),
+            ('responsable', 't.responsable', []),
+            ('telephone', 't.telephone', []),
+            ('email', 't.email', []),
+        ],
+        'ordre': 'c.nom, t.denomination, t.id',
+        'filtres': {'statut': 't.statut = %s', 'commune_id': 't.commune_id = %s'},
+    }
+
+
+def _couche_admin(modele: Any, niveau: str) -> Callable[[int], dict[str, Any]]:
+    """Couche de contours administratifs OSM limitée à l'emprise des communes du projet."""
+    def definition(projet_id: int) -> dict[str, Any]:
+        return {
+            'source': f"{_table(modele)} t",
+            'params_source': [],
+            'conditions': [
+                't.geom IS NOT NULL',
+                f"""t.geom && (
+                    SELECT ST_Extent(cg.geom)
+                    FROM {_table(CommuneGeom)} cg
+                    JOIN {_table(ProjetCommune)} pc ON pc.commune_id = cg.commune_id
+                    WHERE pc.projet_id = %s
+                )""",
+            ],
+            'params_conditions': [projet_id],
+            'proprietes': [
+                ('id', 't.id', []),
+                ('nom', 't.name', []),
+            ],
+            'ordre': 't.name, t.id',
+            'filtres': {},
+            'niveau_simplifie': niveau,
+        }
+    return definition
+
+
+COUCHES = {
+    'communes': _couche_communes,
+    'interventions': _couche_interventions,
+    'infrastructures': _couche_infrastructures,
+    'acteurs': _couche_acteurs,
+    'admin2': _couche_admin(Admin2, 'admin2'),
+    'admin4': _couche_admin(Admin4, 'admin4'),
+    'admin5': _couche_admin(Admin5, 'admin5'),
+    'admin7': _couche_admin(Admin7, 'admin7'),
+    'admin8': _couche_admin(Admin8, 'admin8'),
+}
+
+
+def proprietes_couche(couche: str) -> list[str]:
+    """Noms des propriétés disponibles d'une couche (ordre de sortie)."""
+    return [nom for nom, _, _ in COUCHES[couche](0)['proprietes']]
+
+
+def definir_couche(couche: str, projet_id: int, tolerance: float | None = None,
+                   champs: Sequence[str] | None = None, **filtres: Any) -> dict[str, Any]:
+    """
+    Définition d'une couche pour un projet, filtres appliqués.
+
+    Les filtres vides ou non pris en charge par la couche sont ignorés ;
+    un filtre à plusieurs paramètres (bbox) reçoit une liste de valeurs.
+
+    Args:
+        couche: Nom de la couche (clé de COUCHES)
+        projet_id: ID du projet
+        tolerance: Tolérance de la variante simplifiée (contours uniquement)
+        champs: Propriétés retenues (toutes si None, id toujours inclus)
+        **filtres: Valeurs des filtres (statut, commune_id, bbox...)
+
+    Returns:
+        Dictionnaire (source, params_source, conditions, params_conditions,
+        proprietes, ordre, geometrie)
+
+    Raises:
+        ValueError: Si champs contient une propriété inconnue de la couche
+    """
+    definition = COUCHES[couche](projet_id)
+    definition.setdefault('geometrie', 't.geom')
+
+    if champs:
+        inconnus = set(champs) - {nom for nom, _, _ in definition['proprietes']}
+        if inconnus:
+            raise ValueError(f"Propriétés inconnues : {', '.join(sorted(inconnus))}")
+        definition['proprietes'] = [
+            p for p in definition['proprietes'] if p[0] == 'id' or p[0] in champs
+        ]
+
+    for nom, valeur in filtres.items():
+        if valeur and nom in definition['filtres']:
+            definition['conditions'].append(definition['filtres'][nom])
+            if isinstance(valeur, (list, tuple)):
+                definition['params_conditions'].extend(valeur)
+            else:
+                definition['params_conditions'].append(valeur)
+
+    if tolerance and definition.get('niveau_simplifie'):
+        # Variante simplifiée, contour d'origine si elle n'a pas été calculée
+        definition['source'] += f"""
+            LEFT JOIN {_table(GeometrieSimplifiee)} gs
+                ON gs.niveau = %s AND gs.objet_id = t.id AND gs.tolerance = %s
+        """
+        definition['params_source'] += [definition['niveau_simplifie'], tolerance]
+        definition['geometrie'] = 'COALESCE(gs.geom, t.geom)'
+
+    return definition
+
+
+def objet_proprietes(proprietes: list[Propriete]) -> tuple[str, list[Any]]:
+    """
+    Expression json_build_object des propriétés (ordre des clés conservé).
+
+    Args:
+        proprietes: Propriétés de la couche
+
+    Returns:
+        (expression SQL, paramètres)
+    """
+    morceaux = []
+    params: list[Any] = []
+    for nom, expression, params_expression in proprietes:
+        morceaux.append(f"%s, {expression}")
+        params.extend([nom, *params_expression])
+    return f"json_build_object({', '.join(morceaux)})", params
+
+
+def _requete_features(couche: str, projet_id: int, tolerance: float | None,
+                      limite: int | None, apres_id: int | None, precision: int,
+                      champs: Sequence[str] | None, filtres: dict[str, Any]) -> tuple[str, list[Any]]:
+    """
+    Requête des features d'une couche : une ligne (id, rang, feature) par entité.
+
+    Args:
+        couche: Nom de la couche (clé de COUCHES)
+        projet_id: ID du projet
+        tolerance: Tolérance de la variante simplifiée (contours uniquement)
+        limite: Nombre maximal d'entités
+        apres_id: Ne retenir que les entités d'id supérieur (curseur)
+        precision: Décimales des coordonnées
+        champs: Propriétés retenues (toutes si None)
+        filtres: Filtres optionnels (statut, commune_id, bbox...)
+
+    Returns:
+        (requête SQL, paramètres)
+    """
+    definition = definir_couche(couche, projet_id, tolerance, champs, **filtres)
+    proprietes, params_proprietes = objet_proprietes(definition['proprietes'])
+
+    if apres_id is not None:
+        definition['conditions'].append('t.id > %s')
+        definition['params_conditions'].append(apres_id)
+    ordre = 't.id' if limite is not None or apres_id is not None else definition['ordre']
+    conditions = ' AND '.join(definition['conditions']) or 'TRUE'
+
+    sql = f"""
+        SELECT t.id,
+               row_number() OVER (ORDER BY {ordre}) AS rang,
+               json_build_object(
+                   'type', 'Feature',
+                   'geometry', ST_AsGeoJSON({definition['geometrie']}, %s)::json,
+                   'properties', {proprietes}
+               ) AS feature
+        FROM {definition['source']}
+        WHERE {conditions}
+        ORDER BY {ordre}
+        LIMIT %s
+    """
+    params = [
+        precision,
+        *params_proprietes,
+        *definition['params_source'],
+        *definition['params_conditions'],
+        limite,
+    ]
+    return sql, params
+
+
+def geojson_couche(couche: str, projet_id: int, tolerance: float | None = None,
+                   limite: int | None = None, apres_id: int | None = None,
+                   precision: int = PRECISION, champs: Sequence[str] | None = None,
+                   **filtres: Any) -> bytes:
+    """
+    FeatureCollection GeoJSON d'une couche, sérialisée par PostgreSQL.
+
+    Avec limite ou apres_id, les entités sont parcourues par id croissant
+    (pagination par curseur) et le document porte un membre next_after_id :
+    id à passer pour obtenir la page suivante, null sur la dernière page.
+
+    Args:
+        couche: Nom de la couche (clé de COUCHES)
+        projet_id: ID du projet
+        tolerance: Tolérance de la variante simplifiée (contours uniquement)
+        limite: Nombre maximal d'entités
+        apres_id: Ne retenir que les entités d'id supérieur (curseur)
+        precision: Décimales des coordonnées
+        champs: Propriétés retenues (toutes si None, id toujours inclus)
+        **filtres: Filtres optionnels (statut, commune_id, bbox...)
+
+    Returns:
+        Document GeoJSON encodé en UTF-8
+    """
+    requete, params_requete = _requete_features(
+        couche, projet_id, tolerance, limite, apres_id, precision, champs, filtres
+    )
+
+    pagination = ''
+    params_pagination: list[Any] = []
+    if limite is not None or apres_id is not None:
+        pagination = (
+            ", 'next_after_id', CASE WHEN %s IS NOT NULL AND COUNT(*) >= %s "
+            "THEN MAX(f.id) END"
+        )
+        params_pagination = [limite, limite]
+
+    sql = f"""
+        SELECT json_build_object(
+            'type', 'FeatureCollection',
+            'features', COALESCE(json_agg(f.feature ORDER BY f.rang), '[]'::json)
+            {pagination}
+        )::text
+        FROM ({requete}) f
+    """
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*params_pagination, *params_requete])
+        return cursor.fetchone()[0].encode()
+
+
+def features_couche(couche: str, projet_id: int, tolerance: float | None = None,
+                    limite: int | None = None, apres_id: int | None = None,
+                    precision: int = PRECISION, champs: Sequence[str] | None = None,
+                    **filtres: Any) -> Iterator[tuple[int, str]]:
+    """
+    Features d'une couche une à une, lues par lots (curseur serveur).
+
+    Variante de geojson_couche pour les réponses diffusées au fil de
+    l'eau (core.streaming) : le document complet n'est jamais construit.
+
+    Args:
+        couche: Nom de la couche (clé de COUCHES)
+        projet_id: ID du projet
+        tolerance: Tolérance de la variante simplifiée (contours uniquement)
+        limite: Nombre maximal d'entités
+        apres_id: Ne retenir que les entités d'id supérieur (curseur)
+        precision: Décimales des coordonnées
+        champs: Propriétés retenues (toutes si None, id toujours inclus)
+        **filtres: Filtres optionnels (statut, commune_id, bbox...)
+
+    Returns:
+        Itérateur de (id, feature sérialisée en JSON)
+    """
+    requete, params = _requete_features(
+        couche, projet_id, tolerance, limite, apres_id, precision, champs, filtres
+    )
+    sql = f"SELECT f.id, f.feature::text FROM ({requete}) f ORDER BY f.rang"
+    for id_entite, feature in lignes_sql(sql, params):
+        yield id_entite, feature
+
+
+def detail_entite(couche: str, projet_id: int, objet_id: int) -> bytes | None:
+    """
+    Feature GeoJSON complète d'une entité (popups chargées à la demande).
+
+    Args:
+        couche: Nom de la couche (clé de COUCHES)
+        projet_id: ID du projet
+        objet_id: Valeur de la propriété id de l'entité
+
+    Returns:
+        Feature encodée en UTF-8, None si l'entité n'appartient pas au projet
+    """
+    definition = definir_couche(couche, projet_id)
+    proprietes, params_proprietes = objet_proprietes(definition['proprietes'])
+    expression_id = next(expression for nom, expression, _ in definition['proprietes'] if nom == 'id')
+    conditions = ' AND '.join([*definition['conditions'], f'{expression_id} = %s'])
+
+    sql = f"""
+        SELECT json_build_object(
+            'type', 'Feature',
+            'geometry', ST_AsGeoJSON({definition['geometrie']}, %s)::json,
+            'properties', {proprietes}
+        )::text
+        FROM {definition['source']}
+        WHERE {conditions}
+        LIMIT 1
+    """
+    params = [
+        PRECISION,
+        *params_proprietes,
+        *definition['params_source'],
+        *definition['params_conditions'],
+        objet_id,
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        ligne = cursor.fetchone()
+    return ligne[0].encode() if ligne else None
+
+
+# Regroupement des points : cellules de 1/CELLULES_PAR_TUILE de tuile
+# (32 px pour des tuiles de 256 px)
+CELLULES_PAR_TUILE = 8
+COUCHES_PONCTUELLES = ('interventions', 'infrastructures', 'acteurs')
+
+
+def taille_cellule(zoom: int) -> float:
+    """
+    Côté (en degrés) de la grille de regroupement à un niveau de zoom.
+
+    Args:
+        zoom: Niveau de zoom
+
+    Returns:
+        Taille de cellule en degrés de longitude
+    """
+    return 360 / (2 ** zoom * CELLULES_PAR_TUILE)
+
+
+def geojson_clusters(couche: str, projet_id: int, zoom: int, **filtres: Any) -> bytes:
+    """
+    Regroupements de points d'une couche, calculés par PostGIS.
+
+    Les points sont rattachés à une grille (ST_SnapToGrid) dont la maille
+    dépend du zoom. Chaque cellule non vide donne un point placé au
+    barycentre de ses entités, avec leur nombre et leur répartition par
+    statut.
+
+    Args:
+        couche: Couche ponctuelle (interventions, infrastructures, acteurs)
+        projet_id: ID du projet
+        zoom: Niveau de zoom
+        **filtres: Filtres optionnels (statut, commune_id)
+
+    Returns:
+        FeatureCollection GeoJSON (propriétés nombre et statuts)
+    """
+    definition = definir_couche(couche, projet_id, **filtres)
+    conditions = ' AND '.join(definition['conditions']) or 'TRUE'
+    taille = taille_cellule(zoom)
+
+    sql = f"""
+        WITH par_statut AS (
+            SELECT ST_SnapToGrid(t.geom, %s) AS cellule,
+                   t.statut,
+                   COUNT(*) AS nombre,
+                   ST_Centroid(ST_Collect(t.geom)) AS centre
+            FROM {definition['source']}
+            WHERE {conditions}
+            GROUP BY cellule, t.statut
+        ), cellules AS (
+            SELECT SUM(nombre) AS nombre,
+                   json_object_agg(statut, nombre) AS statuts,
+                   ST_MakePoint(
+                       SUM(ST_X(centre) * nombre) / SUM(nombre),
+                       SUM(ST_Y(centre) * nombre) / SUM(nombre)
+                   ) AS centre
+            FROM par_statut
+            GROUP BY cellule
+        )
+        SELECT json_build_object(
+            'type', 'FeatureCollection',
+            'features', COALESCE(json_agg(json_build_object(
+                'type', 'Feature',
+                'geometry', ST_AsGeoJSON(centre, %s)::json,
+                'properties', json_build_object('nombre', nombre, 'statuts', statuts)
+            ) ORDER BY nombre DESC), '[]'::json)
+        )::text
+        FROM cellules
+    """
+    params = [
+        taille,
+        *definition['params_source'],
+        *definition['params_conditions'],
+        PRECISION,
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchone()[0].encode()
@@ -0,0 +1,354 @@
+"""
+Archive cartographique hors ligne d'un projet (MBTiles).
+
+Les couches vectorielles du projet (contours administratifs, communes,
+interventions, infrastructures, acteurs) sont pré-rendues en tuiles MVT
+pour une plage de zooms et rangées dans un fichier MBTiles unique (SQLite,
+tuiles gzip), lisible localement par MapLibre ou QGIS sur les tablettes de
+terrain.
+
+Reconstruction incrémentale : l'archive conserve une empreinte (md5 de la
+géométrie et des propriétés) et l'emprise de chaque entité. Une mise à jour
+compare ces empreintes à l'état courant et ne régénère que les tuiles
+couvrant les entités ajoutées, modifiées ou supprimées (ancienne et
+nouvelle emprise).
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import math
+import os
+import shutil
+import sqlite3
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from django.conf import settings
+from django.db import connection
+
+from core.cache import version_projet
+from core.models import Projet
+
+from .couches import definir_couche, objet_proprietes
+from .tuiles import COUCHES, EXTENT, MARGE, generer_tuile
+
+# Couches de l'archive, de la plus basse à la plus haute dans l'empilement
+COUCHES_ARCHIVE = (
+    'admin2', 'admin4', 'admin5', 'admin7', 'admin8',
+    'communes', 'interventions', 'infrastructures', 'acteurs',
+)
+COUCHES_CONTOURS = ('admin2', 'admin4', 'admin5', 'admin7', 'admin8')
+
+ZOOM_MIN = 5
+ZOOM_MAX = 14
+
+# Emprise : (lon_min, lat_min, lon_max, lat_max)
+Emprise = tuple[float, float, float, float]
+
+# Empreinte d'une entité : (md5, lon_min, lat_min, lon_max, lat_max)
+Empreinte = tuple[str, float, float, float, float]
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);
+    CREATE TABLE IF NOT EXISTS tiles (
+        zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS tile_index ON tiles (zoom_level, tile_column, tile_row);
+    CREATE TABLE IF NOT EXISTS entites (
+        couche TEXT, id INTEGER, empreinte TEXT,
+        lon_min REAL, lat_min REAL, lon_max REAL, lat_max REAL,
+        PRIMARY KEY (couche, id)
+    );
+"""
+
+
+def chemin_archive(projet_id: int) -> Path:
+    """Chemin de l'archive MBTiles d'un projet (sous MEDIA_ROOT)."""
+    return Path(settings.MEDIA_ROOT) / 'cartes' / f'projet-{projet_id}.mbtiles'
+
+
+def tuile_du_point(lon: float, lat: float, z: int) -> tuple[int, int]:
+    """
+    Tuile XYZ contenant un point.
+
+    Args:
+        lon, lat: Coordonnées WGS84
+        z: Niveau de zoom
+
+    Returns:
+        (x, y)
+    """
+    n = 2 ** z
+    lat = max(min(lat, 85.0511), -85.0511)
+    x = int((lon + 180) / 360 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tuiles_emprise(emprise: Emprise, z: int) -> Iterator[tuple[int, int]]:
+    """
+    Tuiles d'un zoom couvrant une emprise, marge des tuiles MVT comprise.
+
+    Args:
+        emprise: (lon_min, lat_min, lon_max, lat_max)
+        z: Niveau de zoom
+
+    Returns:
+        Itérateur de (x, y)
+    """
+    marge = 360 / 2 ** z * MARGE / EXTENT
+    lon_min, lat_min, lon_max, lat_max = emprise
+    x_min, y_min = tuile_du_point(lon_min - marge, lat_max + marge, z)
+    x_max, y_max = tuile_du_point(lon_max + marge, lat_min - marge, z)
+    for x in range(x_min, x_max + 1):
+        for y in range(y_min, y_max + 1):
+            yield x, y
+
+
+def empreintes_couche(couche: str, projet_id: int) -> dict[int, Empreinte]:
+    """
+    Empreinte et emprise de chaque entité d'une couche, calculées en base.
+
+    Seules les propriétés embarquées dans les tuiles entrent dans
+    l'empreinte : une modification qui ne change pas la tuile est ignorée.
+
+    Args:
+        couche: Nom de la couche
+        projet_id: ID du projet
+
+    Returns:
+        Dictionnaire {id: (md5, lon_min, lat_min, lon_max, lat_max)}
+    """
+    definition = definir_couche(couche, projet_id, champs=COUCHES[couche])
+    proprietes, params_proprietes = objet_proprietes(definition['proprietes'])
+    expression_id = next(expression for nom, expression, _ in definition['proprietes'] if nom == 'id')
+    geometrie = definition['geometrie']
+
+    sql = f"""
+        SELECT {expression_id},
+               md5(ST_AsBinary({geometrie}) || convert_to(({proprietes})::text, 'UTF8')),
+               ST_XMin({geometrie}), ST_YMin({geometrie}), ST_XMax({geometrie}), ST_YMax({geometrie})
+        FROM {definition['source']}
+        WHERE {' AND '.join([*definition['conditions'], f'{geometrie} IS NOT NULL'])}
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*params_proprietes, *definition['params_source'], *definition['params_conditions']])
+        return {ligne[0]: tuple(ligne[1:]) for ligne in cursor.fetchall()}
+
+
+def _union(emprises: Iterable[Emprise]) -> Emprise | None:
+    emprises = list(emprises)
+    if not emprises:
+        return None
+    return (
+        min(e[0] for e in emprises), min(e[1] for e in emprises),
+        max(e[2] for e in emprises), max(e[3] for e in emprises),
+    )
+
+
+def comparer_entites(anciennes: dict[int, Empreinte],
+                     actuelles: dict[int, Empreinte]) -> tuple[int, list[Emprise]]:
+    """
+    Entités d'une couche ajoutées, modifiées ou supprimées depuis l'archive.
+
+    Args:
+        anciennes: Empreintes enregistrées dans l'archive
+        actuelles: Empreintes de l'état courant
+
+    Returns:
+        (nombre d'entités changées, emprises à redessiner : ancienne et
+        nouvelle emprise de chacune)
+    """
+    modifiees = 0
+    a_redessiner: list[Emprise] = []
+    for id_entite in anciennes.keys() | actuelles.keys():
+        avant, apres = anciennes.get(id_entite), actuelles.get(id_entite)
+        if avant and apres and avant[0] == apres[0]:
+            continue
+        modifiees += 1
+        a_redessiner.extend(e[1:] for e in (avant, apres) if e)
+    return modifiees, a_redessiner
+
+
+def _tuile_complete(projet_id: int, z: int, x: int, y: int) -> bytes:
+    """Tuile multi-couches : les messages MVT mono-couche se concatènent."""
+    return b''.join(generer_tuile(couche, projet_id, z, x, y) for couche in COUCHES_ARCHIVE)
+
+
+def _metadonnees(projet_id: int, version: int, emprise: Emprise,
+                 zoom_min: int, zoom_max: int) -> dict[str, str]:
+    projet = Projet.objects.get(pk=projet_id)
+    couches = [
+        {
+            'id': couche,
+            'fields': {nom: 'String' for nom in COUCHES[couche] if nom != 'id'},
+            'minzoom': zoom_min,
+            'maxzoom': zoom_max,
+        }
+        for couche in COUCHES_ARCHIVE
+    ]
+    return {
+        'name': str(projet),
+        'format': 'pbf',
+        'type': 'overlay',
+        'minzoom': str(zoom_min),
+        'maxzoom': str(zoom_max),
+        'bounds': ','.join(f'{v:.6f}' for v in emprise),
+        'center': f'{(emprise[0] + emprise[2]) / 2:.6f},{(emprise[1] + emprise[3]) / 2:.6f},{zoom_min}',
+        'json': json.dumps({'vector_layers': couches}),
+        'version_projet': str(version),
+        'date_generation': datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def exporter_archive(projet_id: int, zoom_min: int = ZOOM_MIN, zoom_max: int = ZOOM_MAX,
+                     complet: bool = False) -> dict[str, Any]:
+    """
+    Construit ou met à jour l'archive MBTiles d'un projet.
+
+    La mise à jour se fait sur une copie remplacée atomiquement : l'archive
+    en cours de téléchargement n'est jamais modifiée. Un changement de la
+    plage de zooms ou de l'emprise force une reconstruction complète.
+
+    Args:
+        projet_id: ID du projet
+        zoom_min: Zoom minimal pré-rendu
+        zoom_max: Zoom maximal pré-rendu
+        complet: Ignorer l'archive existante
+
+    Returns:
+        Dictionnaire {complet, entites_modifiees, tuiles_ecrites, tuiles_supprimees}
+    """
+    chemin = chemin_archive(projet_id)
+    chemin.parent.mkdir(parents=True, exist_ok=True)
+    travail = chemin.with_name(f'{chemin.stem}.{uuid.uuid4().hex}.tmp')
+
+    # Version lue avant les données : une modification concurrente rendra
+    # l'archive obsolète plutôt que de passer inaperçue
+    version = version_projet(projet_id)
+    actuelles = {couche: empreintes_couche(couche, projet_id) for couche in COUCHES_ARCHIVE}
+    emprise = _union(
+        empreinte[1:] for couche in COUCHES_ARCHIVE if couche not in COUCHES_CONTOURS
+        for empreinte in actuelles[couche].values()
+    )
+    if emprise is None:
+        raise ValueError("Le projet n'a aucune entité géolocalisée")
+
+    if not complet and chemin.exists():
+        shutil.copyfile(chemin, travail)
+    base = sqlite3.connect(travail)
+    try:
+        base.executescript(SCHEMA)
+        metadonnees = dict(base.execute('SELECT name, value FROM metadata'))
+        complet = complet or (
+            metadonnees.get('bounds') != ','.join(f'{v:.6f}' for v in emprise)
+            or metadonnees.get('minzoom') != str(zoom_min)
+            or metadonnees.get('maxzoom') != str(zoom_max)
+        )
+
+        # Entités modifiées : ancienne et nouvelle emprise à redessiner
+        a_redessiner: list[Emprise] = []
+        modifiees = 0
+        for couche in COUCHES_ARCHIVE:
+            anciennes = {
+                id_entite: tuple(reste)
+                for id_entite, *reste in base.execute(
+                    'SELECT id, empreinte, lon_min, lat_min, lon_max, lat_max FROM entites WHERE couche = ?',
+                    (couche,),
+                )
+            }
+            nombre, emprises = comparer_entites(anciennes, actuelles[couche])
+            modifiees += nombre
+            a_redessiner.extend(emprises)
+
+        if complet:
+            base.execute('DELETE FROM tiles')
+            zones = [emprise]
+        else:
+            zones = a_redessiner
+
+        ecrites = supprimees = 0
+        for z in range(zoom_min, zoom_max + 1):
+            tuiles = {tuile for zone in zones for tuile in tuiles_emprise(zone, z)}
+            for x, y in tuiles:
+                tuile = _tuile_complete(projet_id, z, x, y)
+                ligne = 2 ** z - 1 - y  # Schéma TMS
+                if tuile:
+                    base.execute(
+                        'INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)',
+                        (z, x, ligne, gzip.compress(tuile, mtime=0)),
+                    )
+                    ecrites += 1
+                else:
+                    supprimees += base.execute(
+                        'DELETE FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?',
+                        (z, x, ligne),
+                    ).rowcount
+
+        base.execute('DELETE FROM entites')
+        base.executemany(
+            'INSERT INTO entites VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (
+                (couche, id_entite, *empreinte)
+                for couche, empreintes in actuelles.items()
+                for id_entite, empreinte in empreintes.items()
+            ),
+        )
+        base.execute('DELETE FROM metadata')
+        base.executemany(
+            'INSERT INTO metadata VALUES (?, ?)',
+            _metadonnees(projet_id, version, emprise, zoom_min, zoom_max).items(),
+        )
+        base.commit()
+    except BaseException:
+        base.close()
+        travail.unlink(missing_ok=True)
+        raise
+    base.close()
+    os.replace(travail, chemin)
+
+    return {
+        'complet': complet,
+        'entites_modifiees': modifiees,
+        'tuiles_ecrites': ecrites,
+        'tuiles_supprimees': supprimees,
+    }
+
+
+def metadonnees_archive(projet_id: int) -> dict[str, str] | None:
+    """
+    Métadonnées de l'archive d'un projet (zooms, emprise, version_projet...).
+
+    Args:
+        projet_id: ID du projet
+
+    Returns:
+        Dictionnaire {nom: valeur}, None sans archive
+    """
+    chemin = chemin_archive(projet_id)
+    if not chemin.exists():
+        return None
+    base = sqlite3.connect(f'file:{chemin}?mode=ro', uri=True)
+    try:
+        return dict(base.execute('SELECT name, value FROM metadata'))
+    finally:
+        base.close()
+
+
+def archive_obsolete(projet_id: int) -> bool | None:
+    """
+    Vrai si les données du projet ont changé depuis la génération de l'archive.
+
+    Args:
+        projet_id: ID du projet
+
+    Returns:
+        True / False, None sans archive
+    """
+    metadonnees = metadonnees_archive(projet_id)
+    if metadonnees is None:
+        return None
+    return metadonnees.get('version_projet') != str(version_projet(projet_id))
@@ -0,0 +1,60 @@
+"""
+Export de l'archive cartographique hors ligne (MBTiles) des projets
+
+Usage:
+    python manage.py exporter_carte
+    python manage.py exporter_carte --projet 3 --zoom-max 15
+    python manage.py exporter_carte --projet 3 --complet
+    python manage.py exporter_carte --obsoletes   (à planifier : archives dont les données ont changé)
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Projet
+from dashboard.hors_ligne import (
+    ZOOM_MAX, ZOOM_MIN, archive_obsolete, chemin_archive, exporter_archive, metadonnees_archive,
+)
+
+
+class Command(BaseCommand):
+    help = "Pré-rend les couches des projets en tuiles vectorielles dans une archive MBTiles (mise à jour incrémentale)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projet', type=int, action='append',
+                            help="Projet à exporter (ID, répétable, tous les projets actifs par défaut)")
+        parser.add_argument('--zoom-min', type=int, default=ZOOM_MIN,
+                            help=f"Zoom minimal (défaut {ZOOM_MIN})")
+        parser.add_argument('--zoom-max', type=int, default=ZOOM_MAX,
+                            help=f"Zoom maximal (défaut {ZOOM_MAX})")
+        parser.add_argument('--complet', action='store_true',
+                            help="Reconstruire toutes les tuiles au lieu des seules tuiles modifiées")
+        parser.add_argument('--obsoletes', action='store_true',
+                            help="Ne mettre à jour que les archives existantes dont les données ont changé "
+                                 "(avec leur plage de zooms)")
+
+    def handle(self, *args, **options):
+        if not 0 <= options['zoom_min'] <= options['zoom_max'] <= 22:
+            raise CommandError("Plage de zooms invalide (0 <= zoom-min <= zoom-max <= 22)")
+
+        projets = Projet.objects.filter(actif=True)
+        if options['projet']:
+            projets = Projet.objects.filter(pk__in=options['projet'])
+
+        for projet in projets:
+            zoom_min, zoom_max = options['zoom_min'], options['zoom_max']
+            if options['obsoletes']:
+                if not archive_obsolete(projet.pk):
+                    continue
+                metadonnees = metadonnees_archive(projet.pk)
+                zoom_min, zoom_max = int(metadonnees['minzoom']), int(metadonnees['maxzoom'])
+            try:
+                resultat = exporter_archive(projet.pk, zoom_min, zoom_max, options['complet'])
+            except ValueError as e:
+                self.stdout.write(self.style.WARNING(f"{projet} : {e}"))
+                continue
+            mode = "complète" if resultat['complet'] else "incrémentale"
+            self.stdout.write(
+                f"{projet} : mise à jour {mode}, {resultat['entites_modifiees']} entité(s) modifiée(s), "
+                f"{resultat['tuiles_ecrites']} tuile(s) écrite(s), "
+                f"{resultat['tuiles_supprimees']} supprimée(s) -> {chemin_archive(projet.pk)}"
+            )
+        self.stdout.write(self.style.SUCCESS("Archives hors ligne à jour."))
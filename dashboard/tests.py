@@ -1,3 +1,470 @@
-from django.test import TestCase
+"""
+Tests unitaires pour l'application dashboard (cartographie & archives hors ligne)
+"""
+import json
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.gis.geos import Point
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from core.models import Projet, UserProjet
+from referentiels.models import Commune, TypeIntervention
+from suivi.models import Indicateur, Intervention, Thematique
+
+from .couches import geojson_clusters, geojson_couche
+from .hors_ligne import comparer_entites, tuile_du_point, tuiles_emprise
+
+
+class TuilesHorsLigneTest(SimpleTestCase):
+    """Tests pour le calcul des tuiles de l'archive hors ligne"""
+
+    def test_tuile_du_point(self):
+        """Coordonnées XYZ classiques (schéma Web Mercator)"""
+        self.assertEqual(tuile_du_point(0, 0, 0), (0, 0))
+        self.assertEqual(tuile_du_point(0, 0, 1), (1, 1))
+        self.assertEqual(tuile_du_point(-12.0, 14.5, 6), (29, 29))
+        # Latitudes et longitudes hors projection ramenées dans la grille
+        self.assertEqual(tuile_du_point(180, 90, 2), (3, 0))
+        self.assertEqual(tuile_du_point(-180, -90, 2), (0, 3))
+
+    def test_tuiles_emprise(self):
+        """Une emprise ponctuelle couvre sa tuile, plus les voisines touchées par la marge"""
+        tuiles = set(tuiles_emprise((-12.0, 14.5, -12.0, 14.5), 6))
+        self.assertIn((29, 29), tuiles)
+        self.assertLessEqual(len(tuiles), 4)
+
+        # Une emprise plus large couvre un rectangle de tuiles contigu
+        tuiles = set(tuiles_emprise((-12.5, 14.0, -11.0, 15.5), 10))
+        xs = {x for x, _ in tuiles}
+        ys = {y for _, y in tuiles}
+        self.assertEqual(len(tuiles), len(xs) * len(ys))
+        self.assertEqual(xs, set(range(min(xs), max(xs) + 1)))
+
+    def test_comparer_entites(self):
+        """Seules les entités ajoutées, modifiées ou supprimées sont redessinées"""
+        inchangee = ('a', 0.0, 0.0, 1.0, 1.0)
+        anciennes = {
+            1: inchangee,
+            2: ('b', 2.0, 2.0, 3.0, 3.0),
+            3: ('c', 4.0, 4.0, 5.0, 5.0),
+        }
+        actuelles = {
+            1: inchangee,
+            2: ('b2', 2.5, 2.5, 3.5, 3.5),
+            4: ('d', 6.0, 6.0, 7.0, 7.0),
+        }
+        modifiees, emprises = comparer_entites(anciennes, actuelles)
+
+        self.assertEqual(modifiees, 3)
+        self.assertCountEqual(emprises, [
+            (2.0, 2.0, 3.0, 3.0), (2.5, 2.5, 3.5, 3.5),  # modifiée : ancienne et nouvelle emprise
+            (4.0, 4.0, 5.0, 5.0),                        # supprimée
+            (6.0, 6.0, 7.0, 7.0),                        # ajoutée
+        ])
+        self.assertEqual(comparer_entites(anciennes, anciennes), (0, []))
+
+
+class ClustersTest(TestCase):
+    """Tests pour le regroupement des points par PostGIS"""
+
+    def setUp(self):
+        """Deux interventions voisines et une éloignée"""
+        self.projet = Projet.objects.create(
+            libelle='Projet Carte',
+            bailleurs='Bailleur',
+            date_debut=date.today(),
+            date_fin=date.today() + timedelta(days=365),
+        )
+        thematique = Thematique.objects.create(projet=self.projet, code='R1', libelle='Thématique')
+        indicateur = Indicateur.objects.create(
+            projet=self.projet, thematique=thematique, code='R1.1', libelle='Indicateur'
+        )
+        commune = Commune.objects.create(nom='Gathiary', code_commune='SN-KED-GAT')
+        type_intervention = TypeIntervention.objects.create(libelle='Formation', code='FORM')
+        for lon, lat, statut in ((-12.0, 14.5, 'TERMINE'), (-12.05, 14.55, 'PROGRAMME'), (-16.0, 13.0, 'TERMINE')):
+            Intervention.objects.create(
+                projet=self.projet, indicateur=indicateur, type_intervention=type_intervention,
+                commune=commune, nature='ACTIVITE', libelle=f'Intervention {lon}',
+                date_intervention=date.today(), statut=statut, geom=Point(lon, lat, srid=4326),
+            )
+
+    def _clusters(self, zoom, **filtres):
+        features = json.loads(geojson_clusters('interventions', self.projet.id, zoom, **filtres))['features']
+        return sorted((f['properties'] for f in features), key=lambda p: -p['nombre'])
+
+    def test_regroupement_par_zoom(self):
+        """La maille suit le zoom : un seul groupe à petite échelle, deux à l'échelle régionale"""
+        self.assertEqual(self._clusters(0), [{'nombre': 3, 'statuts': {'TERMINE': 2, 'PROGRAMME': 1}}])
+        self.assertEqual(self._clusters(6), [
+            {'nombre': 2, 'statuts': {'TERMINE': 1, 'PROGRAMME': 1}},
+            {'nombre': 1, 'statuts': {'TERMINE': 1}},
+        ])
+
+    def test_filtre_statut(self):
+        """Les filtres de la couche s'appliquent avant le regroupement"""
+        self.assertEqual(sum(c['nombre'] for c in self._clusters(6, statut='PROGRAMME')), 1)
+
+
+class ListeInterventionsTest(TestCase):
+    """Tests pour les listes d'interventions paginées par curseur"""
+
+    def setUp(self):
+        """Trois interventions et un administrateur positionné sur le projet"""
+        self.projet = Projet.objects.create(
+            libelle='Projet Liste',
+            bailleurs='Bailleur',
+            date_debut=date.today(),
+            date_fin=date.today() + timedelta(days=365),
+        )
+        thematique = Thematique.objects.create(projet=self.projet, code='R1', libelle='Thématique')
+        indicateur = Indicateur.objects.create(
+            projet=self.projet, thematique=thematique, code='R1.1', libelle='Indicateur'
+        )
+        commune = Commune.objects.create(nom='Gathiary', code_commune='SN-KED-GAT')
+        type_intervention = TypeIntervention.objects.create(libelle='Formation', code='FORM')
+        for numero in range(3):
+            Intervention.objects.create(
+                projet=self.projet, indicateur=indicateur, type_intervention=type_intervention,
+                commune=commune, nature='ACTIVITE', libelle=f'Intervention {numero}',
+                date_intervention=date.today(), statut='TERMINE',
+            )
+
+        admin = get_user_model().objects.create_superuser(username='admin', password='testpass123')
+        self.client.force_login(admin)
+        session = self.client.session
+        session['projet_id'] = self.projet.id
+        session.save()
+
+    def test_filtre_identifiant_invalide(self):
+        """Un identifiant non numérique donne un message explicite"""
+        for champ, message in (('commune', 'Commune invalide'), ('indicateur', 'Indicateur invalide')):
+            reponse = self.client.get(reverse('activites'), {champ: 'abc', 'format': 'json'})
+            self.assertEqual(reponse.status_code, 400)
+            self.assertEqual(reponse.json(), {'error': message})
+
+    def test_total_premiere_page_seulement(self):
+        """Le COUNT n'est exécuté que sans curseur"""
+        reponse = self.client.get(reverse('activites'), {'taille': 2})
+        self.assertEqual(reponse.context['total'], 3)
+        suivant = reponse.context['suivant']
+        self.assertTrue(suivant)
+
+        reponse = self.client.get(reverse('activites'), {'taille': 2, 'apres': suivant})
+        self.assertIsNone(reponse.context['total'])
+        self.assertEqual(len(reponse.context['activites']), 1)
+
+
+class ProjetCarteMixin:
+    """Projet à deux interventions localisées, administrateur connecté dessus"""
+
+    def setUp(self):
+        cache.clear()
+        self.projet = Projet.objects.create(
+            libelle='Projet Couches',
+            bailleurs='Bailleur',
+            date_debut=date.today(),
+            date_fin=date.today() + timedelta(days=365),
+        )
+        thematique = Thematique.objects.create(projet=self.projet, code='R1', libelle='Thématique')
+        indicateur = Indicateur.objects.create(
+            projet=self.projet, thematique=thematique, code='R1.1', libelle='Indicateur'
+        )
+        commune = Commune.objects.create(nom='Gathiary', code_commune='SN-KED-GAT')
+        type_intervention = TypeIntervention.objects.create(libelle='Formation', code='FORM')
+        for lon, lat in ((-12.0, 14.5), (-16.0, 13.0)):
+            Intervention.objects.create(
+                projet=self.projet, indicateur=indicateur, type_intervention=type_intervention,
+                commune=commune, nature='ACTIVITE', libelle=f'Intervention {lon}',
+                date_intervention=date.today(), statut='TERMINE', geom=Point(lon, lat, srid=4326),
+            )
+
+        admin = get_user_model().objects.create_superuser(username='admin', password='testpass123')
+        self.client.force_login(admin)
+        session = self.client.session
+        session['projet_id'] = self.projet.id
+        session.save()
+
+
+class CouchesGeojsonTest(ProjetCarteMixin, TestCase):
+    """Tests pour les API GeoJSON des couches"""
+
+    def test_couche_complete_en_cache(self):
+        """La couche complète est calculée une fois puis servie depuis le cache"""
+        from . import views
+
+        url = reverse('api_interventions_geojson')
+        with mock.patch.object(views, 'geojson_couche', wraps=views.geojson_couche) as calcul:
+            premiere = self.client.get(url)
+            seconde = self.client.get(url)
+
+        self.assertFalse(premiere.streaming)
+        self.assertEqual(calcul.call_count, 1)
+        self.assertEqual(len(json.loads(seconde.content)['features']), 2)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=premiere['ETag']).status_code, 304)
+
+    def test_emprise_diffusee(self):
+        """Une emprise ou une page est diffusée sans mise en cache"""
+        url = reverse('api_interventions_geojson')
+        reponse = self.client.get(url, {'bbox': '-13,14,-11,15'})
+        self.assertTrue(reponse.streaming)
+        features = json.loads(b''.join(reponse.streaming_content))['features']
+        self.assertEqual(len(features), 1)
+
+        reponse = self.client.get(url, {'limit': 1})
+        self.assertTrue(reponse.streaming)
+        self.assertIsNotNone(json.loads(b''.join(reponse.streaming_content))['next_after_id'])
+
+
+class AmorcageCarteTest(ProjetCarteMixin, TestCase):
+    """Tests pour le document d'amorçage de la carte"""
+
+    def test_contenu(self):
+        """Communes compactes, emprise et KPIs en un document revalidé par ETag"""
+        url = reverse('api_carte_amorcage')
+        reponse = self.client.get(url, {'zoom': 8})
+        document = json.loads(reponse.content)
+
+        self.assertEqual(set(document), {'extent', 'kpis', 'communes'})
+        self.assertEqual(document['communes']['type'], 'FeatureCollection')
+        self.assertEqual(document['kpis']['interventions_realisees'], 2)
+        self.assertEqual(self.client.get(url, {'zoom': 8}, HTTP_IF_NONE_MATCH=reponse['ETag']).status_code, 304)
+
+    def test_cle_mensuelle(self):
+        """Le document est recalculé au changement de mois (KPI du mois)"""
+        from . import views
+
+        url = reverse('api_carte_amorcage')
+        with mock.patch.object(views, 'calculer_amorcage', wraps=views.calculer_amorcage) as calcul, \
+                mock.patch.object(views, 'date') as faux:
+            faux.today.return_value = date(2026, 1, 31)
+            self.client.get(url)
+            self.client.get(url)
+            self.assertEqual(calcul.call_count, 1)
+
+            faux.today.return_value = date(2026, 2, 1)
+            self.client.get(url)
+            self.assertEqual(calcul.call_count, 2)
+
+    def test_invalidation(self):
+        """Une écriture sur le projet invalide le document et son ETag"""
+        url = reverse('api_carte_amorcage')
+        reponse = self.client.get(url)
+        self.assertEqual(json.loads(reponse.content)['kpis']['interventions_realisees'], 2)
+
+        intervention = Intervention.objects.filter(projet=self.projet).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            intervention.statut = 'PROGRAMME'
+            intervention.save()
+
+        reponse = self.client.get(url, HTTP_IF_NONE_MATCH=reponse['ETag'])
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(json.loads(reponse.content)['kpis']['interventions_realisees'], 1)
+
+
+class ChangerStatutTest(ProjetCarteMixin, TestCase):
+    """Tests pour le changement de statut d'une intervention"""
+
+    def _changer(self, intervention_id, statut='ANNULEE'):
+        url = reverse('changer_statut_intervention', args=[intervention_id])
+        return self.client.post(url, json.dumps({'statut': statut}), content_type='application/json')
+
+    def test_statut_modifie(self):
+        """Un administrateur change le statut"""
+        intervention = Intervention.objects.filter(projet=self.projet).first()
+        self.assertEqual(self._changer(intervention.id).status_code, 200)
+        intervention.refresh_from_db()
+        self.assertEqual(intervention.statut, 'ANNULEE')
+
+    def test_lecteur_refuse(self):
+        """Un lecteur du projet ne peut pas modifier"""
+        lecteur = get_user_model().objects.create_user(username='lecteur', password='testpass123')
+        UserProjet.objects.create(user=lecteur, projet=self.projet, role='LECTEUR')
+        self.client.force_login(lecteur)
+        session = self.client.session
+        session['projet_id'] = self.projet.id
+        session.save()
+
+        intervention = Intervention.objects.filter(projet=self.projet).first()
+        self.assertEqual(self._changer(intervention.id).status_code, 403)
+        intervention.refresh_from_db()
+        self.assertEqual(intervention.statut, 'TERMINE')
+
+    def test_intervention_inconnue(self):
+        """Un identifiant inconnu donne une 404"""
+        self.assertEqual(self._changer(999999).status_code, 404)
+
+    def test_corps_invalide(self):
+        """Un corps non JSON donne une 400"""
+        intervention = Intervention.objects.filter(projet=self.projet).first()
+        url = reverse('changer_statut_intervention', args=[intervention.id])
+        reponse = self.client.post(url, 'statut', content_type='application/json')
+        self.assertEqual(reponse.status_code, 400)
+
+
+class TuilesMvtTest(ProjetCarteMixin, TestCase):
+    """Tests pour les tuiles vectorielles des couches du projet"""
+
+    def _tuile(self, z, x, y, **filtres):
+        return self.client.get(reverse('api_tuile_mvt', args=['interventions', z, x, y]), filtres)
+
+    def test_contenu_et_filtres(self):
+        """Seules les entités de la tuile et des filtres sont encodées"""
+        reponse = self._tuile(6, 29, 29)
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(reponse['Content-Type'], 'application/vnd.mapbox-vector-tile')
+        self.assertTrue(reponse.content)
+
+        self.assertEqual(self._tuile(6, 0, 0).content, b'')
+        self.assertEqual(self._tuile(6, 29, 29, statut='PROGRAMME').content, b'')
+
+    def test_parametres_invalides(self):
+        """Couche inconnue, tuile hors grille ou commune_id non numérique"""
+        url = reverse('api_tuile_mvt', args=['inconnue', 0, 0, 0])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self._tuile(2, 4, 0).status_code, 400)
+        self.assertEqual(self._tuile(6, 29, 29, commune_id='abc').status_code, 400)
+
+    def test_cache_par_tuile(self):
+        """Chaque tuile est calculée une fois, puis de nouveau après une écriture sur le projet"""
+        from . import views
+
+        with mock.patch.object(views, 'generer_tuile', wraps=views.generer_tuile) as calcul:
+            self._tuile(6, 29, 29)
+            self._tuile(6, 29, 29)
+            self.assertEqual(calcul.call_count, 1)
+
+            self._tuile(6, 0, 0)
+            self.assertEqual(calcul.call_count, 2)
+
+            intervention = Intervention.objects.filter(projet=self.projet).first()
+            with self.captureOnCommitCallbacks(execute=True):
+                intervention.statut = 'PROGRAMME'
+                intervention.save()
+            self._tuile(6, 29, 29)
+            self.assertEqual(calcul.call_count, 3)
+
+
+class SerialisationGeojsonTest(ProjetCarteMixin, TestCase):
+    """Tests pour la sérialisation GeoJSON par PostgreSQL"""
+
+    def test_une_requete(self):
+        """Le document est produit par une seule requête, quel que soit le nombre d'entités"""
+        with self.assertNumQueries(1):
+            geojson_couche('interventions', self.projet.id)
+
+    def test_proprietes(self):
+        """Noms, ordre et valeurs des propriétés de la couche interventions"""
+        features = json.loads(geojson_couche('interventions', self.projet.id))['features']
+        self.assertEqual(len(features), 2)
+
+        feature = next(f for f in features if f['geometry']['coordinates'] == [-12.0, 14.5])
+        self.assertEqual(feature['geometry']['type'], 'Point')
+        self.assertEqual(list(feature['properties']), [
+            'id', 'libelle', 'description', 'nature', 'statut', 'statut_display',
+            'type_intervention', 'commune', 'thematique', 'indicateur',
+            'valeur_quantitative', 'date_intervention', 'date_creation',
+        ])
+        proprietes = feature['properties']
+        self.assertEqual(proprietes['statut_display'], 'Terminé')
+        self.assertEqual(proprietes['type_intervention'], 'Formation')
+        self.assertEqual(proprietes['commune'], 'Gathiary')
+        self.assertEqual(proprietes['thematique'], 'R1')
+        self.assertEqual(proprietes['date_intervention'], date.today().isoformat())
+
+    def test_projet_isole(self):
+        """Les entités d'un autre projet ne sont pas servies"""
+        autre = Projet.objects.create(
+            libelle='Autre', bailleurs='Bailleur',
+            date_debut=date.today(), date_fin=date.today() + timedelta(days=365),
+        )
+        self.assertEqual(json.loads(geojson_couche('interventions', autre.id))['features'], [])
+
+
+class PaginationGeojsonTest(ProjetCarteMixin, TestCase):
+    """Tests pour l'emprise, les dates et la pagination par curseur des interventions"""
+
+    def _features(self, **parametres):
+        return json.loads(geojson_couche('interventions', self.projet.id, **parametres))
+
+    def test_curseur(self):
+        """Les pages suivent l'id croissant ; next_after_id est null après la dernière"""
+        ids = sorted(Intervention.objects.filter(projet=self.projet).values_list('id', flat=True))
+
+        page = self._features(limite=1)
+        self.assertEqual([f['properties']['id'] for f in page['features']], ids[:1])
+        self.assertEqual(page['next_after_id'], ids[0])
+
+        page = self._features(limite=1, apres_id=page['next_after_id'])
+        self.assertEqual([f['properties']['id'] for f in page['features']], ids[1:])
+
+        page = self._features(limite=1, apres_id=ids[1])
+        self.assertEqual(page['features'], [])
+        self.assertIsNone(page['next_after_id'])
+
+    def test_intervalle_de_dates(self):
+        """date_debut et date_fin bornent date_intervention (inclusivement)"""
+        ancienne = Intervention.objects.filter(projet=self.projet).order_by('id').first()
+        Intervention.objects.filter(pk=ancienne.pk).update(date_intervention=date.today() - timedelta(days=30))
+        semaine = date.today() - timedelta(days=7)
+
+        self.assertEqual(len(self._features(date_debut=semaine)['features']), 1)
+        features = self._features(date_fin=semaine)['features']
+        self.assertEqual([f['properties']['id'] for f in features], [ancienne.id])
+        self.assertEqual(len(self._features(date_debut=date.today(), date_fin=date.today())['features']), 1)
+
+    def test_parametres_invalides(self):
+        """bbox, dates et curseur mal formés donnent une 400"""
+        url = reverse('api_interventions_geojson')
+        for parametres in ({'bbox': '-13,14'}, {'bbox': '-11,14,-13,15'}, {'date_debut': '2025-13-01'},
+                           {'limit': 'dix'}, {'after_id': '-1'}):
+            self.assertEqual(self.client.get(url, parametres).status_code, 400, parametres)
+
+
+class SortieCompacteTest(ProjetCarteMixin, TestCase):
+    """Tests pour la précision, la sélection des propriétés et le détail à la demande"""
+
+    def setUp(self):
+        super().setUp()
+        self.intervention = Intervention.objects.filter(projet=self.projet).order_by('id').first()
+        Intervention.objects.filter(pk=self.intervention.pk).update(
+            geom=Point(-12.123456789, 14.5, srid=4326), description='Description longue'
+        )
+
+    def test_precision_et_champs(self):
+        """Coordonnées arrondies et propriétés retenues (id toujours inclus)"""
+        url = reverse('api_interventions_geojson')
+        complet = self.client.get(url)
+        compact = self.client.get(url, {'precision': 2, 'fields': 'statut'})
+
+        feature = next(
+            f for f in json.loads(compact.content)['features'] if f['properties']['id'] == self.intervention.id
+        )
+        self.assertEqual(feature['geometry']['coordinates'], [-12.12, 14.5])
+        self.assertEqual(feature['properties'], {'id': self.intervention.id, 'statut': 'TERMINE'})
+        self.assertLess(len(compact.content), len(complet.content) / 2)
+
+    def test_parametres_invalides(self):
+        """Précision hors bornes ou propriété inconnue"""
+        url = reverse('api_interventions_geojson')
+        self.assertEqual(self.client.get(url, {'precision': 10}).status_code, 400)
+        reponse = self.client.get(url, {'fields': 'statut,inconnue'})
+        self.assertEqual(reponse.status_code, 400)
+        self.assertIn('inconnue', reponse.json()['error'])
+
+    def test_detail_entite(self):
+        """Le détail porte toutes les propriétés, pour les seules entités du projet"""
+        url = reverse('api_detail_entite', args=['interventions', self.intervention.id])
+        feature = json.loads(self.client.get(url).content)
+        self.assertEqual(feature['properties']['description'], 'Description longue')
+        self.assertEqual(feature['geometry']['coordinates'], [-12.123456789, 14.5])
+
+        self.assertEqual(
+            self.client.get(reverse('api_detail_entite', args=['interventions', 999999])).status_code, 404
+        )
+        self.assertEqual(
+            self.client.get(reverse('api_detail_entite', args=['inconnue', self.intervention.id])).status_code, 404
+        )
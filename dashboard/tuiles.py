@@ -0,0 +1,93 @@
+"""
+Génération des tuiles vectorielles (Mapbox Vector Tiles) des couches du projet.
+
+Les tuiles sont produites directement par PostGIS (ST_AsMVTGeom + ST_AsMVT) :
+seules les entités de l'emprise de la tuile sont lues (opérateur && sur
+l'index GiST de geom) et Django ne manipule que le binaire final.
+"""
+from __future__ import annotations
+
+from django.db import connection
+
+from .couches import definir_couche
+
+# Couches servies en tuiles et propriétés embarquées : celles du style et du
+# comptage uniquement, les popups chargent le détail à la demande
+# (api_detail_entite)
+COUCHES = {
+    'interventions': ('id', 'statut'),
+    'infrastructures': ('id', 'statut'),
+    'acteurs': ('id',),
+    'communes': ('id', 'nom', 'avancement'),
+    'admin2': ('id', 'nom'),
+    'admin4': ('id', 'nom'),
+    'admin5': ('id', 'nom'),
+    'admin7': ('id', 'nom'),
+    'admin8': ('id', 'nom'),
+}
+
+# Résolution interne des tuiles et marge (en unités de tuile) autour de l'emprise
+EXTENT = 4096
+MARGE = 64
+
+# Zoom maximal servi, et zoom en dessous duquel les points superposés sur
+# un même pixel de tuile ne sont envoyés qu'une fois
+ZOOM_MAX = 22
+ZOOM_DETAIL = 12
+
+
+def tuile_valide(z: int, x: int, y: int) -> bool:
+    """Vrai si (z, x, y) désigne une tuile existante du schéma XYZ."""
+    return 0 <= z <= ZOOM_MAX and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def generer_tuile(couche: str, projet_id: int, z: int, x: int, y: int,
+                  statut: str | None = None, commune_id: str | None = None) -> bytes:
+    """
+    Tuile MVT d'une couche du projet.
+
+    Args:
+        couche: Nom de la couche (clé de COUCHES, aussi nom du calque MVT)
+        projet_id: ID du projet
+        z, x, y: Coordonnées de la tuile (schéma XYZ)
+        statut: Filtre optionnel sur le statut
+        commune_id: Filtre optionnel sur la commune
+
+    Returns:
+        Tuile encodée en protobuf (vide si aucune entité)
+    """
+    definition = definir_couche(couche, projet_id, statut=statut, commune_id=commune_id)
+    proprietes = [p for p in definition['proprietes'] if p[0] in COUCHES[couche]]
+    colonnes = ', '.join(f"{expression} AS {connection.ops.quote_name(nom)}" for nom, expression, _ in proprietes)
+    params_colonnes = [param for _, _, params in proprietes for param in params]
+
+    # Aux petites échelles, un seul point par pixel de tuile
+    distinct = 'DISTINCT ON (mvt_geom)' if z < ZOOM_DETAIL else ''
+
+    sql = f"""
+        WITH entites AS (
+            SELECT {distinct}
+                ST_AsMVTGeom(ST_Transform(t.geom, 3857), ST_TileEnvelope(%s, %s, %s), %s, %s, true) AS mvt_geom,
+                {colonnes}
+            FROM {definition['source']}
+            WHERE t.geom && ST_Transform(ST_TileEnvelope(%s, %s, %s, margin => %s), 4326)
+              AND {' AND '.join(definition['conditions']) or 'TRUE'}
+        )
+        SELECT ST_AsMVT(entites.*, %s, %s, 'mvt_geom')
+        FROM entites
+        WHERE mvt_geom IS NOT NULL
+    """
+    params = [
+        z, x, y, EXTENT, MARGE,
+        *params_colonnes,
+        *definition['params_source'],
+        z, x, y, MARGE / EXTENT,
+        *definition['params_conditions'],
+        couche, EXTENT,
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        ligne = cursor.fetchone()
+
+    return bytes(ligne[0]) if ligne and ligne[0] else b''
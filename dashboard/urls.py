@@ -9,6 +9,9 @@ urlpatterns = [
     # Thématiques
     path('thematique/<int:thematique_id>/', views.thematique_detail_view, name='thematique_detail'),
 
+    # Évolution trimestrielle d'un indicateur (Chart.js)
+    path('api/indicateurs/<int:indicateur_id>/evolution/', views.api_evolution_indicateur, name='api_evolution_indicateur'),
+
     # Interventions
     path('interventions/', views.liste_interventions_view, name='liste_interventions'),
     path('interventions/creer/', views.creer_intervention_view, name='creer_intervention'),
@@ -18,10 +21,17 @@ urlpatterns = [
     path('carte/', views.carte_sig_view, name='carte_sig'),
 
     # API GeoJSON pour MapLibre
+    path('api/carte/amorcage/', views.api_carte_amorcage, name='api_carte_amorcage'),
+    path('api/carte/hors-ligne.mbtiles', views.api_carte_hors_ligne, name='api_carte_hors_ligne'),
     path('api/geojson/communes/', views.api_communes_geojson, name='api_communes_geojson'),
     path('api/geojson/interventions/', views.api_interventions_geojson, name='api_interventions_geojson'),
     path('api/geojson/infrastructures/', views.api_infrastructures_geojson, name='api_infrastructures_geojson'),
     path('api/geojson/acteurs/', views.api_acteurs_geojson, name='api_acteurs_geojson'),
+    path('api/clusters/<str:couche>/', views.api_clusters_geojson, name='api_clusters_geojson'),
+    path('api/couches/<str:couche>/<int:objet_id>/', views.api_detail_entite, name='api_detail_entite'),
+
+    # Tuiles vectorielles MVT (générées par PostGIS)
+    path('tiles/<str:couche>/<int:z>/<int:x>/<int:y>.pbf', views.api_tuile_mvt, name='api_tuile_mvt'),
 
     # Configuration du projet (wizard en 3 étapes)
     path('configuration/thematiques/', views.creer_thematiques_view, name='creer_thematiques'),
@@ -6,30 +6,64 @@ Ce module contient toutes les vues pour :
 - Gestion des thématiques et indicateurs
 - Gestion des interventions
 - API GeoJSON pour la cartographie
+
+Le projet actif et le rôle de l'utilisateur sont fournis par
+core.middleware.ProjetMiddleware (request.projet, request.projet_role).
 """
 from __future__ import annotations
 
 import json
 from datetime import date, datetime
-from typing import Any
+from typing import Any, Iterator
 
 from django.contrib import messages
 from django.contrib.auth import logout
 from django.contrib.auth.decorators import login_required
-from django.db.models import Avg, Sum
-from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.db import transaction
+from django.http import FileResponse, HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-
-from core.models import Projet
-from geo.models import Acteur, Infrastructure
-from referentiels.models import Commune, CommuneGeom, TypeIntervention
+from django.template.loader import render_to_string
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from core.cache import cache_projet, derniere_modification, etag_projet
+from core.compression import cache_compresse, reponse_compressee
+from core.middleware import ecriture_autorisee
+from core.pagination import page_keyset, taille_page
+from core.streaming import reponse_geojson_streaming
+from geo.models import ZoneProjet
+from geo.simplification import tolerance_pour_zoom, tolerance_stockee
+from referentiels.models import Commune, TypeIntervention
+from suivi.aggregations import (
+    calculer_avancement_global,
+    calculer_kpis_projet,
+    calculer_pourcentage,
+    calculer_stats_communes,
+    calculer_stats_indicateurs,
+    calculer_stats_thematiques,
+)
 from suivi.models import (
     CibleIndicateur,
     Indicateur,
     Intervention,
     Thematique,
-    ValeurIndicateur,
 )
+from suivi.syntheses import evolution_indicateur
+
+from .carte import calculer_amorcage
+from .couches import (
+    COUCHES,
+    COUCHES_PONCTUELLES,
+    PRECISION,
+    detail_entite,
+    features_couche,
+    geojson_clusters,
+    geojson_couche,
+    proprietes_couche,
+)
+from .hors_ligne import archive_obsolete, chemin_archive
+from .tuiles import COUCHES as COUCHES_MVT
+from .tuiles import ZOOM_MAX, generer_tuile, tuile_valide
 
 
 @login_required
@@ -44,127 +78,40 @@ def dashboard_home(request: HttpRequest) -> HttpResponse:
     - Statistiques par commune
 
     Args:
-        request: Requête HTTP avec projet_id en session
+        request: Requête HTTP (projet actif : request.projet)
 
     Returns:
         Page HTML du dashboard avec contexte des statistiques
     """
-    # Récupérer le projet depuis la session
-    projet_id = request.session.get('projet_id')
-
-    # Filtrer par projet si disponible
-    if projet_id:
-        projet = Projet.objects.get(id=projet_id)
-        interventions = Intervention.objects.filter(projet_id=projet_id)
-        indicateurs_filter = {'indicateur__projet_id': projet_id}
-
-        # KPI 1 : Interventions réalisées
-        interventions_realisees = interventions.filter(statut='TERMINE').count()
-
-        # Interventions réalisées ce mois
-        debut_mois = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        interventions_ce_mois = interventions.filter(
-            statut='TERMINE',
-            date_intervention__gte=debut_mois
-        ).count()
-
-        # KPI 2 : Bénéficiaires touchés (somme des valeur_quantitative des interventions terminées)
-        beneficiaires_touches = interventions.filter(statut='TERMINE').aggregate(
-            total=Sum('valeur_quantitative')
-        )['total'] or 0
-
-        # Statistiques par thématique
-        thematiques = Thematique.objects.filter(projet=projet).order_by('ordre')
-        thematiques_stats = []
-
-        for thematique in thematiques:
-            # Récupérer les indicateurs de cette thématique
-            indicateurs = Indicateur.objects.filter(thematique=thematique)
-
-            # Calculer la somme des cibles pour cette thématique (toutes communes confondues)
-            total_cible = CibleIndicateur.objects.filter(
-                indicateur__in=indicateurs,
-                annee=2025
-            ).aggregate(total=Sum('valeur_cible'))['total'] or 0
-
-            # Calculer la somme des réalisations depuis les interventions terminées
-            total_realise = Intervention.objects.filter(
-                indicateur__in=indicateurs,
-                statut='TERMINE'
-            ).aggregate(total=Sum('valeur_quantitative'))['total'] or 0
-
-            # Calculer le pourcentage
-            if total_cible > 0:
-                pourcentage = round((total_realise / total_cible) * 100, 1)
-            else:
-                pourcentage = 0
-
-            thematiques_stats.append({
-                'id': thematique.id,
-                'code': thematique.code,
-                'libelle': thematique.libelle,
-                'pourcentage': pourcentage,
-                'total_realise': total_realise,
-                'total_cible': total_cible,
-            })
+    projet = request.projet
+    if projet is None:
+        messages.error(request, "Aucun projet sélectionné.")
+        return redirect('liste_projets')
+    projet_id = projet.id
 
-        # KPI 3 : Avancement global (moyenne des pourcentages des thématiques)
-        if thematiques_stats:
-            avancement_global = round(
-                sum([t['pourcentage'] for t in thematiques_stats]) / len(thematiques_stats),
-                1
-            )
-        else:
-            avancement_global = 0
+    interventions = Intervention.objects.filter(projet_id=projet_id)
 
-        # Statistiques par commune
-        communes = Commune.objects.filter(
-            commune_projets__projet_id=projet_id
-        ).distinct().order_by('nom')
+    # KPIs, statistiques par thématique et par commune (requêtes groupées, en cache)
+    # Le mois courant fait partie de la clé des KPIs (interventions du mois)
+    kpis = cache_projet(
+        projet_id, 'kpis', lambda: calculer_kpis_projet(projet_id), date.today().strftime('%Y-%m')
+    )
 
-        communes_stats = []
-        for commune in communes:
-            # Interventions terminées dans cette commune
-            interventions_commune = interventions.filter(
-                commune=commune,
-                statut='TERMINE'
-            ).aggregate(total=Sum('valeur_quantitative'))['total'] or 0
+    thematiques_stats = cache_projet(
+        projet_id, 'stats:thematiques', lambda: calculer_stats_thematiques(projet_id)
+    )
 
-            # Cibles pour cette commune (somme des cibles par commune)
-            cibles_commune = CibleIndicateur.objects.filter(
-                indicateur__projet_id=projet_id,
-                commune=commune,
-                annee=2025
-            ).aggregate(total=Sum('valeur_cible'))['total'] or 0
-
-            if cibles_commune > 0:
-                pourcentage_commune = round((interventions_commune / cibles_commune) * 100, 1)
-            else:
-                pourcentage_commune = 0
-
-            communes_stats.append({
-                'nom': commune.nom,
-                'pourcentage': pourcentage_commune,
-                'realise': interventions_commune,
-                'cible': cibles_commune,
-            })
-
-    else:
-        interventions = Intervention.objects.all()
-        indicateurs_filter = {}
-        interventions_realisees = 0
-        interventions_ce_mois = 0
-        beneficiaires_touches = 0
-        avancement_global = 0
-        thematiques_stats = []
-        communes_stats = []
+    communes_stats = cache_projet(
+        projet_id, 'stats:communes', lambda: calculer_stats_communes(projet_id)
+    )
 
     # Statistiques générales (KPI)
     stats = {
-        'interventions_realisees': interventions_realisees,
-        'interventions_ce_mois': interventions_ce_mois,
-        'beneficiaires_touches': beneficiaires_touches,
-        'avancement_global': avancement_global,
+        'interventions_realisees': kpis['interventions_realisees'],
+        'interventions_ce_mois': kpis['interventions_ce_mois'],
+        'beneficiaires_touches': kpis['beneficiaires_touches'],
+        # KPI 3 : Avancement global (moyenne des pourcentages des thématiques)
+        'avancement_global': calculer_avancement_global(thematiques_stats),
     }
 
     # Activités récentes
@@ -191,48 +138,32 @@ def indicateurs_view(request: HttpRequest) -> HttpResponse:
     et pourcentages d'avancement.
 
     Args:
-        request: Requête HTTP avec projet_id en session
+        request: Requête HTTP (projet actif : request.projet)
 
     Returns:
         Page HTML listant les indicateurs
     """
-    # Récupérer le projet depuis la session
-    projet_id = request.session.get('projet_id')
-
-    # Récupérer les indicateurs du projet avec leurs thématiques
-    if projet_id:
-        indicateurs = Indicateur.objects.filter(projet_id=projet_id).select_related('thematique', 'projet')
-    else:
-        indicateurs = Indicateur.objects.select_related('thematique', 'projet').all()
-
-    # Calculer les valeurs actuelles pour chaque indicateur
-    def get_valeur_actuelle(indicateur: Indicateur) -> dict[str, Any]:
-        """Calculer la valeur actuelle d'un indicateur."""
-        derniere_valeur = ValeurIndicateur.objects.filter(
-            indicateur=indicateur
-        ).order_by('-date_mesure').first()
-
-        if derniere_valeur:
-            # Récupérer la cible (globale, sans commune spécifique)
-            cible = CibleIndicateur.objects.filter(
-                indicateur=indicateur,
-                commune__isnull=True
-            ).order_by('-annee').first()
+    projet = request.projet
+    if projet is None:
+        messages.error(request, "Aucun projet sélectionné.")
+        return redirect('liste_projets')
+    projet_id = projet.id
 
-            pourcentage = 0
-            if cible and cible.valeur_cible > 0:
-                pourcentage = round((float(derniere_valeur.valeur_realisee) / float(cible.valeur_cible)) * 100, 1)
-
-            return {
-                'valeur': derniere_valeur.valeur_realisee,
-                'pourcentage': pourcentage,
-                'periode': derniere_valeur.date_mesure.strftime('%d/%m/%Y')
-            }
-        return {'valeur': 0, 'pourcentage': 0, 'periode': 'Aucune donnée'}
+    # Indicateurs avec dernière valeur et cible globale annotées (une seule requête)
+    indicateurs = Indicateur.objects.with_current_values(projet_id).select_related(
+        'thematique', 'projet'
+    ).for_listing('thematique__description')
 
     # Enrichir les indicateurs avec leurs valeurs actuelles
     for indicateur in indicateurs:
-        indicateur.valeur_actuelle = get_valeur_actuelle(indicateur)
+        if indicateur.valeur_courante is not None:
+            indicateur.valeur_actuelle = {
+                'valeur': indicateur.valeur_courante,
+                'pourcentage': calculer_pourcentage(indicateur.valeur_courante, indicateur.cible_courante),
+                'periode': indicateur.date_valeur_courante.strftime('%d/%m/%Y'),
+            }
+        else:
+            indicateur.valeur_actuelle = {'valeur': 0, 'pourcentage': 0, 'periode': 'Aucune donnée'}
 
     context = {
         'indicateurs': indicateurs,
@@ -241,53 +172,154 @@ def indicateurs_view(request: HttpRequest) -> HttpResponse:
     return render(request, 'dashboard/indicateurs.html', context)
 
 
-@login_required
-def activites_view(request: HttpRequest) -> HttpResponse:
+def _filtres_interventions(request: HttpRequest) -> dict[str, Any]:
     """
-    Vue de gestion des activités/interventions.
+    Filtres serveur des listes d'interventions.
 
-    Permet de lister et filtrer les interventions par commune et statut.
+    Args:
+        request: Requête HTTP avec filtres GET (statut, commune, indicateur,
+            nature, du, au ; dates au format AAAA-MM-JJ)
+
+    Returns:
+        Critères à passer à QuerySet.filter()
+
+    Raises:
+        ValueError: Paramètre invalide
+    """
+    params = request.GET
+    filtres: dict[str, Any] = {}
+
+    if params.get('statut'):
+        if params['statut'] not in dict(Intervention.STATUT_CHOICES):
+            raise ValueError("Statut invalide")
+        filtres['statut'] = params['statut']
+    if params.get('nature'):
+        if params['nature'] not in dict(Intervention.TYPE_INTERVENTION_CHOICES):
+            raise ValueError("Nature invalide")
+        filtres['nature'] = params['nature']
+    for champ in ('commune', 'indicateur'):
+        if params.get(champ):
+            try:
+                filtres[f'{champ}_id'] = int(params[champ])
+            except ValueError:
+                raise ValueError(f"{champ.capitalize()} invalide") from None
+    if params.get('du'):
+        filtres['date_intervention__gte'] = date.fromisoformat(params['du'])
+    if params.get('au'):
+        filtres['date_intervention__lte'] = date.fromisoformat(params['au'])
+
+    return filtres
+
+
+def _intervention_json(intervention: Intervention) -> dict[str, Any]:
+    """Ligne d'une liste d'interventions pour la variante JSON"""
+    return {
+        'id': intervention.id,
+        'libelle': intervention.libelle,
+        'nature': intervention.nature,
+        'statut': intervention.statut,
+        'commune': intervention.commune.nom,
+        'type': intervention.type_intervention.libelle,
+        'indicateur': intervention.indicateur.code if intervention.indicateur_id else None,
+        'date_intervention': intervention.date_intervention.isoformat(),
+        'date_creation': intervention.date_creation.isoformat(),
+        'valeur': intervention.valeur_quantitative,
+    }
+
+
+def _liste_interventions(request: HttpRequest, interventions, gabarit: str,
+                         gabarit_lignes: str, cle: str, context: dict[str, Any]) -> HttpResponse:
+    """
+    Page filtrée d'une liste d'interventions (pagination par curseur).
+
+    Paramètres GET communs : filtres (_filtres_interventions), apres
+    (curseur de la page précédente), taille, format=json (page seule, avec
+    les lignes HTML rendues si lignes=1, pour le chargement progressif).
+    Le total (COUNT) n'est calculé que pour la première page.
 
     Args:
-        request: Requête HTTP avec filtres GET (commune, statut)
+        request: Requête HTTP
+        interventions: QuerySet de base (projet, select_related)
+        gabarit: Gabarit de la page complète
+        gabarit_lignes: Gabarit des lignes du tableau
+        cle: Nom de la liste dans le contexte des gabarits
+        context: Contexte de la page complète
 
     Returns:
-        Page HTML listant les activités avec filtres
+        Page HTML, ou JSON {interventions, suivant[, lignes]}
     """
-    # Récupérer le projet depuis la session
-    projet_id = request.session.get('projet_id')
+    en_json = request.GET.get('format') == 'json'
+    premiere_page = not request.GET.get('apres')
+    try:
+        filtres = _filtres_interventions(request)
+        lignes, suivant = page_keyset(interventions.filter(**filtres), request.GET.get('apres'),
+                                      taille_page(request.GET.get('taille')))
+    except ValueError as e:
+        if en_json:
+            return JsonResponse({'error': str(e)}, status=400)
+        messages.error(request, f"Filtre ignoré : {e}")
+        filtres = {}
+        premiere_page = True
+        lignes, suivant = page_keyset(interventions)
+
+    if en_json:
+        data = {'interventions': [_intervention_json(i) for i in lignes], 'suivant': suivant}
+        if request.GET.get('lignes'):
+            data['lignes'] = render_to_string(gabarit_lignes, {cle: lignes}, request=request)
+        return JsonResponse(data)
+
+    # Paramètres des filtres actifs, repris par le chargement progressif
+    params = request.GET.copy()
+    for nom in ('apres', 'format', 'lignes'):
+        params.pop(nom, None)
+
+    context.update({
+        cle: lignes,
+        'suivant': suivant,
+        'total': interventions.filter(**filtres).count() if premiere_page else None,
+        'params_filtres': params.urlencode(),
+    })
+    return render(request, gabarit, context)
 
-    # Filtres
-    commune_filter = request.GET.get('commune')
-    statut_filter = request.GET.get('statut')
 
-    # Base queryset filtré par projet
-    if projet_id:
-        activites = Intervention.objects.filter(projet_id=projet_id).select_related('commune', 'type_intervention', 'projet')
-    else:
-        activites = Intervention.objects.select_related('commune', 'type_intervention', 'projet').all()
+@login_required
+def activites_view(request: HttpRequest) -> HttpResponse:
+    """
+    Vue de gestion des activités/interventions.
 
-    if commune_filter:
-        activites = activites.filter(commune_id=commune_filter)
+    Permet de lister et filtrer les interventions par commune, statut,
+    nature et période, par pages de taille fixe (voir _liste_interventions).
 
-    if statut_filter:
-        activites = activites.filter(statut=statut_filter)
+    Args:
+        request: Requête HTTP avec filtres GET (commune, statut, nature, du, au)
 
-    activites = activites.order_by('-date_creation')
+    Returns:
+        Page HTML listant les activités avec filtres, ou page JSON
+    """
+    projet = request.projet
+    if projet is None:
+        messages.error(request, "Aucun projet sélectionné.")
+        return redirect('liste_projets')
 
-    # Pour les filtres
-    communes = Commune.objects.all()
-    statuts = Intervention.STATUT_CHOICES
+    activites = Intervention.objects.filter(projet=projet).select_related(
+        'commune', 'type_intervention', 'projet', 'indicateur'
+    )
+    # Colonnes lourdes différées, sauf celles affichées par la liste
+    activites = activites.for_listing('description', 'geom')
 
     context = {
-        'activites': activites,
-        'communes': communes,
-        'statuts': statuts,
-        'commune_filter': commune_filter,
-        'statut_filter': statut_filter,
+        'communes': Commune.objects.all(),
+        'statuts': Intervention.STATUT_CHOICES,
+        'natures': Intervention.TYPE_INTERVENTION_CHOICES,
+        'commune_filter': request.GET.get('commune'),
+        'statut_filter': request.GET.get('statut'),
+        'nature_filter': request.GET.get('nature'),
+        'du_filter': request.GET.get('du'),
+        'au_filter': request.GET.get('au'),
     }
 
-    return render(request, 'dashboard/activites.html', context)
+    return _liste_interventions(request, activites, 'dashboard/activites.html',
+                                'dashboard/_lignes_activites.html', 'activites', context)
 
 
 @login_required
@@ -304,14 +336,11 @@ def creer_thematiques_view(request: HttpRequest) -> HttpResponse:
     Returns:
         Page HTML de gestion ou redirection après action
     """
-    projet_id = request.session.get('projet_id')
-
-    if not projet_id:
+    projet = request.projet
+    if projet is None:
         messages.error(request, "Aucun projet sélectionné.")
         return redirect('liste_projets')
 
-    projet = Projet.objects.get(id=projet_id)
-
     # Récupérer les thématiques existantes
     thematiques_existantes = Thematique.objects.filter(
         projet=projet
@@ -396,18 +425,15 @@ def menu_configuration_view(request: HttpRequest) -> HttpResponse:
     et indicateurs déjà créés.
 
     Args:
-        request: Requête HTTP avec projet_id en session
+        request: Requête HTTP (projet actif : request.projet)
 
     Returns:
         Page HTML du menu de configuration
     """
-    projet_id = request.session.get('projet_id')
-
-    if not projet_id:
+    projet = request.projet
+    if projet is None:
         messages.error(request, "Aucun projet sélectionné.")
         return redirect('liste_projets')
-
-    projet = Projet.objects.get(id=projet_id)
     thematiques = Thematique.objects.filter(projet=projet)
     indicateurs = Indicateur.objects.filter(projet=projet)
 
@@ -434,13 +460,10 @@ def configurer_indicateurs_view(request: HttpRequest) -> HttpResponse:
     Returns:
         Page HTML de gestion ou redirection après action
     """
-    projet_id = request.session.get('projet_id')
-
-    if not projet_id:
+    projet = request.projet
+    if projet is None:
         messages.error(request, "Aucun projet sélectionné.")
         return redirect('liste_projets')
-
-    projet = Projet.objects.get(id=projet_id)
     thematiques = Thematique.objects.filter(projet=projet).order_by('code')
 
     # Récupérer les indicateurs existants avec leurs cibles
@@ -554,14 +577,11 @@ def configurer_parametres_view(request: HttpRequest) -> HttpResponse:
     Returns:
         Page HTML des paramètres ou redirection vers dashboard
     """
-    projet_id = request.session.get('projet_id')
-
-    if not projet_id:
+    projet = request.projet
+    if projet is None:
         messages.error(request, "Aucun projet sélectionné.")
         return redirect('liste_projets')
 
-    projet = Projet.objects.get(id=projet_id)
-
     if request.method == 'POST':
         messages.success(request, "Configuration du projet terminée !")
         return redirect('dashboard_home')
@@ -576,30 +596,34 @@ def configurer_parametres_view(request: HttpRequest) -> HttpResponse:
 @login_required
 def liste_interventions_view(request: HttpRequest) -> HttpResponse:
     """
-    Liste des interventions du projet.
+    Liste des interventions du projet, filtrée et paginée par curseur.
 
     Args:
-        request: Requête HTTP avec projet_id en session
+        request: Requête HTTP avec filtres GET (projet actif : request.projet)
+            (statut, commune, indicateur, nature, du, au)
 
     Returns:
-        Page HTML listant les interventions
+        Page HTML listant les interventions, ou page JSON (format=json)
     """
-    projet_id = request.session.get('projet_id')
-    if not projet_id:
+    projet = request.projet
+    if projet is None:
         messages.error(request, "Aucun projet sélectionné.")
         return redirect('liste_projets')
-
-    projet = Projet.objects.get(id=projet_id)
     interventions = Intervention.objects.filter(projet=projet).select_related(
         'indicateur', 'commune', 'type_intervention'
-    ).order_by('-date_creation')
+    ).for_listing()
 
     context = {
         'projet': projet,
-        'interventions': interventions,
+        'communes': Commune.objects.filter(commune_projets__projet=projet).order_by('nom'),
+        'indicateurs': Indicateur.objects.filter(projet=projet).only('id', 'code', 'libelle').order_by('code'),
+        'statuts': Intervention.STATUT_CHOICES,
+        'natures': Intervention.TYPE_INTERVENTION_CHOICES,
+        'filtres': request.GET,
     }
 
-    return render(request, 'dashboard/liste_interventions.html', context)
+    return _liste_interventions(request, interventions, 'dashboard/liste_interventions.html',
+                                'dashboard/_lignes_interventions.html', 'interventions', context)
 
 
 @login_required
@@ -616,12 +640,13 @@ def creer_intervention_view(request: HttpRequest) -> HttpResponse:
     Returns:
         Page HTML du formulaire ou redirection après création
     """
-    projet_id = request.session.get('projet_id')
-    if not projet_id:
+    projet = request.projet
+    if projet is None:
         messages.error(request, "Aucun projet sélectionné.")
         return redirect('liste_projets')
-
-    projet = Projet.objects.get(id=projet_id)
+    if not ecriture_autorisee(request):
+        messages.error(request, "Votre rôle sur ce projet ne permet pas de créer d'intervention.")
+        return redirect('liste_interventions')
 
     if request.method == 'POST':
         # Récupérer les données du formulaire
@@ -634,20 +659,21 @@ def creer_intervention_view(request: HttpRequest) -> HttpResponse:
         type_intervention_id = request.POST.get('type_intervention')
         type_intervention = get_object_or_404(TypeIntervention, id=type_intervention_id)
 
-        # Créer l'intervention
-        intervention = Intervention.objects.create(
-            projet=projet,
-            indicateur=indicateur,
-            commune=commune,
-            type_intervention=type_intervention,
-            libelle=request.POST.get('libelle'),
-            description=request.POST.get('description', ''),
-            nature=request.POST.get('nature', 'ACTIVITE'),
-            valeur_quantitative=request.POST.get('valeur_quantitative') or 1,
-            date_intervention=request.POST.get('date_intervention') or date.today(),
-            statut='PROGRAMME',
-            cree_par=request.user
-        )
+        # Créer l'intervention (la table de progression est mise à jour dans la même transaction)
+        with transaction.atomic():
+            intervention = Intervention.objects.create(
+                projet=projet,
+                indicateur=indicateur,
+                commune=commune,
+                type_intervention=type_intervention,
+                libelle=request.POST.get('libelle'),
+                description=request.POST.get('description', ''),
+                nature=request.POST.get('nature', 'ACTIVITE'),
+                valeur_quantitative=request.POST.get('valeur_quantitative') or 1,
+                date_intervention=request.POST.get('date_intervention') or date.today(),
+                statut='PROGRAMME',
+                cree_par=request.user
+            )
 
         messages.success(request, f"Intervention '{intervention.libelle}' créée avec succès.")
         return redirect('liste_interventions')
@@ -679,46 +705,22 @@ def thematique_detail_view(request: HttpRequest, thematique_id: int) -> HttpResp
     Returns:
         Page HTML avec détails de la thématique
     """
-    projet_id = request.session.get('projet_id')
-    if not projet_id:
+    projet = request.projet
+    if projet is None:
         messages.error(request, "Aucun projet sélectionné.")
         return redirect('liste_projets')
-
-    projet = Projet.objects.get(id=projet_id)
+    projet_id = projet.id
     thematique = get_object_or_404(Thematique, id=thematique_id, projet=projet)
 
     # Récupérer les indicateurs de cette thématique avec leurs statistiques
-    indicateurs = Indicateur.objects.filter(thematique=thematique).order_by('ordre', 'code')
-
-    indicateurs_stats = []
-    for indicateur in indicateurs:
-        # Cible globale
-        cible = CibleIndicateur.objects.filter(
-            indicateur=indicateur,
-            commune__isnull=True,
-            annee=2025
-        ).first()
-
-        # Réalisations depuis les interventions terminées
-        total_realise = Intervention.objects.filter(
-            indicateur=indicateur,
-            statut='TERMINE'
-        ).aggregate(total=Sum('valeur_quantitative'))['total'] or 0
-
-        valeur_cible = cible.valeur_cible if cible else 0
-        pourcentage = round((total_realise / valeur_cible) * 100, 1) if valeur_cible > 0 else 0
-
-        indicateurs_stats.append({
-            'indicateur': indicateur,
-            'cible': valeur_cible,
-            'realise': total_realise,
-            'pourcentage': pourcentage,
-        })
+    indicateurs_stats = cache_projet(
+        projet_id, 'stats:indicateurs', lambda: calculer_stats_indicateurs(thematique), thematique.id
+    )
 
     # Interventions de cette thématique
     interventions = Intervention.objects.filter(
         indicateur__thematique=thematique
-    ).select_related('indicateur', 'commune', 'type_intervention').order_by('-date_intervention')[:20]
+    ).select_related('indicateur', 'commune', 'type_intervention').for_listing().order_by('-date_intervention')[:20]
 
     context = {
         'projet': projet,
@@ -745,29 +747,28 @@ def changer_statut_intervention_view(request: HttpRequest, intervention_id: int)
     if request.method != 'POST':
         return JsonResponse({'success': False, 'error': 'Méthode non autorisée'}, status=405)
 
-    projet_id = request.session.get('projet_id')
-    if not projet_id:
-        return JsonResponse({'success': False, 'error': 'Aucun projet sélectionné'}, status=403)
+    if not ecriture_autorisee(request):
+        return JsonResponse({'success': False, 'error': 'Modification non autorisée sur ce projet'}, status=403)
 
     try:
-        projet = Projet.objects.get(id=projet_id)
-        intervention = get_object_or_404(Intervention, id=intervention_id, projet=projet)
-
-        data = json.loads(request.body)
-        nouveau_statut = data.get('statut')
-
-        # Valider le statut
-        statuts_valides = ['PROGRAMME', 'TERMINE', 'ANNULEE']
-        if nouveau_statut not in statuts_valides:
-            return JsonResponse({'success': False, 'error': 'Statut invalide'}, status=400)
-
+        nouveau_statut = json.loads(request.body).get('statut')
+    except (ValueError, AttributeError):
+        return JsonResponse({'success': False, 'error': 'Corps JSON invalide'}, status=400)
+
+    # Valider le statut
+    statuts_valides = ['PROGRAMME', 'TERMINE', 'ANNULEE']
+    if nouveau_statut not in statuts_valides:
+        return JsonResponse({'success': False, 'error': 'Statut invalide'}, status=400)
+
+    # Verrouiller la ligne : statut et table de progression changent ensemble
+    with transaction.atomic():
+        intervention = get_object_or_404(
+            Intervention.objects.select_for_update(), id=intervention_id, projet=request.projet
+        )
         intervention.statut = nouveau_statut
         intervention.save()
 
-        return JsonResponse({'success': True, 'message': 'Statut mis à jour'})
-
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+    return JsonResponse({'success': True, 'message': 'Statut mis à jour'})
 
 
 def logout_view(request: HttpRequest) -> HttpResponse:
@@ -796,42 +797,33 @@ def carte_sig_view(request: HttpRequest) -> HttpResponse:
     Affiche la carte interactive avec les couches géospatiales du projet.
 
     Args:
-        request: Requête HTTP avec projet_id en session
+        request: Requête HTTP (projet actif : request.projet)
 
     Returns:
         Page HTML de la cartographie SIG
     """
-    projet_id = request.session.get('projet_id')
-    if not projet_id:
+    projet = request.projet
+    if projet is None:
         messages.error(request, "Aucun projet sélectionné.")
         return redirect('liste_projets')
-
-    projet = Projet.objects.get(id=projet_id)
-
-    # Calculer le centre de la zone d'intervention
-    communes_geom = CommuneGeom.objects.filter(
-        commune__commune_projets__projet=projet
-    )
+    projet_id = projet.id
 
     # Centre par défaut sur Kéniéba (Sénégal)
     center_lng = -11.75
     center_lat = 13.05
+    emprise = None
 
-    if communes_geom.exists():
-        # Calculer le centroïde de toutes les communes du projet
-        centroid = communes_geom.aggregate(
-            avg_lng=Avg('centroide__x'),
-            avg_lat=Avg('centroide__y')
-        )
-
-        if centroid['avg_lng'] and centroid['avg_lat']:
-            center_lng = centroid['avg_lng']
-            center_lat = centroid['avg_lat']
+    # Zone d'intervention matérialisée (geo.ZoneProjet) : centre et emprise initiaux
+    zone = ZoneProjet.objects.filter(projet_id=projet_id).only('centroid', 'emprise').first()
+    if zone:
+        center_lng, center_lat = zone.centroid.x, zone.centroid.y
+        emprise = list(zone.emprise.extent)
 
     context = {
         'projet': projet,
         'center_lng': center_lng,
         'center_lat': center_lat,
+        'emprise': emprise,
     }
 
     return render(request, 'dashboard/carte_sig.html', context)
@@ -840,234 +832,514 @@ def carte_sig_view(request: HttpRequest) -> HttpResponse:
 # ========================================
 # API GEOJSON POUR MAPLIBRE
 # ========================================
+# Les FeatureCollection sont construites par PostgreSQL (dashboard.couches)
+# et renvoyées telles quelles, sans passer par des objets Python.
+# ETag / Last-Modified dérivent de la version du projet (core.cache) : une
+# requête If-None-Match à jour reçoit un 304 sans lecture des tables.
+# Les couches complètes sont mises en cache déjà compressées (gzip, Brotli)
+# et servies selon Accept-Encoding (core.compression). Les pages filtrées
+# par emprise ou parcourues par curseur, qui changent à chaque requête,
+# sont diffusées au fil de la lecture d'un curseur serveur (core.streaming).
+
+# Nombre maximal d'entités par page des API GeoJSON paginées
+LIMITE_GEOJSON_MAX = 5000
+
+
+def _parametre_entier(valeur: str | None) -> int | None:
+    """Entier positif d'un paramètre GET (None si absent)."""
+    if not valeur:
+        return None
+    if not valeur.isdigit():
+        raise ValueError(f"Entier attendu : {valeur}")
+    return int(valeur)
+
+
+def _parametre_date(valeur: str | None) -> date | None:
+    """Date AAAA-MM-JJ d'un paramètre GET (None si absente)."""
+    if not valeur:
+        return None
+    try:
+        return date.fromisoformat(valeur)
+    except ValueError:
+        raise ValueError(f"Date invalide (AAAA-MM-JJ attendu) : {valeur}")
+
+
+def _parametre_bbox(valeur: str | None) -> tuple[float, float, float, float] | None:
+    """Emprise "lon_min,lat_min,lon_max,lat_max" d'un paramètre GET (None si absente)."""
+    if not valeur:
+        return None
+    try:
+        lon_min, lat_min, lon_max, lat_max = (float(v) for v in valeur.split(','))
+    except ValueError:
+        raise ValueError("bbox attendu : lon_min,lat_min,lon_max,lat_max")
+    if lon_min > lon_max or lat_min > lat_max:
+        raise ValueError("bbox invalide : minimum supérieur au maximum")
+    return lon_min, lat_min, lon_max, lat_max
+
+
+def _parametres_sortie(request: HttpRequest, couche: str) -> dict[str, Any]:
+    """
+    Format de sortie GeoJSON demandé : precision (décimales, 0 à 9) et
+    fields (propriétés retenues, séparées par des virgules).
+
+    Raises:
+        ValueError: Précision hors bornes ou propriété inconnue
+    """
+    precision = _parametre_entier(request.GET.get('precision'))
+    if precision is not None and precision > PRECISION:
+        raise ValueError(f"precision attendue entre 0 et {PRECISION}")
+    champs = [nom.strip() for nom in request.GET.get('fields', '').split(',') if nom.strip()]
+    inconnus = set(champs) - set(proprietes_couche(couche))
+    if inconnus:
+        raise ValueError(f"Propriétés inconnues : {', '.join(sorted(inconnus))}")
+    return {
+        'precision': PRECISION if precision is None else precision,
+        'champs': tuple(champs) or None,
+    }
+
+
+def _flux_geojson(couche: str, projet_id: int, limite: int | None, apres_id: int | None,
+                  filtres: dict[str, Any]) -> StreamingHttpResponse:
+    """
+    FeatureCollection d'une couche diffusée au fil de l'eau (non mise en cache).
+
+    filtres est transmis à features_couche (tolérance, filtres, precision,
+    champs).
+
+    Le membre next_after_id (pagination) est écrit après la dernière feature,
+    d'après les entités effectivement envoyées.
+    """
+    envoyees = {'nombre': 0, 'dernier_id': None}
+
+    def features() -> Iterator[str]:
+        for id_entite, feature in features_couche(couche, projet_id, limite=limite, apres_id=apres_id, **filtres):
+            envoyees['nombre'] += 1
+            envoyees['dernier_id'] = id_entite
+            yield feature
+
+    def pied() -> dict[str, Any]:
+        if limite is None and apres_id is None:
+            return {}
+        complete = limite is not None and envoyees['nombre'] >= limite
+        return {'next_after_id': envoyees['dernier_id'] if complete else None}
+
+    return reponse_geojson_streaming(features(), pied)
+
 
 @login_required
-def api_communes_geojson(request: HttpRequest) -> JsonResponse:
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=etag_projet, last_modified_func=derniere_modification)
+def api_communes_geojson(request: HttpRequest) -> HttpResponse:
     """
     API GeoJSON pour les communes du projet.
 
     Retourne les géométries des communes avec leurs statistiques
-    (interventions, bénéficiaires, avancement).
+    (interventions, bénéficiaires, avancement). Les paramètres zoom ou
+    tolerance (degrés) sélectionnent un contour simplifié précalculé ;
+    precision et fields allègent la réponse (voir _parametres_sortie).
 
     Args:
-        request: Requête HTTP avec projet_id en session
+        request: Requête HTTP avec filtres GET optionnels (zoom, tolerance,
+            precision, fields)
 
     Returns:
         GeoJSON FeatureCollection des communes
     """
-    projet_id = request.session.get('projet_id')
-    if not projet_id:
+    projet = request.projet
+    if projet is None:
         return JsonResponse({'error': 'Aucun projet sélectionné'}, status=403)
+    projet_id = projet.id
 
-    # Récupérer les géométries des communes du projet
-    communes_geom = CommuneGeom.objects.filter(
-        commune__commune_projets__projet_id=projet_id
-    ).select_related('commune')
-
-    features = []
-    for commune_geom in communes_geom:
-        # Statistiques de la commune
-        interventions_count = Intervention.objects.filter(
-            projet_id=projet_id,
-            commune=commune_geom.commune,
-            statut='TERMINE'
-        ).count()
-
-        beneficiaires = Intervention.objects.filter(
-            projet_id=projet_id,
-            commune=commune_geom.commune,
-            statut='TERMINE'
-        ).aggregate(total=Sum('valeur_quantitative'))['total'] or 0
-
-        cibles = CibleIndicateur.objects.filter(
-            indicateur__projet_id=projet_id,
-            commune=commune_geom.commune,
-            annee=2025
-        ).aggregate(total=Sum('valeur_cible'))['total'] or 0
-
-        feature = {
-            'type': 'Feature',
-            'geometry': json.loads(commune_geom.geom.geojson) if commune_geom.geom else None,
-            'properties': {
-                'id': commune_geom.commune.id,
-                'nom': commune_geom.commune.nom,
-                'code_commune': commune_geom.commune.code_commune,
-                'departement': commune_geom.commune.departement,
-                'region': commune_geom.commune.region,
-                'interventions_count': interventions_count,
-                'beneficiaires': int(beneficiaires),
-                'cibles': int(cibles),
-                'avancement': round((beneficiaires / cibles * 100), 1) if cibles > 0 else 0,
-            }
-        }
-        features.append(feature)
+    try:
+        if request.GET.get('tolerance'):
+            tolerance = tolerance_stockee(float(request.GET['tolerance']))
+        elif request.GET.get('zoom'):
+            tolerance = tolerance_pour_zoom(float(request.GET['zoom']))
+        else:
+            tolerance = None
+    except ValueError:
+        return JsonResponse({'error': 'zoom ou tolerance invalide'}, status=400)
 
-    geojson = {
-        'type': 'FeatureCollection',
-        'features': features
-    }
+    try:
+        sortie = _parametres_sortie(request, 'communes')
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    variantes = cache_compresse(
+        projet_id, 'geojson:communes',
+        lambda: geojson_couche('communes', projet_id, tolerance, **sortie),
+        tolerance, *sortie.values(),
+    )
 
-    return JsonResponse(geojson, safe=False)
+    return reponse_compressee(request, variantes, etag=etag_projet(request))
 
 
 @login_required
-def api_interventions_geojson(request: HttpRequest) -> JsonResponse:
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=etag_projet, last_modified_func=derniere_modification)
+def api_interventions_geojson(request: HttpRequest) -> HttpResponse:
     """
     API GeoJSON pour les interventions du projet.
 
     Retourne les points des interventions géolocalisées avec filtres optionnels.
+    bbox restreint à l'emprise affichée (index GiST) ; limit et after_id
+    permettent de parcourir de grands volumes page par page (curseur sur l'id,
+    voir le membre next_after_id de la réponse).
 
     Args:
-        request: Requête HTTP avec filtres GET (statut, commune_id)
+        request: Requête HTTP avec filtres GET (statut, commune_id, bbox
+            "lon_min,lat_min,lon_max,lat_max", date_debut, date_fin
+            AAAA-MM-JJ, limit, after_id) et de format (precision, fields)
 
     Returns:
         GeoJSON FeatureCollection des interventions
     """
-    projet_id = request.session.get('projet_id')
-    if not projet_id:
+    projet = request.projet
+    if projet is None:
         return JsonResponse({'error': 'Aucun projet sélectionné'}, status=403)
+    projet_id = projet.id
 
     # Filtres optionnels
     statut = request.GET.get('statut')
     commune_id = request.GET.get('commune_id')
 
-    interventions = Intervention.objects.filter(
-        projet_id=projet_id,
-        geom__isnull=False
-    ).select_related('commune', 'type_intervention', 'indicateur__thematique')
-
-    if statut:
-        interventions = interventions.filter(statut=statut)
-
-    if commune_id:
-        interventions = interventions.filter(commune_id=commune_id)
-
-    features = []
-    for intervention in interventions:
-        feature = {
-            'type': 'Feature',
-            'geometry': json.loads(intervention.geom.geojson),
-            'properties': {
-                'id': intervention.id,
-                'libelle': intervention.libelle,
-                'description': intervention.description,
-                'nature': intervention.nature,
-                'statut': intervention.statut,
-                'statut_display': intervention.get_statut_display(),
-                'type_intervention': intervention.type_intervention.libelle if intervention.type_intervention else None,
-                'commune': intervention.commune.nom if intervention.commune else None,
-                'thematique': intervention.indicateur.thematique.code if intervention.indicateur and intervention.indicateur.thematique else None,
-                'indicateur': intervention.indicateur.libelle if intervention.indicateur else None,
-                'valeur_quantitative': int(intervention.valeur_quantitative),
-                'date_intervention': intervention.date_intervention.strftime('%Y-%m-%d') if intervention.date_intervention else None,
-                'date_creation': intervention.date_creation.strftime('%Y-%m-%d'),
-            }
-        }
-        features.append(feature)
-
-    geojson = {
-        'type': 'FeatureCollection',
-        'features': features
+    try:
+        bbox = _parametre_bbox(request.GET.get('bbox'))
+        date_debut = _parametre_date(request.GET.get('date_debut'))
+        date_fin = _parametre_date(request.GET.get('date_fin'))
+        limite = _parametre_entier(request.GET.get('limit'))
+        apres_id = _parametre_entier(request.GET.get('after_id'))
+        sortie = _parametres_sortie(request, 'interventions')
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    if limite is not None:
+        limite = min(max(limite, 1), LIMITE_GEOJSON_MAX)
+
+    filtres = {
+        'statut': statut, 'commune_id': commune_id, 'bbox': bbox,
+        'date_debut': date_debut, 'date_fin': date_fin, **sortie,
     }
 
-    return JsonResponse(geojson, safe=False)
+    # Emprises et pages varient à chaque déplacement de carte : pas de mise
+    # en cache, la réponse est diffusée au fil de la lecture
+    if bbox or limite is not None or apres_id is not None:
+        return _flux_geojson('interventions', projet_id, limite, apres_id, filtres)
+
+    variantes = cache_compresse(
+        projet_id, 'geojson:interventions',
+        lambda: geojson_couche('interventions', projet_id, **filtres),
+        statut, commune_id, date_debut, date_fin, *sortie.values(),
+    )
+
+    return reponse_compressee(request, variantes, etag=etag_projet(request))
 
 
 @login_required
-def api_infrastructures_geojson(request: HttpRequest) -> JsonResponse:
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=etag_projet, last_modified_func=derniere_modification)
+def api_infrastructures_geojson(request: HttpRequest) -> HttpResponse:
     """
     API GeoJSON pour les infrastructures du projet.
 
     Retourne les points des infrastructures (forages, écoles, etc.).
 
     Args:
-        request: Requête HTTP avec projet_id en session
+        request: Requête HTTP (projet actif : request.projet ; precision, fields optionnels)
 
     Returns:
         GeoJSON FeatureCollection des infrastructures
     """
-    projet_id = request.session.get('projet_id')
-    if not projet_id:
+    projet = request.projet
+    if projet is None:
         return JsonResponse({'error': 'Aucun projet sélectionné'}, status=403)
+    projet_id = projet.id
 
-    infrastructures = Infrastructure.objects.filter(
-        projet_id=projet_id,
-        geom__isnull=False
-    ).select_related('commune', 'type_infrastructure')
-
-    features = []
-    for infra in infrastructures:
-        feature = {
-            'type': 'Feature',
-            'geometry': json.loads(infra.geom.geojson),
-            'properties': {
-                'id': infra.id,
-                'libelle': infra.libelle,
-                'type': infra.type_infrastructure.libelle if infra.type_infrastructure else None,
-                'commune': infra.commune.nom if infra.commune else None,
-                'statut': infra.statut,
-                'statut_display': infra.get_statut_display(),
-                'nb_beneficiaires': infra.nb_beneficiaires,
-                'cout_construction': float(infra.cout_construction) if infra.cout_construction else None,
-                'date_construction': infra.date_construction.strftime('%Y-%m-%d') if infra.date_construction else None,
-            }
-        }
-        features.append(feature)
-
-    geojson = {
-        'type': 'FeatureCollection',
-        'features': features
-    }
+    try:
+        sortie = _parametres_sortie(request, 'infrastructures')
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    variantes = cache_compresse(
+        projet_id, 'geojson:infrastructures',
+        lambda: geojson_couche('infrastructures', projet_id, **sortie),
+        *sortie.values(),
+    )
 
-    return JsonResponse(geojson, safe=False)
+    return reponse_compressee(request, variantes, etag=etag_projet(request))
 
 
 @login_required
-def api_acteurs_geojson(request: HttpRequest) -> JsonResponse:
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=etag_projet, last_modified_func=derniere_modification)
+def api_acteurs_geojson(request: HttpRequest) -> HttpResponse:
     """
     API GeoJSON pour les acteurs du projet.
 
     Retourne les points des acteurs/organisations (groupements, coopératives, etc.).
 
     Args:
-        request: Requête HTTP avec projet_id en session
+        request: Requête HTTP (projet actif : request.projet ; precision, fields optionnels)
 
     Returns:
         GeoJSON FeatureCollection des acteurs
     """
-    projet_id = request.session.get('projet_id')
-    if not projet_id:
+    projet = request.projet
+    if projet is None:
         return JsonResponse({'error': 'Aucun projet sélectionné'}, status=403)
+    projet_id = projet.id
 
-    acteurs = Acteur.objects.filter(
-        projet_id=projet_id,
-        geom__isnull=False
-    ).select_related('commune', 'type_acteur')
-
-    features = []
-    for acteur in acteurs:
-        feature = {
-            'type': 'Feature',
-            'geometry': json.loads(acteur.geom.geojson),
-            'properties': {
-                'id': acteur.id,
-                'libelle': acteur.libelle,
-                'type': acteur.type_acteur.libelle if acteur.type_acteur else None,
-                'commune': acteur.commune.nom if acteur.commune else None,
-                'nb_adherents': acteur.nb_adherents,
-                'nb_femmes': acteur.nb_femmes,
-                'nb_hommes': acteur.nb_hommes,
-                'nb_jeunes': acteur.nb_jeunes,
-                'responsable': acteur.responsable,
-                'telephone': acteur.telephone,
-                'email': acteur.email,
-            }
-        }
-        features.append(feature)
+    try:
+        sortie = _parametres_sortie(request, 'acteurs')
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    variantes = cache_compresse(
+        projet_id, 'geojson:acteurs',
+        lambda: geojson_couche('acteurs', projet_id, **sortie),
+        *sortie.values(),
+    )
 
-    geojson = {
-        'type': 'FeatureCollection',
-        'features': features
-    }
+    return reponse_compressee(request, variantes, etag=etag_projet(request))
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=etag_projet, last_modified_func=derniere_modification)
+def api_carte_amorcage(request: HttpRequest) -> HttpResponse:
+    """
+    API d'amorçage de la carte : communes, emprise et KPIs en un document.
+
+    Le document est précalculé, compressé et mis en cache par projet, zoom
+    et mois (KPI des interventions du mois). Le navigateur le revalide par
+    ETag : 304 sans nouveau transfert tant que le projet n'a pas changé.
+
+    Args:
+        request: Requête HTTP avec zoom optionnel
+
+    Returns:
+        JSON {extent, kpis, communes}
+    """
+    projet = request.projet
+    if projet is None:
+        return JsonResponse({'error': 'Aucun projet sélectionné'}, status=403)
+    projet_id = projet.id
+
+    try:
+        tolerance = tolerance_pour_zoom(float(request.GET['zoom'])) if request.GET.get('zoom') else None
+    except ValueError:
+        return JsonResponse({'error': 'zoom invalide'}, status=400)
+
+    # Le mois courant fait partie de la clé, comme pour les KPIs du tableau de bord
+    variantes = cache_compresse(
+        projet_id, 'carte:amorcage', lambda: calculer_amorcage(projet_id, tolerance),
+        tolerance, date.today().strftime('%Y-%m'),
+    )
+
+    return reponse_compressee(request, variantes, etag=etag_projet(request))
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=etag_projet, last_modified_func=derniere_modification)
+def api_detail_entite(request: HttpRequest, couche: str, objet_id: int) -> HttpResponse:
+    """
+    API GeoJSON d'une entité avec toutes ses propriétés.
+
+    Les couches de la carte ne transportent que les propriétés utiles à
+    l'affichage ; les popups chargent le détail ici, au clic.
 
-    return JsonResponse(geojson, safe=False)
+    Args:
+        request: Requête HTTP (projet actif : request.projet)
+        couche: Nom de la couche (communes, interventions, infrastructures, acteurs)
+        objet_id: ID de l'entité (propriété id de la couche)
+
+    Returns:
+        Feature GeoJSON
+    """
+    projet = request.projet
+    if projet is None:
+        return JsonResponse({'error': 'Aucun projet sélectionné'}, status=403)
+    projet_id = projet.id
+
+    if couche not in COUCHES:
+        return JsonResponse({'error': f'Couche inconnue : {couche}'}, status=404)
+
+    feature = detail_entite(couche, projet_id, objet_id)
+    if feature is None:
+        return JsonResponse({'error': 'Entité introuvable'}, status=404)
+
+    return HttpResponse(feature, content_type='application/json')
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=etag_projet, last_modified_func=derniere_modification)
+def api_evolution_indicateur(request: HttpRequest, indicateur_id: int) -> JsonResponse:
+    """
+    API de l'évolution trimestrielle d'un indicateur (format Chart.js).
+
+    Lit la synthèse trimestrielle (SyntheseTrimestrielle) sans parcourir
+    l'historique des valeurs.
+
+    Args:
+        request: Requête HTTP avec filtres GET (commune_id, statut répétable)
+        indicateur_id: ID de l'indicateur
+
+    Returns:
+        JSON {indicateur, labels, datasets}
+    """
+    projet = request.projet
+    if projet is None:
+        return JsonResponse({'error': 'Aucun projet sélectionné'}, status=403)
+    projet_id = projet.id
+
+    indicateur = get_object_or_404(Indicateur, id=indicateur_id, projet_id=projet_id)
+
+    commune_id = request.GET.get('commune_id')
+    if commune_id and not commune_id.isdigit():
+        return JsonResponse({'error': 'commune_id invalide'}, status=400)
+    statuts = request.GET.getlist('statut')
+
+    evolution = cache_projet(
+        projet_id, 'evolution:indicateur',
+        lambda: evolution_indicateur(indicateur, int(commune_id) if commune_id else None, statuts),
+        indicateur.id, commune_id, sorted(statuts),
+    )
+
+    return JsonResponse(evolution)
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=etag_projet, last_modified_func=derniere_modification)
+def api_clusters_geojson(request: HttpRequest, couche: str) -> HttpResponse:
+    """
+    API GeoJSON des regroupements de points d'une couche (petites échelles).
+
+    Un point par cellule de grille non vide, avec le nombre d'entités et
+    leur répartition par statut. Mis en cache par projet, zoom et filtres.
+
+    Args:
+        request: Requête HTTP avec zoom (obligatoire), statut et commune_id
+        couche: interventions, infrastructures ou acteurs
+
+    Returns:
+        GeoJSON FeatureCollection des regroupements
+    """
+    projet = request.projet
+    if projet is None:
+        return JsonResponse({'error': 'Aucun projet sélectionné'}, status=403)
+    projet_id = projet.id
+
+    if couche not in COUCHES_PONCTUELLES:
+        return JsonResponse({'error': f'Couche inconnue : {couche}'}, status=404)
+
+    try:
+        zoom = _parametre_entier(request.GET.get('zoom'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    if zoom is None or zoom > ZOOM_MAX:
+        return JsonResponse({'error': f'zoom obligatoire (0 à {ZOOM_MAX})'}, status=400)
+
+    statut = request.GET.get('statut')
+    commune_id = request.GET.get('commune_id')
+    if commune_id and not commune_id.isdigit():
+        return JsonResponse({'error': 'commune_id invalide'}, status=400)
+
+    variantes = cache_compresse(
+        projet_id, f'clusters:{couche}',
+        lambda: geojson_clusters(couche, projet_id, zoom, statut=statut, commune_id=commune_id),
+        zoom, statut, commune_id,
+    )
+
+    return reponse_compressee(request, variantes, etag=etag_projet(request))
+
+
+# ========================================
+# TUILES VECTORIELLES (MVT)
+# ========================================
+
+@login_required
+@condition(etag_func=etag_projet, last_modified_func=derniere_modification)
+def api_tuile_mvt(request: HttpRequest, couche: str, z: int, x: int, y: int) -> HttpResponse:
+    """
+    Tuile vectorielle (Mapbox Vector Tile) d'une couche du projet.
+
+    Générée par PostGIS et mise en cache par projet ; mêmes filtres que les
+    API GeoJSON (statut, commune_id).
+
+    Args:
+        request: Requête HTTP avec filtres GET (statut, commune_id)
+        couche: interventions, infrastructures ou acteurs
+        z, x, y: Coordonnées de la tuile
+
+    Returns:
+        Tuile protobuf (application/vnd.mapbox-vector-tile)
+    """
+    projet = request.projet
+    if projet is None:
+        return JsonResponse({'error': 'Aucun projet sélectionné'}, status=403)
+    projet_id = projet.id
+
+    if couche not in COUCHES_MVT:
+        return JsonResponse({'error': f'Couche inconnue : {couche}'}, status=404)
+    if not tuile_valide(z, x, y):
+        return JsonResponse({'error': 'Coordonnées de tuile invalides'}, status=400)
+
+    statut = request.GET.get('statut')
+    commune_id = request.GET.get('commune_id')
+    if commune_id and not commune_id.isdigit():
+        return JsonResponse({'error': 'commune_id invalide'}, status=400)
+
+    variantes = cache_compresse(
+        projet_id, f'mvt:{couche}',
+        lambda: generer_tuile(couche, projet_id, z, x, y, statut, commune_id),
+        z, x, y, statut, commune_id,
+    )
+
+    response = reponse_compressee(request, variantes, 'application/vnd.mapbox-vector-tile',
+                                  etag=etag_projet(request))
+    response['Cache-Control'] = 'private, max-age=60'
+    return response
+
+
+# ========================================
+# CARTE HORS LIGNE (MBTILES)
+# ========================================
+
+@login_required
+def api_carte_hors_ligne(request: HttpRequest) -> HttpResponse:
+    """
+    Téléchargement de l'archive MBTiles du projet (carte hors ligne).
+
+    L'archive est produite par la commande exporter_carte et servie telle
+    quelle : la régénération des tuiles est trop longue pour une requête.
+    Si les données ont changé depuis, l'en-tête X-Archive-Obsolete le
+    signale ; la commande exporter_carte --obsoletes, planifiée, met ces
+    archives à jour de façon incrémentale.
+
+    Args:
+        request: Requête HTTP (projet actif : request.projet)
+
+    Returns:
+        Fichier MBTiles en pièce jointe
+    """
+    projet = request.projet
+    if projet is None:
+        return JsonResponse({'error': 'Aucun projet sélectionné'}, status=403)
+    projet_id = projet.id
+
+    obsolete = archive_obsolete(projet_id)
+    if obsolete is None:
+        return JsonResponse(
+            {'error': "Archive hors ligne non générée (commande exporter_carte)"}, status=404
+        )
+
+    chemin = chemin_archive(projet_id)
+    reponse = FileResponse(
+        open(chemin, 'rb'), as_attachment=True, filename=chemin.name,
+        content_type='application/vnd.mapbox-vector-tile+sqlite',
+    )
+    reponse['X-Archive-Obsolete'] = '1' if obsolete else '0'
+    return reponse
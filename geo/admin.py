@@ -3,11 +3,12 @@ Administration des entités géolocalisées
 """
 from django.contrib.gis import admin as gis_admin
 from django.contrib import admin
+from core.admin import ListeLegereMixin
 from .models import Infrastructure, Acteur, Admin2, CellulesGRDR
 
 
 @gis_admin.register(Infrastructure)
-class InfrastructureAdmin(gis_admin.GISModelAdmin):
+class InfrastructureAdmin(ListeLegereMixin, gis_admin.GISModelAdmin):
     """Administration des infrastructures"""
     list_display = ('nom', 'type_infrastructure', 'commune', 'projet', 'statut', 'nb_beneficiaires')
     list_filter = ('projet', 'type_infrastructure', 'statut', 'commune')
@@ -46,7 +47,7 @@ class InfrastructureAdmin(gis_admin.GISModelAdmin):
 
 
 @gis_admin.register(Acteur)
-class ActeurAdmin(gis_admin.GISModelAdmin):
+class ActeurAdmin(ListeLegereMixin, gis_admin.GISModelAdmin):
     """Administration des acteurs/organisations"""
     list_display = ('denomination', 'sigle', 'type_acteur', 'commune', 'projet', 'statut', 'nb_adherents')
     list_filter = ('projet', 'type_acteur', 'statut', 'commune')
@@ -88,7 +89,7 @@ class ActeurAdmin(gis_admin.GISModelAdmin):
 
 
 @admin.register(Admin2)
-class Admin2Admin(gis_admin.GISModelAdmin):
+class Admin2Admin(ListeLegereMixin, gis_admin.GISModelAdmin):
     """
     Administration des pays (niveau Admin2 OSM)
     Table en lecture seule (managed=False)
@@ -108,7 +109,7 @@ class Admin2Admin(gis_admin.GISModelAdmin):
 
 
 @admin.register(CellulesGRDR)
-class CellulesGRDRAdmin(gis_admin.GISModelAdmin):
+class CellulesGRDRAdmin(ListeLegereMixin, gis_admin.GISModelAdmin):
     """
     Administration des cellules GRDR
     Table en lecture seule (managed=False)
@@ -0,0 +1,161 @@
+"""
+Annuaire des niveaux administratifs en mémoire du processus.
+
+Le sélecteur de zone de creer_projet interroge la cascade à chaque choix :
+les noms et les listes d'enfants, qui ne changent qu'à l'import des
+contours, sont gardés dans un cache LRU borné propre au processus, rempli
+à la demande et sans jamais lire de colonne géométrique.
+
+Les entrées sont indexées par la version des contours, calculée sur les
+tables administratives elles-mêmes (marque_niveau : id et xmin des lignes)
+et sur l'état de la hiérarchie (EmpreinteNiveauAdmin) : un import direct
+des contours comme une reconstruction de la hiérarchie la changent.
+Elle est relue au plus toutes les VERIFICATION secondes ; une nouvelle
+version rend toutes les entrées précédentes obsolètes (évincées par LRU).
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from .hierarchie import NIVEAUX, enfants_par_parent, hierarchie_disponible, marque_niveau, niveau_enfant
+from .models import EmpreinteNiveauAdmin
+from .subdivision import intersections_par_parent
+
+# Nombre maximal d'entrées (listes d'un niveau ou enfants d'un parent)
+MAX_ENTREES = 4096
+
+# Délai entre deux relectures de la version des contours (secondes)
+VERIFICATION = 30
+
+_verrou = threading.Lock()
+_entrees: OrderedDict[tuple, Any] = OrderedDict()
+_version: dict[str, Any] = {'valeur': None, 'lue_le': 0.0}
+_ABSENTE = object()
+
+
+def version_contours() -> str:
+    """
+    Version des contours administratifs (tables et hiérarchie).
+
+    Returns:
+        md5 des marques des niveaux et des empreintes de la hiérarchie,
+        relu en base au plus toutes les VERIFICATION secondes
+    """
+    maintenant = time.monotonic()
+    if _version['valeur'] is None or maintenant - _version['lue_le'] > VERIFICATION:
+        marques = [(niveau, marque_niveau(niveau)) for niveau in NIVEAUX]
+        empreintes = EmpreinteNiveauAdmin.objects.order_by('niveau').values_list('niveau', 'empreinte')
+        _version['valeur'] = hashlib.md5(
+            repr((marques, list(empreintes))).encode(), usedforsecurity=False
+        ).hexdigest()
+        _version['lue_le'] = maintenant
+    return _version['valeur']
+
+
+def _chercher(cle: tuple) -> Any:
+    """Entrée en cache (marquée récente), _ABSENTE sinon"""
+    with _verrou:
+        if cle in _entrees:
+            _entrees.move_to_end(cle)
+            return _entrees[cle]
+    return _ABSENTE
+
+
+def _ranger(cle: tuple, valeur: Any) -> None:
+    with _verrou:
+        _entrees[cle] = valeur
+        _entrees.move_to_end(cle)
+        while len(_entrees) > MAX_ENTREES:
+            _entrees.popitem(last=False)
+
+
+def _lire(cle: tuple, calcul: Callable[[], Any]) -> Any:
+    cle = (version_contours(), *cle)
+    valeur = _chercher(cle)
+    if valeur is _ABSENTE:
+        valeur = calcul()
+        _ranger(cle, valeur)
+    return valeur
+
+
+def vider() -> None:
+    """Vide l'annuaire et force la relecture de la version des contours."""
+    with _verrou:
+        _entrees.clear()
+    _version['valeur'] = None
+
+
+def _tri(element: dict) -> tuple:
+    # Sans nom en tête, ordre des points de code (collation "C"), puis id
+    return element['name'] or '', element['id']
+
+
+def liste_niveau(niveau: str) -> list[dict]:
+    """
+    Toutes les entités d'un niveau, triées par nom.
+
+    Args:
+        niveau: Clé de NIVEAUX (ex: admin2)
+
+    Returns:
+        Liste de {id, name} (à ne pas modifier : partagée par le cache)
+    """
+    def calcul():
+        return sorted(NIVEAUX[niveau].objects.values('id', 'name'), key=_tri)
+    return _lire(('liste', niveau), calcul)
+
+
+def noms_niveau(niveau: str) -> dict[int, str | None]:
+    """
+    Correspondance id -> nom d'un niveau.
+
+    Args:
+        niveau: Clé de NIVEAUX
+
+    Returns:
+        Dictionnaire {id: name}
+    """
+    return _lire(('noms', niveau), lambda: {e['id']: e['name'] for e in liste_niveau(niveau)})
+
+
+def _enfants_parents(niveau_parent: str, parent_ids: list[int]) -> dict[int, list[dict]]:
+    if hierarchie_disponible(niveau_parent):
+        return enfants_par_parent(niveau_parent, parent_ids)
+    return intersections_par_parent(niveau_parent, parent_ids, niveau_enfant(niveau_parent))
+
+
+def enfants_de(niveau_parent: str, parent_ids: list[int]) -> list[dict]:
+    """
+    Enfants des parents sélectionnés, triés par nom puis id, sans doublon.
+
+    La liste de chaque parent est mise en cache séparément : une sélection
+    qui s'étend d'un parent ne calcule que ce parent. Les parents absents
+    du cache sont calculés ensemble, en une requête.
+
+    Args:
+        niveau_parent: Niveau des parents (ex: admin4)
+        parent_ids: IDs des parents
+
+    Returns:
+        Liste de {id, name}
+    """
+    version = version_contours()
+    listes: dict[int, Any] = {
+        parent_id: _chercher((version, 'enfants', niveau_parent, parent_id))
+        for parent_id in dict.fromkeys(parent_ids)
+    }
+    manquants = [parent_id for parent_id, liste in listes.items() if liste is _ABSENTE]
+    if manquants:
+        for parent_id, liste in _enfants_parents(niveau_parent, manquants).items():
+            _ranger((version, 'enfants', niveau_parent, parent_id), liste)
+            listes[parent_id] = liste
+
+    resultats: dict[int, dict] = {}
+    for liste in listes.values():
+        for element in liste:
+            resultats.setdefault(element['id'], element)
+    return sorted(resultats.values(), key=_tri)
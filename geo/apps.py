@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class GeoConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'geo'
+
+    def ready(self):
+        # Enregistrement des signaux (zone matérialisée des projets)
+        from . import signals  # noqa: F401
@@ -0,0 +1,221 @@
+"""
+Hiérarchie administrative précalculée (HierarchieAdmin).
+
+Les contours OSM "geo"."admin-*" ne changent qu'à l'import. Plutôt que de
+recalculer des intersections polygone-polygone à chaque clic du sélecteur
+en cascade, chaque entité est rattachée une fois pour toutes à son parent :
+
+1. le polygone parent contenant ST_PointOnSurface(enfant) (point garanti
+   à l'intérieur de l'enfant, insensible aux frontières communes) ;
+2. à défaut (trou ou décalage entre couches), le parent de plus grande
+   surface de recouvrement.
+
+Les parents sont lus dans leurs morceaux subdivisés (geo.subdivision)
+quand ils existent : l'index GiST n'examine que les morceaux voisins.
+
+La reconstruction est incrémentale : une empreinte (md5 des id, noms et
+géométries) est conservée par niveau, et seules les paires de niveaux dont
+une table a changé depuis la dernière construction sont recalculées.
+"""
+from __future__ import annotations
+
+from django.db import connection, transaction
+from django.db.models import Value
+from django.db.models.functions import Coalesce, Collate
+from django.utils import timezone
+
+from .models import Admin2, Admin4, Admin5, Admin7, Admin8, EmpreinteNiveauAdmin, HierarchieAdmin
+from .subdivision import source_spatiale
+
+NIVEAUX = {
+    'admin2': Admin2,
+    'admin4': Admin4,
+    'admin5': Admin5,
+    'admin7': Admin7,
+    'admin8': Admin8,
+}
+
+# (niveau parent, niveau enfant) du pays à la commune
+PAIRES = (
+    ('admin2', 'admin4'),
+    ('admin4', 'admin5'),
+    ('admin5', 'admin7'),
+    ('admin7', 'admin8'),
+)
+
+
+def _table(niveau: str) -> str:
+    return connection.ops.quote_name(NIVEAUX[niveau]._meta.db_table)
+
+
+def empreinte_niveau(niveau: str) -> tuple[str, int]:
+    """
+    Empreinte du contenu d'une table administrative.
+
+    Args:
+        niveau: Clé de NIVEAUX
+
+    Returns:
+        (md5, nombre d'objets)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT COALESCE(md5(string_agg(
+                       s.id || ':' || COALESCE(s.name, '') || ':' || COALESCE(md5(ST_AsBinary(s.geom)), ''),
+                       ',' ORDER BY s.id
+                   )), ''),
+                   COUNT(*)
+            FROM {_table(niveau)} s
+            """
+        )
+        return cursor.fetchone()
+
+
+def marque_niveau(niveau: str) -> str:
+    """
+    Marque de version d'une table administrative, sans lire les géométries.
+
+    Toute insertion ou mise à jour d'une ligne change son xmin (identifiant
+    de la transaction qui l'a écrite), toute suppression l'ensemble des id :
+    un import direct des contours (ogr2ogr, SQL) change donc la marque,
+    qu'il soit suivi ou non de construire_hierarchie_admin.
+
+    Args:
+        niveau: Clé de NIVEAUX
+
+    Returns:
+        md5 des couples id:xmin ('' si la table est vide)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT COALESCE(md5(string_agg(s.id || ':' || s.xmin::text, ',' ORDER BY s.id)), '')
+            FROM {_table(niveau)} s
+            """
+        )
+        return cursor.fetchone()[0]
+
+
+@transaction.atomic
+def construire_paire(niveau_parent: str, niveau_enfant: str) -> int:
+    """
+    Recalcule les rattachements d'un niveau à son niveau parent.
+
+    Args:
+        niveau_parent: Niveau des parents (ex: admin4)
+        niveau_enfant: Niveau des enfants (ex: admin5)
+
+    Returns:
+        Nombre de rattachements écrits
+    """
+    table = connection.ops.quote_name(HierarchieAdmin._meta.db_table)
+    enfants = _table(niveau_enfant)
+    # Morceaux subdivisés des parents s'ils existent (geo.subdivision)
+    parents, params_parents = source_spatiale(niveau_parent)
+
+    HierarchieAdmin.objects.filter(niveau_enfant=niveau_enfant).delete()
+
+    with connection.cursor() as cursor:
+        # Point intérieur de l'enfant contenu dans le parent (index GiST du parent)
+        cursor.execute(
+            f"""
+            INSERT INTO {table}
+                (niveau_parent, parent_id, niveau_enfant, enfant_id, nom, methode, date_maj)
+            SELECT DISTINCT ON (e.id) %s, p.id, %s, e.id, e.name, 'POINT', now()
+            FROM {enfants} e
+            JOIN {parents} p ON ST_Contains(p.geom, ST_PointOnSurface(e.geom))
+            WHERE e.geom IS NOT NULL
+            ORDER BY e.id, p.id
+            """,
+            [niveau_parent, niveau_enfant, *params_parents],
+        )
+        total = cursor.rowcount
+
+        # Enfants restants : parent de plus grand recouvrement (somme sur ses morceaux)
+        cursor.execute(
+            f"""
+            INSERT INTO {table}
+                (niveau_parent, parent_id, niveau_enfant, enfant_id, nom, methode, date_maj)
+            SELECT DISTINCT ON (r.id) %s, r.parent_id, %s, r.id, r.name, 'SURFACE', now()
+            FROM (
+                SELECT e.id, e.name, p.id AS parent_id,
+                       SUM(ST_Area(ST_Intersection(p.geom, e.geom))) AS surface
+                FROM {enfants} e
+                JOIN {parents} p ON ST_Intersects(p.geom, e.geom)
+                WHERE e.geom IS NOT NULL
+                  AND NOT EXISTS (
+                      SELECT 1 FROM {table} h WHERE h.niveau_enfant = %s AND h.enfant_id = e.id
+                  )
+                GROUP BY e.id, e.name, p.id
+            ) r
+            ORDER BY r.id, r.surface DESC, r.parent_id
+            """,
+            [niveau_parent, niveau_enfant, *params_parents, niveau_enfant],
+        )
+        total += cursor.rowcount
+
+    return total
+
+
+def construire_hierarchie(force: bool = False) -> dict[str, int | None]:
+    """
+    Met à jour la hiérarchie administrative.
+
+    Args:
+        force: Recalculer toutes les paires, même inchangées
+
+    Returns:
+        Dictionnaire {"parent>enfant": rattachements écrits, None si inchangée}
+    """
+    connues = dict(EmpreinteNiveauAdmin.objects.values_list('niveau', 'empreinte'))
+    actuelles = {niveau: empreinte_niveau(niveau) for niveau in NIVEAUX}
+    modifies = {niveau for niveau, (empreinte, _) in actuelles.items() if connues.get(niveau) != empreinte}
+
+    resultats: dict[str, int | None] = {}
+    for parent, enfant in PAIRES:
+        if force or parent in modifies or enfant in modifies:
+            resultats[f'{parent}>{enfant}'] = construire_paire(parent, enfant)
+        else:
+            resultats[f'{parent}>{enfant}'] = None
+
+    for niveau, (empreinte, nombre) in actuelles.items():
+        EmpreinteNiveauAdmin.objects.update_or_create(
+            niveau=niveau,
+            defaults={'empreinte': empreinte, 'nb_objets': nombre, 'date_maj': timezone.now()},
+        )
+    return resultats
+
+
+def niveau_enfant(niveau_parent: str) -> str:
+    """Niveau immédiatement inférieur (ex: admin4 -> admin5)."""
+    return dict(PAIRES)[niveau_parent]
+
+
+def hierarchie_disponible(niveau_parent: str) -> bool:
+    """Vrai si les rattachements sous ce niveau ont été construits."""
+    return EmpreinteNiveauAdmin.objects.filter(niveau=niveau_enfant(niveau_parent)).exists()
+
+
+def enfants_par_parent(niveau_parent: str, parent_ids: list[int]) -> dict[int, list[dict]]:
+    """
+    Enfants de chacun des parents sélectionnés, lus dans la hiérarchie (index).
+
+    Tri par nom (sans nom en tête, ordre des points de code), puis par id.
+
+    Args:
+        niveau_parent: Niveau des parents
+        parent_ids: IDs des parents
+
+    Returns:
+        Dictionnaire {parent_id: [{id, name}]} (liste vide sans enfant)
+    """
+    resultats: dict[int, list[dict]] = {parent_id: [] for parent_id in parent_ids}
+    lignes = HierarchieAdmin.objects.filter(
+        niveau_parent=niveau_parent, parent_id__in=parent_ids
+    ).order_by(
+        Collate(Coalesce('nom', Value('')), 'C'), 'enfant_id'
+    ).values_list('parent_id', 'enfant_id', 'nom')
+    for parent_id, enfant_id, nom in lignes:
+        resultats[parent_id].append({'id': enfant_id, 'name': nom})
+    return resultats
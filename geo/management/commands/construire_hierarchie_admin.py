@@ -0,0 +1,30 @@
+"""
+Construction de la hiérarchie administrative (Admin2 > Admin4 > Admin5 > Admin7 > Admin8)
+
+À relancer après chaque import des tables "geo"."admin-*" : seules les
+paires de niveaux dont une table a changé sont recalculées.
+
+Usage:
+    python manage.py construire_hierarchie_admin
+    python manage.py construire_hierarchie_admin --force
+"""
+from django.core.management.base import BaseCommand
+
+from geo.hierarchie import construire_hierarchie
+
+
+class Command(BaseCommand):
+    help = "Précalcule le rattachement parent/enfant des niveaux administratifs (sélection en cascade)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help="Recalculer toutes les paires, même inchangées")
+
+    def handle(self, *args, **options):
+        resultats = construire_hierarchie(options['force'])
+        for paire, nombre in resultats.items():
+            if nombre is None:
+                self.stdout.write(f"{paire} : inchangée")
+            else:
+                self.stdout.write(f"{paire} : {nombre} rattachement(s)")
+        self.stdout.write(self.style.SUCCESS("Hiérarchie administrative à jour."))
@@ -0,0 +1,22 @@
+"""
+Reconstruction des zones d'intervention matérialisées (geo.ZoneProjet)
+
+Usage:
+    python manage.py rebuild_zones_projets
+    python manage.py rebuild_zones_projets --projet 3
+"""
+from django.core.management.base import BaseCommand
+
+from geo.zones import reconstruire_zones
+
+
+class Command(BaseCommand):
+    help = "Recalcule l'union, l'emprise, le centroïde et le contour de la zone de chaque projet"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projet', type=int, default=None,
+                            help="Limiter à un projet (ID)")
+
+    def handle(self, *args, **options):
+        nb_zones = reconstruire_zones(options['projet'])
+        self.stdout.write(self.style.SUCCESS(f"{nb_zones} zone(s) de projet reconstruite(s)."))
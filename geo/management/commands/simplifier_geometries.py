@@ -0,0 +1,24 @@
+"""
+Régénération des contours administratifs simplifiés
+
+Usage:
+    python manage.py simplifier_geometries
+    python manage.py simplifier_geometries --niveau commune --niveau admin8
+"""
+from django.core.management.base import BaseCommand
+
+from geo.simplification import SOURCES, TOLERANCES, simplifier_geometries
+
+
+class Command(BaseCommand):
+    help = "Recalcule les variantes simplifiées (ST_SimplifyPreserveTopology) des contours administratifs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--niveau', action='append', choices=list(SOURCES),
+                            help="Niveau à traiter (répétable, tous par défaut)")
+
+    def handle(self, *args, **options):
+        resultats = simplifier_geometries(options['niveau'])
+        for niveau, nombre in resultats.items():
+            self.stdout.write(f"{niveau} : {nombre} géométrie(s) sur {len(TOLERANCES)} tolérance(s)")
+        self.stdout.write(self.style.SUCCESS("Géométries simplifiées régénérées."))
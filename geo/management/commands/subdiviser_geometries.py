@@ -0,0 +1,28 @@
+"""
+Régénération des contours administratifs subdivisés (prédicats spatiaux)
+
+À relancer après chaque import des contours (CommuneGeom, "geo"."admin-*"),
+avant construire_hierarchie_admin.
+
+Usage:
+    python manage.py subdiviser_geometries
+    python manage.py subdiviser_geometries --niveau admin2 --niveau admin4
+"""
+from django.core.management.base import BaseCommand
+
+from geo.simplification import SOURCES
+from geo.subdivision import MAX_SOMMETS, subdiviser_geometries
+
+
+class Command(BaseCommand):
+    help = "Découpe les contours administratifs en morceaux indexés (ST_Subdivide)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--niveau', action='append', choices=list(SOURCES),
+                            help="Niveau à traiter (répétable, tous par défaut)")
+
+    def handle(self, *args, **options):
+        resultats = subdiviser_geometries(options['niveau'])
+        for niveau, nombre in resultats.items():
+            self.stdout.write(f"{niveau} : {nombre} morceau(x) de {MAX_SOMMETS} sommets au plus")
+        self.stdout.write(self.style.SUCCESS("Géométries subdivisées régénérées."))
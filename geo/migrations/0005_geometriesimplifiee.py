@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:40
+
+import django.contrib.gis.db.models.fields
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geo', '0004_admin4_admin5_admin7_admin8_alter_admin2_table_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeometrieSimplifiee',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('niveau', models.CharField(choices=[('commune', 'Commune (référentiel)'), ('admin2', 'Pays (Admin2)'), ('admin4', 'Région (Admin4)'), ('admin5', 'Département (Admin5)'), ('admin7', 'Arrondissement (Admin7)'), ('admin8', 'Commune (Admin8)')], max_length=10)),
+                ('objet_id', models.BigIntegerField(help_text="Clé primaire de la géométrie d'origine")),
+                ('tolerance', models.FloatField(help_text='Tolérance de simplification (degrés)')),
+                ('geom', django.contrib.gis.db.models.fields.MultiPolygonField(srid=4326)),
+                ('date_maj', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Géométrie simplifiée',
+                'verbose_name_plural': 'Géométries simplifiées',
+                'constraints': [models.UniqueConstraint(fields=('niveau', 'tolerance', 'objet_id'), name='unique_geometrie_simplifiee')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geo', '0005_geometriesimplifiee'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmpreinteNiveauAdmin',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('niveau', models.CharField(choices=[('admin2', 'Pays (Admin2)'), ('admin4', 'Région (Admin4)'), ('admin5', 'Département (Admin5)'), ('admin7', 'Arrondissement (Admin7)'), ('admin8', 'Commune (Admin8)')], max_length=10, unique=True)),
+                ('empreinte', models.CharField(help_text='md5 des id, noms et géométries', max_length=32)),
+                ('nb_objets', models.PositiveIntegerField(default=0)),
+                ('date_maj', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Empreinte de niveau administratif',
+                'verbose_name_plural': 'Empreintes de niveaux administratifs',
+            },
+        ),
+        migrations.CreateModel(
+            name='HierarchieAdmin',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('niveau_parent', models.CharField(choices=[('admin2', 'Pays (Admin2)'), ('admin4', 'Région (Admin4)'), ('admin5', 'Département (Admin5)'), ('admin7', 'Arrondissement (Admin7)'), ('admin8', 'Commune (Admin8)')], max_length=10)),
+                ('parent_id', models.BigIntegerField()),
+                ('niveau_enfant', models.CharField(choices=[('admin2', 'Pays (Admin2)'), ('admin4', 'Région (Admin4)'), ('admin5', 'Département (Admin5)'), ('admin7', 'Arrondissement (Admin7)'), ('admin8', 'Commune (Admin8)')], max_length=10)),
+                ('enfant_id', models.BigIntegerField()),
+                ('nom', models.CharField(blank=True, help_text="Nom de l'enfant (copie de name)", max_length=254, null=True)),
+                ('methode', models.CharField(choices=[('POINT', 'Point intérieur contenu'), ('SURFACE', 'Plus grand recouvrement')], default='POINT', max_length=10)),
+                ('date_maj', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Hiérarchie administrative',
+                'verbose_name_plural': 'Hiérarchie administrative',
+                'indexes': [models.Index(fields=['niveau_parent', 'parent_id'], name='geo_hierarc_niveau__12bb12_idx')],
+                'constraints': [models.UniqueConstraint(fields=('niveau_enfant', 'enfant_id'), name='unique_hierarchie_admin_enfant')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:05
+
+import django.contrib.gis.db.models.fields
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geo', '0006_hierarchieadmin_empreinteniveauadmin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeometrieSubdivisee',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('niveau', models.CharField(choices=[('commune', 'Commune (référentiel)'), ('admin2', 'Pays (Admin2)'), ('admin4', 'Région (Admin4)'), ('admin5', 'Département (Admin5)'), ('admin7', 'Arrondissement (Admin7)'), ('admin8', 'Commune (Admin8)')], max_length=10)),
+                ('objet_id', models.BigIntegerField(help_text="Clé primaire de la géométrie d'origine")),
+                ('geom', django.contrib.gis.db.models.fields.PolygonField(help_text='Morceau (index GiST)', srid=4326)),
+                ('date_maj', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Géométrie subdivisée',
+                'verbose_name_plural': 'Géométries subdivisées',
+                'indexes': [models.Index(fields=['niveau', 'objet_id'], name='geo_geometr_niveau_a77284_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:40
+
+import django.contrib.gis.db.models.fields
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_cleanup_old_fields'),
+        ('geo', '0007_geometriesubdivisee'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ZoneProjet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('niveau', models.CharField(help_text='Niveau de sélection ayant servi à la construction', max_length=20)),
+                ('geom', django.contrib.gis.db.models.fields.MultiPolygonField(help_text='Union des géométries de la zone', srid=4326)),
+                ('emprise', django.contrib.gis.db.models.fields.PolygonField(help_text='Rectangle englobant', srid=4326)),
+                ('centroid', django.contrib.gis.db.models.fields.PointField(srid=4326)),
+                ('contour', django.contrib.gis.db.models.fields.MultiPolygonField(help_text='Contour simplifié (affichage)', srid=4326)),
+                ('date_maj', models.DateTimeField(default=django.utils.timezone.now)),
+                ('projet', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='zone_materialisee', to='core.projet')),
+            ],
+            options={
+                'verbose_name': 'Zone de projet',
+                'verbose_name_plural': 'Zones de projets',
+            },
+        ),
+    ]
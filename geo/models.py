@@ -2,12 +2,46 @@
 Modèles géolocalisés : Infrastructures, Acteurs, Admin2 (pays) et Cellules GRDR
 """
 from django.contrib.gis.db import models as gis_models
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone
 from core.models import Projet
+from core.querysets import ListeQuerySet
 from referentiels.models import Commune, TypeInfrastructure, TypeActeur
 
 
+class CommuneDuPointMixin:
+    """
+    Rattachement d'une entité localisée (champs geom et commune) à la
+    commune du référentiel contenant son point.
+
+    save() renseigne la commune laissée vide ; hors de toute commune, elle
+    reste vide et clean() demande de la choisir.
+    """
+
+    def commune_du_point(self):
+        """ID de la commune contenant geom, None hors de toute commune"""
+        # geo.subdivision importe ce module : import différé
+        from .subdivision import commune_du_point
+        return commune_du_point(self.geom)
+
+    def save(self, *args, **kwargs):
+        """Rattachement automatique à la commune contenant le point"""
+        if self.geom and not self.commune_id:
+            commune_id = self.commune_du_point()
+            if commune_id:
+                self.commune_id = commune_id
+        super().save(*args, **kwargs)
+
+    def clean(self):
+        """Valider la localisation : une commune doit la contenir si aucune n'est choisie"""
+        super().clean()
+        if self.geom and not self.commune_id and self.commune_du_point() is None:
+            raise ValidationError({
+                'commune': "Aucune commune ne contient cette localisation : choisir la commune"
+            })
+
+
 class Admin2(gis_models.Model):
     """
     Niveau administratif 2 (pays)
@@ -43,6 +77,8 @@ class Admin2(gis_models.Model):
     tourism = models.CharField(max_length=254, blank=True, null=True)
     other_tags = models.CharField(max_length=254, blank=True, null=True)
 
+    objects = ListeQuerySet.as_manager()
+
     class Meta:
         db_table = '"geo"."admin-2"'
         managed = False  # Table gérée en dehors de Django
@@ -63,6 +99,8 @@ class CellulesGRDR(gis_models.Model):
     geom = gis_models.PointField(srid=4326, null=True, blank=True,
                                  help_text="Coordonnées géographiques de la cellule (SRID 4326)")
 
+    objects = ListeQuerySet.as_manager()
+
     class Meta:
         db_table = '"geo"."cellules-grdr"'  # Guillemets requis à cause du trait d'union
         managed = False  # Table gérée en dehors de Django
@@ -87,6 +125,8 @@ class Admin4(gis_models.Model):
     boundary = models.CharField(max_length=254, blank=True, null=True)
     place = models.CharField(max_length=254, blank=True, null=True)
 
+    objects = ListeQuerySet.as_manager()
+
     class Meta:
         db_table = '"geo"."admin-4"'
         managed = False
@@ -111,6 +151,8 @@ class Admin5(gis_models.Model):
     boundary = models.CharField(max_length=254, blank=True, null=True)
     place = models.CharField(max_length=254, blank=True, null=True)
 
+    objects = ListeQuerySet.as_manager()
+
     class Meta:
         db_table = '"geo"."admin-5"'
         managed = False
@@ -135,6 +177,8 @@ class Admin7(gis_models.Model):
     boundary = models.CharField(max_length=254, blank=True, null=True)
     place = models.CharField(max_length=254, blank=True, null=True)
 
+    objects = ListeQuerySet.as_manager()
+
     class Meta:
         db_table = '"geo"."admin-7"'
         managed = False
@@ -159,6 +203,8 @@ class Admin8(gis_models.Model):
     boundary = models.CharField(max_length=254, blank=True, null=True)
     place = models.CharField(max_length=254, blank=True, null=True)
 
+    objects = ListeQuerySet.as_manager()
+
     class Meta:
         db_table = '"geo"."admin-8"'
         managed = False
@@ -169,7 +215,7 @@ class Admin8(gis_models.Model):
         return self.name or f"Admin8 #{self.id}"
 
 
-class Infrastructure(gis_models.Model):
+class Infrastructure(CommuneDuPointMixin, gis_models.Model):
     """
     Infrastructures géolocalisées
     Ex: Forages, Écoles, Maraîchages, Cantines scolaires, Postes de santé, etc.
@@ -235,6 +281,8 @@ class Infrastructure(gis_models.Model):
                                           through='suivi.InterventionInfrastructure',
                                           related_name='infrastructures_liees')
 
+    objects = ListeQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Infrastructure"
         verbose_name_plural = "Infrastructures"
@@ -248,7 +296,7 @@ class Infrastructure(gis_models.Model):
         return f"{self.nom} ({self.type_infrastructure.libelle}) - {self.commune.nom}"
 
 
-class Acteur(gis_models.Model):
+class Acteur(CommuneDuPointMixin, gis_models.Model):
     """
     Acteurs/Organisations géolocalisés
     Ex: Groupements féminins, Associations d'éleveurs, Coopératives agricoles, etc.
@@ -321,6 +369,8 @@ class Acteur(gis_models.Model):
                                           through='suivi.InterventionActeur',
                                           related_name='acteurs_impliques')
 
+    objects = ListeQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Acteur"
         verbose_name_plural = "Acteurs"
@@ -333,3 +383,152 @@ class Acteur(gis_models.Model):
     def __str__(self):
         sigle_str = f" ({self.sigle})" if self.sigle else ""
         return f"{self.denomination}{sigle_str} - {self.commune.nom}"
+
+
+class GeometrieSimplifiee(gis_models.Model):
+    """
+    Variantes simplifiées des contours administratifs (CommuneGeom, Admin2 à Admin8)
+    Une ligne par (niveau, objet, tolérance), calculée par
+    ST_SimplifyPreserveTopology. Régénération :
+    python manage.py simplifier_geometries
+    """
+    NIVEAU_CHOICES = [
+        ('commune', 'Commune (référentiel)'),
+        ('admin2', 'Pays (Admin2)'),
+        ('admin4', 'Région (Admin4)'),
+        ('admin5', 'Département (Admin5)'),
+        ('admin7', 'Arrondissement (Admin7)'),
+        ('admin8', 'Commune (Admin8)'),
+    ]
+
+    niveau = models.CharField(max_length=10, choices=NIVEAU_CHOICES)
+    objet_id = models.BigIntegerField(help_text="Clé primaire de la géométrie d'origine")
+    tolerance = models.FloatField(help_text="Tolérance de simplification (degrés)")
+    geom = gis_models.MultiPolygonField(srid=4326)
+    date_maj = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Géométrie simplifiée"
+        verbose_name_plural = "Géométries simplifiées"
+        constraints = [
+            models.UniqueConstraint(fields=['niveau', 'tolerance', 'objet_id'],
+                                    name='unique_geometrie_simplifiee'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_niveau_display()} #{self.objet_id} ({self.tolerance}°)"
+
+
+NIVEAU_ADMIN_CHOICES = [
+    ('admin2', 'Pays (Admin2)'),
+    ('admin4', 'Région (Admin4)'),
+    ('admin5', 'Département (Admin5)'),
+    ('admin7', 'Arrondissement (Admin7)'),
+    ('admin8', 'Commune (Admin8)'),
+]
+
+
+class HierarchieAdmin(models.Model):
+    """
+    Rattachement précalculé de chaque entité administrative à son parent
+    (Admin8 -> Admin7 -> Admin5 -> Admin4 -> Admin2)
+    Le parent est le polygone contenant un point intérieur de l'enfant
+    (ST_PointOnSurface), à défaut celui de plus grand recouvrement.
+    Construction : python manage.py construire_hierarchie_admin
+    """
+    METHODE_CHOICES = [
+        ('POINT', 'Point intérieur contenu'),
+        ('SURFACE', 'Plus grand recouvrement'),
+    ]
+
+    niveau_parent = models.CharField(max_length=10, choices=NIVEAU_ADMIN_CHOICES)
+    parent_id = models.BigIntegerField()
+    niveau_enfant = models.CharField(max_length=10, choices=NIVEAU_ADMIN_CHOICES)
+    enfant_id = models.BigIntegerField()
+    nom = models.CharField(max_length=254, blank=True, null=True,
+                           help_text="Nom de l'enfant (copie de name)")
+    methode = models.CharField(max_length=10, choices=METHODE_CHOICES, default='POINT')
+    date_maj = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Hiérarchie administrative"
+        verbose_name_plural = "Hiérarchie administrative"
+        constraints = [
+            models.UniqueConstraint(fields=['niveau_enfant', 'enfant_id'],
+                                    name='unique_hierarchie_admin_enfant'),
+        ]
+        indexes = [
+            models.Index(fields=['niveau_parent', 'parent_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.niveau_parent} #{self.parent_id} > {self.niveau_enfant} #{self.enfant_id}"
+
+
+class EmpreinteNiveauAdmin(models.Model):
+    """
+    Empreinte d'une table "geo"."admin-*" lors de la dernière construction
+    de la hiérarchie : seules les paires de niveaux dont une table a changé
+    sont recalculées.
+    """
+    niveau = models.CharField(max_length=10, choices=NIVEAU_ADMIN_CHOICES, unique=True)
+    empreinte = models.CharField(max_length=32, help_text="md5 des id, noms et géométries")
+    nb_objets = models.PositiveIntegerField(default=0)
+    date_maj = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Empreinte de niveau administratif"
+        verbose_name_plural = "Empreintes de niveaux administratifs"
+
+    def __str__(self):
+        return f"{self.get_niveau_display()} ({self.nb_objets} objets)"
+
+
+class GeometrieSubdivisee(gis_models.Model):
+    """
+    Contours administratifs découpés en morceaux de taille bornée (ST_Subdivide)
+    Les grands multipolygones (pays, régions) ont des emprises énormes :
+    l'index GiST ne filtre presque rien et chaque ST_Intersects parcourt des
+    milliers de sommets. Découpés, chaque morceau a une petite emprise et
+    peu de sommets. Régénération : python manage.py subdiviser_geometries
+    """
+    niveau = models.CharField(max_length=10, choices=GeometrieSimplifiee.NIVEAU_CHOICES)
+    objet_id = models.BigIntegerField(help_text="Clé primaire de la géométrie d'origine")
+    geom = gis_models.PolygonField(srid=4326, help_text="Morceau (index GiST)")
+    date_maj = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Géométrie subdivisée"
+        verbose_name_plural = "Géométries subdivisées"
+        indexes = [
+            models.Index(fields=['niveau', 'objet_id'], name='geo_geometr_niveau_a77284_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_niveau_display()} #{self.objet_id} (morceau {self.pk})"
+
+
+class ZoneProjet(gis_models.Model):
+    """
+    Zone d'intervention matérialisée d'un projet
+    Union des géométries de la zone sélectionnée (zone_pays ... zone_communes),
+    avec emprise, centroïde et contour simplifié. Reconstruite à chaque
+    modification de la zone (geo.signals) ; reconstruction complète :
+    python manage.py rebuild_zones_projets
+    """
+    projet = models.OneToOneField(Projet, on_delete=models.CASCADE,
+                                  related_name='zone_materialisee')
+    niveau = models.CharField(max_length=20,
+                              help_text="Niveau de sélection ayant servi à la construction")
+    geom = gis_models.MultiPolygonField(srid=4326, help_text="Union des géométries de la zone")
+    emprise = gis_models.PolygonField(srid=4326, help_text="Rectangle englobant")
+    centroid = gis_models.PointField(srid=4326)
+    contour = gis_models.MultiPolygonField(srid=4326, help_text="Contour simplifié (affichage)")
+    date_maj = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Zone de projet"
+        verbose_name_plural = "Zones de projets"
+
+    def __str__(self):
+        return f"Zone {self.projet.code_projet} ({self.niveau})"
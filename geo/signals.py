@@ -0,0 +1,57 @@
+"""
+Signaux de l'application geo
+
+Reconstruction de la zone matérialisée d'un projet (ZoneProjet) lorsque
+ses relations de zone (zone_pays ... zone_communes) ou ses communes
+(ProjetCommune) changent. Le calcul a lieu après validation de la
+transaction.
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import invalider_projet
+from core.models import Projet
+from referentiels.models import ProjetCommune
+
+from .zones import NIVEAUX_ZONE, construire_zone
+
+
+def _reconstruire_apres_commit(projet_id):
+    """Reconstruire la zone une fois la transaction validée."""
+    if not projet_id:
+        return
+
+    def reconstruire():
+        construire_zone(projet_id)
+        invalider_projet(projet_id)
+
+    transaction.on_commit(reconstruire)
+
+
+def zone_modifiee(sender, instance, action, reverse, pk_set, **kwargs):
+    """Relation de zone modifiée, depuis le projet ou depuis l'entité administrative"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        _reconstruire_apres_commit(instance.pk)
+    elif action == 'post_clear':
+        # pk_set n'est pas fourni : projets encore liés inconnus, tous recalculés
+        for projet_id in Projet.objects.values_list('id', flat=True):
+            _reconstruire_apres_commit(projet_id)
+    else:
+        for projet_id in pk_set or ():
+            _reconstruire_apres_commit(projet_id)
+
+
+for champ, _ in NIVEAUX_ZONE:
+    m2m_changed.connect(zone_modifiee, sender=getattr(Projet, champ).through,
+                        dispatch_uid=f'zone_projet_{champ}')
+
+
+@receiver(post_save, sender=ProjetCommune)
+@receiver(post_delete, sender=ProjetCommune)
+def communes_modifiees(sender, instance, raw=False, **kwargs):
+    """Communes du projet modifiées (zone de repli sans sélection en cascade)"""
+    if not raw:
+        _reconstruire_apres_commit(instance.projet_id)
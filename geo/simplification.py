@@ -0,0 +1,111 @@
+"""
+Variantes simplifiées des contours administratifs.
+
+Les contours OSM (CommuneGeom, Admin2 à Admin8) sont stockés à pleine
+résolution. Pour chaque tolérance de TOLERANCES, une copie simplifiée par
+ST_SimplifyPreserveTopology (géométries valides, pas d'anneau dégénéré) est
+rangée dans GeometrieSimplifiee. Les API choisissent la variante adaptée au
+zoom : la plus forte tolérance qui reste sous la taille d'un pixel.
+"""
+from __future__ import annotations
+
+from django.db import connection, transaction
+
+from core.cache import invalider_projet
+from core.models import Projet
+from referentiels.models import CommuneGeom
+
+from .models import Admin2, Admin4, Admin5, Admin7, Admin8, GeometrieSimplifiee
+
+# Tolérances stockées, en degrés (~11 m, ~55 m, ~220 m, ~1,1 km à l'équateur)
+TOLERANCES = (0.0001, 0.0005, 0.002, 0.01)
+
+SOURCES = {
+    'commune': CommuneGeom,
+    'admin2': Admin2,
+    'admin4': Admin4,
+    'admin5': Admin5,
+    'admin7': Admin7,
+    'admin8': Admin8,
+}
+
+
+def tolerance_pour_zoom(zoom: float) -> float | None:
+    """
+    Tolérance adaptée à un niveau de zoom (tuiles de 256 px).
+
+    Args:
+        zoom: Niveau de zoom de la carte
+
+    Returns:
+        Plus forte tolérance inférieure à la taille d'un pixel, ou None
+        (géométrie d'origine) aux grandes échelles
+    """
+    taille_pixel = 360 / (256 * 2 ** max(zoom, 0))
+    return tolerance_stockee(taille_pixel)
+
+
+def tolerance_stockee(tolerance: float) -> float | None:
+    """
+    Plus forte tolérance stockée ne dépassant pas la tolérance demandée.
+
+    Args:
+        tolerance: Tolérance maximale acceptable (degrés)
+
+    Returns:
+        Tolérance de TOLERANCES, ou None si toutes sont plus grossières
+    """
+    candidates = [t for t in TOLERANCES if t <= tolerance]
+    return max(candidates) if candidates else None
+
+
+@transaction.atomic
+def simplifier_niveau(niveau: str, tolerances: tuple[float, ...] = TOLERANCES) -> int:
+    """
+    Régénère les variantes simplifiées d'un niveau administratif.
+
+    Args:
+        niveau: Clé de SOURCES
+        tolerances: Tolérances à calculer
+
+    Returns:
+        Nombre de géométries écrites
+    """
+    source = connection.ops.quote_name(SOURCES[niveau]._meta.db_table)
+    table = connection.ops.quote_name(GeometrieSimplifiee._meta.db_table)
+
+    GeometrieSimplifiee.objects.filter(niveau=niveau).delete()
+
+    total = 0
+    with connection.cursor() as cursor:
+        for tolerance in tolerances:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (niveau, objet_id, tolerance, geom, date_maj)
+                SELECT %s, s.id, %s, ST_Multi(ST_SimplifyPreserveTopology(s.geom, %s)), now()
+                FROM {source} s
+                WHERE s.geom IS NOT NULL
+                """,
+                [niveau, tolerance, tolerance],
+            )
+            total += cursor.rowcount
+    return total
+
+
+def simplifier_geometries(niveaux: list[str] | None = None) -> dict[str, int]:
+    """
+    Régénère les variantes simplifiées de plusieurs niveaux.
+
+    Les contours servis changent pour tous les projets : leur cache (et
+    donc leurs ETag) est invalidé.
+
+    Args:
+        niveaux: Niveaux à traiter (tous si None)
+
+    Returns:
+        Dictionnaire {niveau: nombre de géométries écrites}
+    """
+    resultats = {niveau: simplifier_niveau(niveau) for niveau in (niveaux or SOURCES)}
+    for projet_id in Projet.objects.values_list('id', flat=True):
+        invalider_projet(projet_id)
+    return resultats
@@ -0,0 +1,174 @@
+"""
+Contours administratifs subdivisés pour les prédicats spatiaux.
+
+Un pays ou une région OSM est un multipolygone de dizaines de milliers de
+sommets : son emprise couvre tout le territoire, l'index GiST ne l'écarte
+jamais et chaque ST_Intersects / ST_Contains parcourt la géométrie entière.
+ST_Subdivide découpe chaque contour en morceaux d'au plus MAX_SOMMETS
+sommets, rangés dans GeometrieSubdivisee avec leur propre index GiST :
+l'index ne retient que les quelques morceaux proches, et le test exact ne
+porte que sur eux.
+
+Les requêtes de rattachement (hiérarchie administrative, commune d'un
+point, sélection en cascade, zone d'un projet) interrogent ces morceaux
+dès qu'un niveau a été subdivisé, et les tables d'origine sinon.
+"""
+from __future__ import annotations
+
+from django.contrib.gis.geos import GEOSGeometry
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+
+from referentiels.models import CommuneGeom
+
+from .models import GeometrieSubdivisee
+from .simplification import SOURCES
+
+# Sommets maximum par morceau (ST_Subdivide accepte de 5 à 65535)
+MAX_SOMMETS = 256
+
+
+@transaction.atomic
+def subdiviser_niveau(niveau: str, max_sommets: int = MAX_SOMMETS) -> int:
+    """
+    Régénère les morceaux d'un niveau administratif.
+
+    Args:
+        niveau: Clé de SOURCES
+        max_sommets: Nombre maximal de sommets par morceau
+
+    Returns:
+        Nombre de morceaux écrits
+    """
+    source = connection.ops.quote_name(SOURCES[niveau]._meta.db_table)
+    table = connection.ops.quote_name(GeometrieSubdivisee._meta.db_table)
+
+    GeometrieSubdivisee.objects.filter(niveau=niveau).delete()
+
+    with connection.cursor() as cursor:
+        # ST_Dump : un morceau multi-parties éventuel devient autant de polygones
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (niveau, objet_id, geom, date_maj)
+            SELECT %s, s.id, d.geom, now()
+            FROM {source} s,
+                 LATERAL ST_Subdivide(s.geom, %s) AS m(geom),
+                 LATERAL ST_Dump(m.geom) AS d
+            WHERE s.geom IS NOT NULL
+              AND GeometryType(d.geom) = 'POLYGON'
+            """,
+            [niveau, max_sommets],
+        )
+        return cursor.rowcount
+
+
+def subdiviser_geometries(niveaux: list[str] | None = None) -> dict[str, int]:
+    """
+    Régénère les morceaux de plusieurs niveaux.
+
+    Args:
+        niveaux: Niveaux à traiter (tous si None)
+
+    Returns:
+        Dictionnaire {niveau: nombre de morceaux écrits}
+    """
+    return {niveau: subdiviser_niveau(niveau) for niveau in (niveaux or SOURCES)}
+
+
+def subdivision_disponible(niveau: str) -> bool:
+    """Vrai si le niveau a été subdivisé."""
+    return GeometrieSubdivisee.objects.filter(niveau=niveau).exists()
+
+
+def source_spatiale(niveau: str) -> tuple[str, list]:
+    """
+    Source SQL des prédicats spatiaux d'un niveau (colonnes id et geom).
+
+    Args:
+        niveau: Clé de SOURCES
+
+    Returns:
+        (expression FROM à aliaser, paramètres) : les morceaux du niveau
+        s'il a été subdivisé (un même id peut alors apparaître plusieurs
+        fois), la table d'origine sinon
+    """
+    if subdivision_disponible(niveau):
+        table = connection.ops.quote_name(GeometrieSubdivisee._meta.db_table)
+        return f'(SELECT objet_id AS id, geom FROM {table} WHERE niveau = %s)', [niveau]
+    return connection.ops.quote_name(SOURCES[niveau]._meta.db_table), []
+
+
+def intersecte(niveau: str, ids: list[int], champ: str = 'geom') -> Exists:
+    """
+    Condition "la géométrie intersecte au moins un des objets donnés".
+
+    À utiliser dans un filter() : Modele.objects.filter(intersecte('admin4', [12])).
+
+    Args:
+        niveau: Niveau des objets de référence (clé de SOURCES)
+        ids: Clés primaires des objets de référence
+        champ: Champ géométrique du modèle filtré
+
+    Returns:
+        Expression Exists sur les morceaux (ou la table d'origine)
+    """
+    if subdivision_disponible(niveau):
+        references = GeometrieSubdivisee.objects.filter(
+            niveau=niveau, objet_id__in=ids, geom__intersects=OuterRef(champ)
+        )
+    else:
+        references = SOURCES[niveau].objects.filter(
+            id__in=ids, geom__isnull=False, geom__intersects=OuterRef(champ)
+        )
+    return Exists(references)
+
+
+def intersections_par_parent(niveau_parent: str, parent_ids: list[int],
+                             niveau_enfant: str) -> dict[int, list[dict]]:
+    """
+    Objets d'un niveau intersectant chacun des parents donnés, en une requête.
+
+    Args:
+        niveau_parent: Niveau des parents (clé de SOURCES, morceaux si subdivisé)
+        parent_ids: Clés primaires des parents
+        niveau_enfant: Niveau des objets recherchés (table à colonne name)
+
+    Returns:
+        Dictionnaire {parent_id: [{id, name}]} (liste vide sans intersection)
+    """
+    parents, params = source_spatiale(niveau_parent)
+    enfants = connection.ops.quote_name(SOURCES[niveau_enfant]._meta.db_table)
+    resultats: dict[int, list[dict]] = {parent_id: [] for parent_id in parent_ids}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT DISTINCT p.id, e.id, e.name
+            FROM {parents} p
+            JOIN {enfants} e ON ST_Intersects(p.geom, e.geom)
+            WHERE p.id = ANY(%s)
+            """,
+            [*params, list(parent_ids)],
+        )
+        for parent_id, enfant_id, nom in cursor.fetchall():
+            resultats[parent_id].append({'id': enfant_id, 'name': nom})
+    return resultats
+
+
+def commune_du_point(point: GEOSGeometry) -> int | None:
+    """
+    Commune du référentiel contenant un point.
+
+    Args:
+        point: Point WGS84
+
+    Returns:
+        ID de la Commune, None hors de toute commune
+    """
+    if subdivision_disponible('commune'):
+        geometries = GeometrieSubdivisee.objects.filter(
+            niveau='commune', geom__contains=point
+        ).values('objet_id')
+        communes = CommuneGeom.objects.filter(id__in=geometries)
+    else:
+        communes = CommuneGeom.objects.filter(geom__contains=point)
+    return communes.order_by('commune_id').values_list('commune_id', flat=True).first()
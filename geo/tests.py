@@ -1,3 +1,403 @@
+"""
+Tests unitaires pour l'application geo (contours, rattachements spatiaux)
+"""
+import json
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.test import TestCase
+from django.urls import reverse
+
+from core.cache import version_projet
+from core.models import Projet
+from dashboard.couches import geojson_couche
+from referentiels.models import Commune, CommuneGeom, ProjetCommune, TypeInfrastructure, TypeIntervention
+from suivi.models import Indicateur, Intervention, Thematique
+
+from . import annuaire
+from .hierarchie import NIVEAUX, construire_hierarchie, marque_niveau
+from .models import (
+    Admin2,
+    Admin4,
+    Admin5,
+    GeometrieSimplifiee,
+    GeometrieSubdivisee,
+    HierarchieAdmin,
+    Infrastructure,
+    ZoneProjet,
+)
+from .simplification import TOLERANCES, simplifier_geometries, tolerance_pour_zoom, tolerance_stockee
+from .subdivision import commune_du_point, subdiviser_niveau
+
+
+def carre(x_min, y_min, x_max, y_max):
+    """MultiPolygon rectangulaire WGS84"""
+    return MultiPolygon(Polygon.from_bbox((x_min, y_min, x_max, y_max)), srid=4326)
+
+
+def disque(x, y, rayon):
+    """MultiPolygon circulaire WGS84 (33 sommets)"""
+    return MultiPolygon(Point(x, y).buffer(rayon), srid=4326)
+
+
+def creer_projet():
+    """Projet minimal d'un an"""
+    return Projet.objects.create(
+        libelle='Projet Test', bailleurs='Bailleur',
+        date_debut=date.today(), date_fin=date.today() + timedelta(days=365),
+    )
+
+
+def nouvelle_intervention(projet, **champs):
+    """Intervention non enregistrée du projet (indicateur et type créés)"""
+    thematique = Thematique.objects.create(projet=projet, code='R1', libelle='Thématique')
+    return Intervention(
+        projet=projet,
+        indicateur=Indicateur.objects.create(projet=projet, thematique=thematique, code='R1.1', libelle='Indicateur'),
+        type_intervention=TypeIntervention.objects.create(libelle='Formation', code='FORM'),
+        nature='ACTIVITE', libelle='Formation', date_intervention=date.today(),
+        **champs,
+    )
+
+
+class ContoursAdminMixin:
+    """
+    Crée les tables "geo"."admin-*" (non gérées par les migrations) et un
+    petit jeu de contours :
+
+        pays      (0,0)-(10,10)
+        régions   Ouest (0,0)-(5,10), Est (5,0)-(10,6)
+        départements
+            D-Ouest (0,0)-(5,5)  : point intérieur dans Ouest
+            D-Est   (5,0)-(10,5) : point intérieur dans Est
+            D-Nord  (4,6)-(10,10) : point intérieur hors de toute région,
+                                   recouvre surtout Ouest
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE SCHEMA IF NOT EXISTS geo')
+        with connection.schema_editor() as editor:
+            for modele in NIVEAUX.values():
+                editor.create_model(modele)
+
+        cls.pays = Admin2.objects.create(name='Pays', geom=carre(0, 0, 10, 10))
+        cls.ouest = Admin4.objects.create(name='Ouest', geom=carre(0, 0, 5, 10))
+        cls.est = Admin4.objects.create(name='Est', geom=carre(5, 0, 10, 6))
+        cls.d_ouest = Admin5.objects.create(name='D-Ouest', geom=carre(0, 0, 5, 5))
+        cls.d_est = Admin5.objects.create(name='D-Est', geom=carre(5, 0, 10, 5))
+        cls.d_nord = Admin5.objects.create(name='D-Nord', geom=carre(4, 6, 10, 10))
+
+    def setUp(self):
+        super().setUp()
+        annuaire.vider()
+        self.addCleanup(annuaire.vider)
+
+
+class SubdivisionTest(TestCase):
+    """Tests pour les contours subdivisés (geo.subdivision)"""
+
+    def setUp(self):
+        """Une commune en disque et une commune carrée voisine"""
+        self.ronde = Commune.objects.create(nom='Ronde', code_commune='T-RON')
+        self.carree = Commune.objects.create(nom='Carrée', code_commune='T-CAR')
+        CommuneGeom.objects.create(commune=self.ronde, geom=disque(0.5, 0.5, 0.5))
+        CommuneGeom.objects.create(commune=self.carree, geom=carre(1.0, 0.0, 2.0, 1.0))
+
+        self.points = {
+            'centre': Point(0.5, 0.5, srid=4326),
+            'bord': Point(0.95, 0.5, srid=4326),
+            # Dans l'emprise du disque mais hors du disque
+            'coin': Point(0.02, 0.02, srid=4326),
+            'carree': Point(1.5, 0.5, srid=4326),
+            'dehors': Point(5.0, 5.0, srid=4326),
+        }
+
+    def _communes(self):
+        return {nom: commune_du_point(point) for nom, point in self.points.items()}
+
+    def test_commune_du_point_avec_et_sans_subdivision(self):
+        """Les morceaux donnent les mêmes communes que les contours d'origine"""
+        attendu = {
+            'centre': self.ronde.id, 'bord': self.ronde.id, 'coin': None,
+            'carree': self.carree.id, 'dehors': None,
+        }
+        self.assertEqual(self._communes(), attendu)
+
+        morceaux = subdiviser_niveau('commune', max_sommets=8)
+        self.assertGreater(morceaux, 2)
+        self.assertGreater(GeometrieSubdivisee.objects.filter(niveau='commune').count(), 2)
+        self.assertEqual(self._communes(), attendu)
+
+    def test_point_hors_commune(self):
+        """Un point hors de toute commune est une erreur de validation, pas d'intégrité"""
+        intervention = nouvelle_intervention(creer_projet(), geom=self.points['dehors'])
+        with self.assertRaises(ValidationError) as erreur:
+            intervention.clean()
+        self.assertIn('commune', erreur.exception.message_dict)
+
+        intervention.geom = self.points['carree']
+        intervention.clean()
+        intervention.save()
+        self.assertEqual(intervention.commune_id, self.carree.id)
+
+    def test_rattachement_partage(self):
+        """Infrastructures et acteurs suivent la même règle que les interventions"""
+        infrastructure = Infrastructure(
+            projet=creer_projet(), nom='Forage',
+            type_infrastructure=TypeInfrastructure.objects.create(libelle='Forage', code='FOR'),
+            geom=self.points['coin'],
+        )
+        with self.assertRaises(ValidationError) as erreur:
+            infrastructure.clean()
+        self.assertIn('commune', erreur.exception.message_dict)
+
+        infrastructure.geom = self.points['centre']
+        infrastructure.save()
+        self.assertEqual(infrastructure.commune_id, self.ronde.id)
+
+
+class SimplificationTest(TestCase):
+    """Tests pour les variantes simplifiées des contours (geo.simplification)"""
+
+    def setUp(self):
+        """Une commune en disque rattachée au projet"""
+        self.projet = creer_projet()
+        commune = Commune.objects.create(nom='Ronde', code_commune='T-RON')
+        CommuneGeom.objects.create(commune=commune, geom=disque(0.5, 0.5, 0.5))
+        ProjetCommune.objects.create(projet=self.projet, commune=commune)
+
+    def _sommets(self, tolerance):
+        feature = json.loads(geojson_couche('communes', self.projet.id, tolerance))['features'][0]
+        return sum(len(anneau) for polygone in feature['geometry']['coordinates'] for anneau in polygone)
+
+    def test_tolerance_pour_zoom(self):
+        """La plus forte tolérance sous la taille d'un pixel, aucune aux grandes échelles"""
+        self.assertEqual(tolerance_pour_zoom(0), max(TOLERANCES))
+        self.assertEqual(tolerance_pour_zoom(10), 0.0005)
+        self.assertIsNone(tolerance_pour_zoom(18))
+        self.assertEqual(tolerance_stockee(0.001), 0.0005)
+        self.assertIsNone(tolerance_stockee(0.00001))
+
+    def test_variantes_servies(self):
+        """Une variante par tolérance ; la couche communes sert la variante demandée"""
+        version = version_projet(self.projet.id)
+        self.assertEqual(simplifier_geometries(['commune']), {'commune': len(TOLERANCES)})
+        self.assertEqual(GeometrieSimplifiee.objects.filter(niveau='commune').count(), len(TOLERANCES))
+        self.assertGreater(version_projet(self.projet.id), version)
+
+        self.assertEqual(self._sommets(None), 33)
+        self.assertEqual(self._sommets(0.0001), 33)
+        self.assertLess(self._sommets(0.01), 33)
+
+    def test_variante_absente(self):
+        """Sans variante calculée, le contour d'origine est servi"""
+        self.assertEqual(self._sommets(0.01), 33)
+
+
+class CascadeTest(ContoursAdminMixin, TestCase):
+    """Tests pour les API de sélection en cascade (accueil.api_views)"""
+
+    @staticmethod
+    def _reference(modele_parent, modele_enfant, ids):
+        """Ancienne implémentation : une intersection par parent, dédoublonnage en Python"""
+        resultats = {}
+        for parent in modele_parent.objects.filter(id__in=ids):
+            for element in modele_enfant.objects.filter(geom__intersects=parent.geom).values('id', 'name'):
+                resultats.setdefault(element['id'], element)
+        return sorted(resultats.values(), key=lambda element: element['name'] or '')
+
+    def _cascade(self, nom_url, parametre, ids):
+        reponse = self.client.get(reverse(nom_url), {parametre: ','.join(map(str, ids))})
+        self.assertEqual(reponse.status_code, 200)
+        return reponse.json()
+
+    def _verifier(self):
+        selections = ([self.ouest.id], [self.est.id], [self.ouest.id, self.est.id, self.ouest.id])
+        for ids in selections:
+            annuaire.vider()
+            self.assertEqual(
+                self._cascade('api_get_departements', 'region_ids', ids),
+                {'departements': self._reference(Admin4, Admin5, ids)},
+            )
+        self.assertEqual(
+            self._cascade('api_get_regions', 'pays_ids', [self.pays.id]),
+            {'regions': self._reference(Admin2, Admin4, [self.pays.id])},
+        )
+
+    def test_identique_a_l_ancienne_implementation(self):
+        """Sans hiérarchie construite, même JSON que la boucle par parent"""
+        self._verifier()
+
+    def test_identique_avec_contours_subdivises(self):
+        """Les morceaux subdivisés des parents ne changent pas le résultat"""
+        subdiviser_niveau('admin2', max_sommets=5)
+        subdiviser_niveau('admin4', max_sommets=5)
+        self._verifier()
+
+    def test_ids_invalides(self):
+        """Un paramètre non numérique est refusé"""
+        reponse = self.client.get(reverse('api_get_departements'), {'region_ids': '1,abc'})
+        self.assertEqual(reponse.status_code, 400)
+
+
+class HierarchieTest(ContoursAdminMixin, TestCase):
+    """Tests pour la hiérarchie administrative précalculée (geo.hierarchie)"""
+
+    def _rattachements(self, niveau_enfant):
+        return {
+            enfant_id: (parent_id, methode)
+            for enfant_id, parent_id, methode in HierarchieAdmin.objects.filter(
+                niveau_enfant=niveau_enfant
+            ).values_list('enfant_id', 'parent_id', 'methode')
+        }
+
+    def test_point_puis_surface(self):
+        """Point intérieur d'abord, plus grand recouvrement à défaut"""
+        resultats = construire_hierarchie()
+
+        self.assertEqual(resultats['admin2>admin4'], 2)
+        self.assertEqual(resultats['admin4>admin5'], 3)
+        self.assertEqual(self._rattachements('admin4'), {
+            self.ouest.id: (self.pays.id, 'POINT'),
+            self.est.id: (self.pays.id, 'POINT'),
+        })
+        self.assertEqual(self._rattachements('admin5'), {
+            self.d_ouest.id: (self.ouest.id, 'POINT'),
+            self.d_est.id: (self.est.id, 'POINT'),
+            self.d_nord.id: (self.ouest.id, 'SURFACE'),
+        })
+
+    def test_paires_inchangees_ignorees(self):
+        """Seules les paires dont un niveau a changé sont recalculées"""
+        construire_hierarchie()
+        self.assertEqual(set(construire_hierarchie().values()), {None})
+
+        Admin5.objects.filter(pk=self.d_nord.pk).update(name='D-Nord renommé')
+        resultats = construire_hierarchie()
+        self.assertEqual(resultats, {
+            'admin2>admin4': None,
+            'admin4>admin5': 3,
+            'admin5>admin7': 0,
+            'admin7>admin8': None,
+        })
+        self.assertEqual(
+            HierarchieAdmin.objects.get(niveau_enfant='admin5', enfant_id=self.d_nord.id).nom,
+            'D-Nord renommé',
+        )
+
+        resultats = construire_hierarchie(force=True)
+        self.assertNotIn(None, resultats.values())
+
+
+class AnnuaireTest(ContoursAdminMixin, TestCase):
+    """Tests pour l'annuaire des niveaux administratifs (geo.annuaire)"""
+
+    def test_eviction_lru(self):
+        """Au-delà de MAX_ENTREES, l'entrée la moins récemment lue est évincée"""
+        with mock.patch.object(annuaire, 'MAX_ENTREES', 2):
+            annuaire.liste_niveau('admin2')
+            annuaire.liste_niveau('admin4')
+            annuaire.liste_niveau('admin2')  # admin4 devient la plus ancienne
+            annuaire.liste_niveau('admin5')
+
+            self.assertEqual(len(annuaire._entrees), 2)
+            niveaux = {cle[2] for cle in annuaire._entrees}
+            self.assertEqual(niveaux, {'admin2', 'admin5'})
+
+            with self.assertNumQueries(0):
+                annuaire.liste_niveau('admin2')
+            with self.assertNumQueries(1):
+                annuaire.liste_niveau('admin4')
+
+    def test_parents_absents_en_une_requete(self):
+        """Les parents absents du cache sont calculés ensemble, puis servis un par un"""
+        def requetes(ids):
+            annuaire.vider()
+            annuaire.version_contours()
+            with CaptureQueriesContext(connection) as contexte:
+                annuaire.enfants_de('admin4', ids)
+            return len(contexte)
+
+        for construire in (False, True):
+            if construire:
+                construire_hierarchie()
+            self.assertEqual(requetes([self.ouest.id, self.est.id]), requetes([self.ouest.id]))
+
+        annuaire.enfants_de('admin4', [self.ouest.id])
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [e['name'] for e in annuaire.enfants_de('admin4', [self.ouest.id])],
+                ['D-Nord', 'D-Ouest'],
+            )
+
+    def test_version_import_direct(self):
+        """Une modification directe des contours invalide l'annuaire"""
+        self.assertEqual([e['name'] for e in annuaire.liste_niveau('admin4')], ['Est', 'Ouest'])
+        marque = marque_niveau('admin4')
+
+        # Import hors de construire_hierarchie_admin : aucune empreinte écrite
+        Admin4.objects.filter(pk=self.est.pk).update(name='Levant')
+        self.assertNotEqual(marque_niveau('admin4'), marque)
+
+        # Version pas encore relue : l'entrée en cache est servie
+        self.assertEqual([e['name'] for e in annuaire.liste_niveau('admin4')], ['Est', 'Ouest'])
+
+        with mock.patch.object(annuaire, 'VERIFICATION', -1):
+            self.assertEqual([e['name'] for e in annuaire.liste_niveau('admin4')], ['Levant', 'Ouest'])
+
+        Admin4.objects.filter(pk=self.est.pk).delete()
+        annuaire.vider()
+        self.assertEqual([e['name'] for e in annuaire.liste_niveau('admin4')], ['Ouest'])
+
+
+class ZoneProjetTest(ContoursAdminMixin, TestCase):
+    """Tests pour la zone matérialisée des projets (geo.zones, geo.signals)"""
+
+    def setUp(self):
+        super().setUp()
+        self.projet = creer_projet()
+
+    def _emprise(self):
+        return ZoneProjet.objects.get(projet=self.projet).emprise.extent
+
+    def test_reconstruction_sur_m2m_changed(self):
+        """Ajout, retrait et vidage de la sélection reconstruisent la zone après commit"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.projet.zone_departements.add(self.d_ouest)
+        self.assertEqual(ZoneProjet.objects.get(projet=self.projet).niveau, 'admin5')
+        self.assertEqual(self._emprise(), (0.0, 0.0, 5.0, 5.0))
+
+        # Depuis l'entité administrative (relation inverse)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.d_est.projets_zone.add(self.projet)
+        self.assertEqual(self._emprise(), (0.0, 0.0, 10.0, 5.0))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.projet.zone_departements.remove(self.d_est)
+        self.assertEqual(self._emprise(), (0.0, 0.0, 5.0, 5.0))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.projet.zone_departements.clear()
+        self.assertFalse(ZoneProjet.objects.filter(projet=self.projet).exists())
+
+    def test_intervention_hors_zone(self):
+        """Une intervention localisée hors de la zone du projet est refusée"""
+        commune = Commune.objects.create(nom='Commune', code_commune='T-COM')
+        intervention = nouvelle_intervention(self.projet, commune=commune, geom=Point(7, 2, srid=4326))
+        # Sans zone matérialisée, pas de contrôle
+        intervention.clean()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.projet.zone_departements.add(self.d_ouest)
+        with self.assertRaises(ValidationError) as erreur:
+            intervention.clean()
+        self.assertIn('geom', erreur.exception.message_dict)
 
-# Create your tests here.
+        intervention.geom = Point(2, 2, srid=4326)
+        intervention.clean()
@@ -0,0 +1,152 @@
+"""
+Zone d'intervention matérialisée des projets (ZoneProjet).
+
+La zone d'un projet est saisie comme une sélection en cascade (zone_pays,
+zone_regions, zone_departements, zone_arrondissements, zone_communes).
+Plutôt que de recombiner ces relations à chaque affichage, leur union est
+calculée une fois par PostGIS et stockée avec son emprise, son centroïde
+et un contour simplifié.
+
+La zone est construite à partir du niveau sélectionné le plus fin (les
+niveaux supérieurs ne servent qu'à guider la cascade) ; sans sélection,
+les communes du référentiel rattachées au projet (ProjetCommune) sont
+utilisées.
+"""
+from __future__ import annotations
+
+from django.contrib.gis.geos import GEOSGeometry
+from django.db import connection, transaction
+
+from core.models import Projet
+from referentiels.models import CommuneGeom
+
+from .models import ZoneProjet
+from .simplification import SOURCES
+
+# Relations de zone, du niveau le plus fin au plus large
+NIVEAUX_ZONE = (
+    ('zone_communes', 'admin8'),
+    ('zone_arrondissements', 'admin7'),
+    ('zone_departements', 'admin5'),
+    ('zone_regions', 'admin4'),
+    ('zone_pays', 'admin2'),
+)
+
+# Tolérance du contour simplifié (degrés, ~220 m à l'équateur)
+TOLERANCE_CONTOUR = 0.002
+
+
+def selection_zone(projet: Projet) -> tuple[str, list[int]] | None:
+    """
+    Niveau et géométries composant la zone d'un projet.
+
+    Args:
+        projet: Projet
+
+    Returns:
+        (niveau de SOURCES, IDs des géométries), None sans zone ni commune
+    """
+    for champ, niveau in NIVEAUX_ZONE:
+        ids = list(getattr(projet, champ).values_list('id', flat=True))
+        if ids:
+            return niveau, ids
+
+    ids = list(CommuneGeom.objects.filter(
+        commune__commune_projets__projet=projet
+    ).values_list('id', flat=True))
+    return ('commune', ids) if ids else None
+
+
+@transaction.atomic
+def construire_zone(projet_id: int) -> ZoneProjet | None:
+    """
+    Recalcule la zone matérialisée d'un projet.
+
+    Args:
+        projet_id: ID du projet
+
+    Returns:
+        ZoneProjet à jour, None si le projet n'a pas de zone (ligne supprimée)
+    """
+    projet = Projet.objects.filter(pk=projet_id).first()
+    selection = selection_zone(projet) if projet else None
+    if selection is None:
+        ZoneProjet.objects.filter(projet_id=projet_id).delete()
+        return None
+
+    niveau, ids = selection
+    source = connection.ops.quote_name(SOURCES[niveau]._meta.db_table)
+    table = connection.ops.quote_name(ZoneProjet._meta.db_table)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH zone AS (
+                SELECT ST_Multi(ST_CollectionExtract(ST_UnaryUnion(ST_Collect(s.geom)), 3)) AS geom
+                FROM {source} s
+                WHERE s.id = ANY(%s) AND s.geom IS NOT NULL
+            )
+            INSERT INTO {table} (projet_id, niveau, geom, emprise, centroid, contour, date_maj)
+            SELECT %s, %s, geom, ST_Envelope(geom), ST_Centroid(geom),
+                   ST_Multi(ST_CollectionExtract(ST_SimplifyPreserveTopology(geom, %s), 3)), now()
+            FROM zone
+            WHERE geom IS NOT NULL AND NOT ST_IsEmpty(geom)
+            ON CONFLICT (projet_id) DO UPDATE SET
+                niveau = EXCLUDED.niveau, geom = EXCLUDED.geom, emprise = EXCLUDED.emprise,
+                centroid = EXCLUDED.centroid, contour = EXCLUDED.contour, date_maj = EXCLUDED.date_maj
+            """,
+            [ids, projet_id, niveau, TOLERANCE_CONTOUR],
+        )
+        ecrite = cursor.rowcount
+
+    if not ecrite:
+        ZoneProjet.objects.filter(projet_id=projet_id).delete()
+        return None
+    return ZoneProjet.objects.get(projet_id=projet_id)
+
+
+def reconstruire_zones(projet_id: int | None = None) -> int:
+    """
+    Recalcule la zone matérialisée de tous les projets (ou d'un seul).
+
+    Args:
+        projet_id: Limiter à un projet
+
+    Returns:
+        Nombre de zones écrites
+    """
+    projets = Projet.objects.order_by('id').values_list('id', flat=True)
+    if projet_id is not None:
+        projets = projets.filter(pk=projet_id)
+    return sum(construire_zone(pk) is not None for pk in projets)
+
+
+def emprise_zone(projet_id: int) -> list[float] | None:
+    """
+    Emprise de la zone matérialisée d'un projet.
+
+    Args:
+        projet_id: ID du projet
+
+    Returns:
+        [lon_min, lat_min, lon_max, lat_max], None sans zone
+    """
+    zone = ZoneProjet.objects.filter(projet_id=projet_id).only('emprise').first()
+    return list(zone.emprise.extent) if zone else None
+
+
+def dans_zone(projet_id: int, geom: GEOSGeometry) -> bool | None:
+    """
+    Vrai si une géométrie touche la zone d'un projet (index GiST de la zone).
+
+    Args:
+        projet_id: ID du projet
+        geom: Géométrie WGS84 (point d'une intervention...)
+
+    Returns:
+        True / False, None si le projet n'a pas de zone matérialisée
+    """
+    zones = ZoneProjet.objects.filter(projet_id=projet_id)
+    if not zones.exists():
+        return None
+    return zones.filter(geom__intersects=geom).exists()
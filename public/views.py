@@ -9,7 +9,8 @@ from django.http import HttpRequest, HttpResponse
 from django.shortcuts import render
 
 from referentiels.models import Commune
-from suivi.models import CibleIndicateur, Indicateur, Intervention, ValeurIndicateur
+from suivi.aggregations import calculer_pourcentage
+from suivi.models import Indicateur, Intervention
 
 
 def public_home(request: HttpRequest) -> HttpResponse:
@@ -88,27 +89,14 @@ def public_indicateurs(request: HttpRequest) -> HttpResponse:
     Returns:
         Page HTML listant les indicateurs publics
     """
-    # Tous les indicateurs avec leurs valeurs
-    indicateurs = Indicateur.objects.select_related('thematique').all()
+    # Tous les indicateurs avec leur dernière valeur publiée et leur cible (une seule requête)
+    indicateurs = Indicateur.objects.with_current_values(statut='PUBLIE').select_related('thematique')
 
     # Enrichir avec les valeurs actuelles
     for indicateur in indicateurs:
-        derniere_valeur = ValeurIndicateur.objects.filter(
-            indicateur=indicateur,
-            statut='PUBLIE'
-        ).order_by('-date_mesure').first()
-
-        if derniere_valeur:
-            # Récupérer la cible
-            cible = CibleIndicateur.objects.filter(
-                indicateur=indicateur,
-                commune__isnull=True
-            ).order_by('-annee').first()
-
-            indicateur.valeur_actuelle = derniere_valeur.valeur_realisee
-            indicateur.pourcentage = 0
-            if cible and cible.valeur_cible > 0:
-                indicateur.pourcentage = round((float(derniere_valeur.valeur_realisee) / float(cible.valeur_cible)) * 100, 1)
+        if indicateur.valeur_courante is not None:
+            indicateur.valeur_actuelle = indicateur.valeur_courante
+            indicateur.pourcentage = calculer_pourcentage(indicateur.valeur_courante, indicateur.cible_courante)
         else:
             indicateur.valeur_actuelle = 0
             indicateur.pourcentage = 0
@@ -3,6 +3,7 @@ Administration des référentiels mutualisés
 """
 from django.contrib.gis import admin as gis_admin
 from django.contrib import admin
+from core.admin import ListeLegereMixin
 from .models import (
     Commune, CommuneGeom, ChefLieu, ProjetCommune,
     TypeIntervention, TypeInfrastructure, TypeActeur,
@@ -44,7 +45,7 @@ class CommuneAdmin(admin.ModelAdmin):
 
 
 @gis_admin.register(CommuneGeom)
-class CommuneGeomAdmin(gis_admin.GISModelAdmin):
+class CommuneGeomAdmin(ListeLegereMixin, gis_admin.GISModelAdmin):
     """Administration des géométries des communes"""
     list_display = ('commune', 'superficie')
     search_fields = ('commune__nom',)
@@ -52,7 +53,7 @@ class CommuneGeomAdmin(gis_admin.GISModelAdmin):
 
 
 @gis_admin.register(ChefLieu)
-class ChefLieuAdmin(gis_admin.GISModelAdmin):
+class ChefLieuAdmin(ListeLegereMixin, gis_admin.GISModelAdmin):
     """Administration des chefs-lieux"""
     list_display = ('nom', 'commune')
     search_fields = ('nom', 'commune__nom')
@@ -69,7 +70,7 @@ class ProjetCommuneAdmin(admin.ModelAdmin):
 
 
 @admin.register(TypeIntervention)
-class TypeInterventionAdmin(admin.ModelAdmin):
+class TypeInterventionAdmin(ListeLegereMixin, admin.ModelAdmin):
     """Administration des types d'interventions"""
     list_display = ('code', 'libelle', 'couleur_hex', 'actif')
     list_filter = ('actif',)
@@ -86,7 +87,7 @@ class TypeInterventionAdmin(admin.ModelAdmin):
 
 
 @admin.register(TypeInfrastructure)
-class TypeInfrastructureAdmin(admin.ModelAdmin):
+class TypeInfrastructureAdmin(ListeLegereMixin, admin.ModelAdmin):
     """Administration des types d'infrastructures"""
     list_display = ('code', 'libelle', 'icone_poi', 'couleur_hex', 'actif')
     list_filter = ('actif',)
@@ -103,7 +104,7 @@ class TypeInfrastructureAdmin(admin.ModelAdmin):
 
 
 @admin.register(TypeActeur)
-class TypeActeurAdmin(admin.ModelAdmin):
+class TypeActeurAdmin(ListeLegereMixin, admin.ModelAdmin):
     """Administration des types d'acteurs"""
     list_display = ('code', 'libelle', 'icone_poi', 'couleur_hex', 'actif')
     list_filter = ('actif',)
@@ -4,6 +4,7 @@ Modèles de référentiels mutualisés entre projets
 from django.contrib.gis.db import models as gis_models
 from django.db import models
 from core.models import Projet
+from core.querysets import ListeQuerySet
 
 
 class Commune(models.Model):
@@ -44,6 +45,8 @@ class CommuneGeom(gis_models.Model):
     superficie = models.FloatField(null=True, blank=True,
                                   help_text="Superficie en km²")
 
+    objects = ListeQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Géométrie de commune"
         verbose_name_plural = "Géométries des communes"
@@ -3,11 +3,12 @@ Administration des rapports de sécurité
 """
 from django.contrib.gis import admin as gis_admin
 from django.contrib import admin
+from core.admin import ListeLegereMixin
 from .models import TypeInsecurite, SecurityReport
 
 
 @admin.register(TypeInsecurite)
-class TypeInsecuriteAdmin(admin.ModelAdmin):
+class TypeInsecuriteAdmin(ListeLegereMixin, admin.ModelAdmin):
     """Administration des types d'insécurité"""
     list_display = ('code', 'libelle', 'gravite_defaut', 'couleur_hex', 'actif')
     list_filter = ('gravite_defaut', 'actif')
@@ -24,7 +25,7 @@ class TypeInsecuriteAdmin(admin.ModelAdmin):
 
 
 @gis_admin.register(SecurityReport)
-class SecurityReportAdmin(gis_admin.GISModelAdmin):
+class SecurityReportAdmin(ListeLegereMixin, gis_admin.GISModelAdmin):
     """Administration des rapports de sécurité"""
     list_display = ('libelle', 'type_insecurite', 'commune', 'gravite', 'statut', 'date_incident')
     list_filter = ('projet', 'type_insecurite', 'gravite', 'statut', 'commune', 'source_signalement')
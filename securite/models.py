@@ -5,6 +5,7 @@ from django.contrib.gis.db import models as gis_models
 from django.db import models
 from django.utils import timezone
 from core.models import Projet, User
+from core.querysets import ListeQuerySet
 from referentiels.models import Commune
 
 
@@ -138,6 +139,8 @@ class SecurityReport(gis_models.Model):
                                    related_name='security_reports_modifies')
     date_modification = models.DateTimeField(auto_now=True)
 
+    objects = ListeQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Rapport de sécurité"
         verbose_name_plural = "Rapports de sécurité"
@@ -4,9 +4,11 @@ Administration des modèles de suivi (indicateurs, interventions)
 from django.contrib.gis import admin as gis_admin
 from django.contrib import admin
 from django import forms
+from core.admin import ListeLegereMixin
 from .models import (
     Thematique, Indicateur, CibleIndicateur, Intervention,
-    ValeurIndicateur, InterventionActeur, InterventionInfrastructure
+    ValeurIndicateur, InterventionActeur, InterventionInfrastructure,
+    ProgressionIndicateur, SyntheseTrimestrielle
 )
 
 
@@ -25,7 +27,7 @@ class IndicateurInline(admin.TabularInline):
 
 
 @admin.register(Thematique)
-class ThematiqueAdmin(admin.ModelAdmin):
+class ThematiqueAdmin(ListeLegereMixin, admin.ModelAdmin):
     """Administration des thématiques"""
     list_display = ('code', 'libelle', 'projet', 'ordre')
     list_filter = ('projet',)
@@ -41,7 +43,7 @@ class CibleIndicateurInline(admin.TabularInline):
 
 
 @admin.register(Indicateur)
-class IndicateurAdmin(admin.ModelAdmin):
+class IndicateurAdmin(ListeLegereMixin, admin.ModelAdmin):
     """Administration des indicateurs"""
     list_display = ('code', 'libelle', 'thematique', 'unite_mesure', 'type_calcul')
     list_filter = ('thematique__projet', 'thematique', 'type_calcul')
@@ -70,7 +72,7 @@ class CibleIndicateurAdmin(admin.ModelAdmin):
 
 
 @gis_admin.register(Intervention)
-class InterventionAdmin(gis_admin.GISModelAdmin):
+class InterventionAdmin(ListeLegereMixin, gis_admin.GISModelAdmin):
     """Administration des interventions"""
     form = InterventionAdminForm
     list_display = ('libelle', 'nature', 'indicateur', 'commune', 'date_intervention', 'statut')
@@ -150,7 +152,7 @@ class InterventionAdmin(gis_admin.GISModelAdmin):
 
 
 @admin.register(ValeurIndicateur)
-class ValeurIndicateurAdmin(admin.ModelAdmin):
+class ValeurIndicateurAdmin(ListeLegereMixin, admin.ModelAdmin):
     """Administration des valeurs d'indicateurs"""
     list_display = ('indicateur', 'commune', 'valeur_realisee', 'date_mesure', 'source', 'statut')
     list_filter = ('indicateur__thematique__projet', 'indicateur', 'source', 'statut', 'commune')
@@ -164,6 +166,36 @@ class ValeurIndicateurAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 
+@admin.register(ProgressionIndicateur)
+class ProgressionIndicateurAdmin(admin.ModelAdmin):
+    """Consultation de la table de progression (maintenue automatiquement)"""
+    list_display = ('indicateur', 'commune', 'annee', 'total_realise', 'nb_interventions', 'total_cible', 'date_maj')
+    list_filter = ('projet', 'annee', 'commune')
+    search_fields = ('indicateur__code', 'indicateur__libelle')
+    list_select_related = ('indicateur', 'commune')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(SyntheseTrimestrielle)
+class SyntheseTrimestrielleAdmin(admin.ModelAdmin):
+    """Consultation de la synthèse trimestrielle (maintenue automatiquement)"""
+    list_display = ('indicateur', 'commune', 'annee', 'trimestre', 'statut', 'nb_valeurs', 'somme', 'derniere_valeur', 'date_maj')
+    list_filter = ('projet', 'annee', 'trimestre', 'statut')
+    search_fields = ('indicateur__code', 'indicateur__libelle')
+    list_select_related = ('indicateur', 'commune')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(InterventionActeur)
 class InterventionActeurAdmin(admin.ModelAdmin):
     """Administration des relations Intervention-Acteur"""
@@ -172,7 +204,7 @@ class InterventionActeurAdmin(admin.ModelAdmin):
 
 
 @admin.register(InterventionInfrastructure)
-class InterventionInfrastructureAdmin(admin.ModelAdmin):
+class InterventionInfrastructureAdmin(ListeLegereMixin, admin.ModelAdmin):
     """Administration des relations Intervention-Infrastructure"""
     list_display = ('intervention', 'infrastructure')
     autocomplete_fields = ['intervention', 'infrastructure']
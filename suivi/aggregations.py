@@ -0,0 +1,235 @@
+"""
+Service d'agrégation des réalisations et des cibles d'un projet.
+
+Calcule les totaux réalisés/cibles par thématique, par commune, par
+indicateur et pour l'ensemble du projet à l'aide de quelques requêtes
+groupées (GROUP BY + agrégats conditionnels) sur la table dénormalisée
+ProgressionIndicateur. Le nombre de requêtes reste constant quel que soit
+le nombre de thématiques ou de communes, et aucune requête ne parcourt
+l'historique des interventions.
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Any
+
+from django.db.models import Q, Sum
+
+from referentiels.models import Commune
+
+from .models import Indicateur, Intervention, ProgressionIndicateur, Thematique
+
+# Année de référence des cibles utilisée par les tableaux de bord
+ANNEE_CIBLE = 2025
+
+# Filtre des interventions comptabilisées comme réalisées
+FILTRE_REALISE = Q(statut='TERMINE')
+
+
+def calculer_pourcentage(realise: int | float, cible: int | float) -> float:
+    """
+    Taux d'avancement arrondi à une décimale (0 si pas de cible).
+
+    Args:
+        realise: Valeur réalisée
+        cible: Valeur cible
+
+    Returns:
+        Pourcentage d'avancement
+    """
+    if not cible or cible <= 0:
+        return 0
+    return round((realise / cible) * 100, 1)
+
+
+def calculer_kpis_projet(projet_id: int) -> dict[str, Any]:
+    """
+    KPIs globaux du projet (table de progression + interventions du mois).
+
+    Args:
+        projet_id: ID du projet
+
+    Returns:
+        Dictionnaire avec interventions_realisees, interventions_ce_mois
+        et beneficiaires_touches
+    """
+    debut_mois = date.today().replace(day=1)
+
+    totaux = ProgressionIndicateur.objects.filter(projet_id=projet_id).aggregate(
+        realisees=Sum('nb_interventions'),
+        beneficiaires=Sum('total_realise'),
+    )
+    interventions_ce_mois = Intervention.objects.filter(
+        FILTRE_REALISE, projet_id=projet_id, date_intervention__gte=debut_mois
+    ).count()
+
+    return {
+        'interventions_realisees': totaux['realisees'] or 0,
+        'interventions_ce_mois': interventions_ce_mois,
+        'beneficiaires_touches': totaux['beneficiaires'] or 0,
+    }
+
+
+def _progression_par(
+    projet_id: int, champ: str, annee: int, filtre_cible: Q = Q(), **filtres: Any
+) -> dict[Any, dict[str, int]]:
+    """
+    Réalisé (toutes années) et cible (année donnée) groupés par `champ`.
+
+    Args:
+        projet_id: ID du projet
+        champ: Champ de regroupement (ex: 'commune_id')
+        annee: Année des cibles
+        filtre_cible: Restriction supplémentaire sur les cibles comptées
+        **filtres: Filtres appliqués à toutes les cellules
+
+    Returns:
+        Dictionnaire {valeur du champ: {total, nombre, cible}}
+    """
+    lignes = ProgressionIndicateur.objects.filter(
+        projet_id=projet_id, **filtres
+    ).values(champ).annotate(
+        total=Sum('total_realise'),
+        nombre=Sum('nb_interventions'),
+        cible=Sum('total_cible', filter=Q(annee=annee) & filtre_cible),
+    ).order_by()
+
+    return {
+        ligne[champ]: {
+            'total': ligne['total'] or 0,
+            'nombre': ligne['nombre'] or 0,
+            'cible': ligne['cible'] or 0,
+        }
+        for ligne in lignes
+    }
+
+
+def calculer_stats_thematiques(projet_id: int, annee: int = ANNEE_CIBLE) -> list[dict[str, Any]]:
+    """
+    Réalisé/cible par thématique (toutes communes confondues).
+
+    Args:
+        projet_id: ID du projet
+        annee: Année des cibles
+
+    Returns:
+        Liste ordonnée de dictionnaires (id, code, libelle, total_realise,
+        total_cible, pourcentage)
+    """
+    progression = _progression_par(projet_id, 'indicateur__thematique_id', annee)
+
+    stats = []
+    for thematique in Thematique.objects.filter(projet_id=projet_id).order_by('ordre'):
+        valeurs = progression.get(thematique.id, {})
+        total_realise = valeurs.get('total', 0)
+        total_cible = valeurs.get('cible', 0)
+        stats.append({
+            'id': thematique.id,
+            'code': thematique.code,
+            'libelle': thematique.libelle,
+            'pourcentage': calculer_pourcentage(total_realise, total_cible),
+            'total_realise': total_realise,
+            'total_cible': total_cible,
+        })
+
+    return stats
+
+
+def calculer_stats_par_commune(projet_id: int, annee: int = ANNEE_CIBLE) -> dict[int, dict[str, Any]]:
+    """
+    Réalisé/cible indexé par ID de commune.
+
+    Seules les communes ayant des interventions terminées ou des cibles
+    (cellules de progression) apparaissent dans le dictionnaire.
+
+    Args:
+        projet_id: ID du projet
+        annee: Année des cibles
+
+    Returns:
+        Dictionnaire {commune_id: {realise, interventions_count, cible, pourcentage}}
+    """
+    progression = _progression_par(projet_id, 'commune_id', annee, commune__isnull=False)
+
+    return {
+        commune_id: {
+            'realise': valeurs['total'],
+            'interventions_count': valeurs['nombre'],
+            'cible': valeurs['cible'],
+            'pourcentage': calculer_pourcentage(valeurs['total'], valeurs['cible']),
+        }
+        for commune_id, valeurs in progression.items()
+    }
+
+
+def calculer_stats_communes(projet_id: int, annee: int = ANNEE_CIBLE) -> list[dict[str, Any]]:
+    """
+    Réalisé/cible pour chaque commune du projet, triées par nom.
+
+    Args:
+        projet_id: ID du projet
+        annee: Année des cibles
+
+    Returns:
+        Liste de dictionnaires (id, nom, realise, interventions_count,
+        cible, pourcentage)
+    """
+    par_commune = calculer_stats_par_commune(projet_id, annee)
+    vide = {'realise': 0, 'interventions_count': 0, 'cible': 0, 'pourcentage': 0}
+
+    communes = Commune.objects.filter(
+        commune_projets__projet_id=projet_id
+    ).distinct().order_by('nom')
+
+    return [
+        {'id': commune.id, 'nom': commune.nom, **par_commune.get(commune.id, vide)}
+        for commune in communes
+    ]
+
+
+def calculer_stats_indicateurs(thematique: Thematique, annee: int = ANNEE_CIBLE) -> list[dict[str, Any]]:
+    """
+    Réalisé/cible globale pour chaque indicateur d'une thématique.
+
+    Args:
+        thematique: Thématique dont on veut le détail
+        annee: Année des cibles
+
+    Returns:
+        Liste de dictionnaires (indicateur, cible, realise, pourcentage)
+    """
+    progression = _progression_par(
+        thematique.projet_id, 'indicateur_id', annee,
+        filtre_cible=Q(commune__isnull=True),
+        indicateur__thematique=thematique,
+    )
+    indicateurs = Indicateur.objects.filter(thematique=thematique).order_by('ordre', 'code')
+
+    stats = []
+    for indicateur in indicateurs:
+        valeurs = progression.get(indicateur.id, {})
+        realise = valeurs.get('total', 0)
+        cible = valeurs.get('cible', 0)
+        stats.append({
+            'indicateur': indicateur,
+            'cible': cible,
+            'realise': realise,
+            'pourcentage': calculer_pourcentage(realise, cible),
+        })
+
+    return stats
+
+
+def calculer_avancement_global(thematiques_stats: list[dict[str, Any]]) -> float:
+    """
+    Moyenne des pourcentages d'avancement des thématiques.
+
+    Args:
+        thematiques_stats: Résultat de calculer_stats_thematiques
+
+    Returns:
+        Avancement global arrondi à une décimale
+    """
+    if not thematiques_stats:
+        return 0
+    return round(sum(t['pourcentage'] for t in thematiques_stats) / len(thematiques_stats), 1)
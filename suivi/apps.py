@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SuiviConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'suivi'
+
+    def ready(self):
+        # Enregistrement des signaux (table de progression)
+        from . import signals  # noqa: F401
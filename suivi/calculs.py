@@ -0,0 +1,148 @@
+"""
+Calcul automatique des valeurs d'indicateurs selon leur type de calcul.
+
+Tous les indicateurs d'un projet sont évalués en une passe, directement en
+base : une requête groupée par (indicateur, commune) et une requête groupée
+par indicateur (valeur globale). Le type de calcul est appliqué en SQL via
+CASE WHEN :
+
+- SOMME : somme des valeur_quantitative des interventions terminées
+- MOYENNE : moyenne arrondie des valeur_quantitative
+- DENOMBREMENT : nombre d'interventions terminées
+- MANUEL : ignoré (saisie manuelle uniquement)
+
+Les résultats sont enregistrés comme ValeurIndicateur (source CALCUL_AUTO).
+"""
+from __future__ import annotations
+
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Avg, Case, Count, IntegerField, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, Round
+
+from core.cache import invalidation_suspendue, invalider_projet
+
+from .aggregations import FILTRE_REALISE
+from .models import Indicateur, Intervention, ValeurIndicateur
+from .syntheses import reconstruire_synthese, synthese_suspendue
+
+TYPES_CALCULES = ('SOMME', 'MOYENNE', 'DENOMBREMENT')
+
+
+def _expression_valeur() -> Case:
+    """Expression SQL de la valeur selon le type de calcul de l'indicateur."""
+    return Case(
+        When(indicateur__type_calcul='SOMME',
+             then=Coalesce(Sum('valeur_quantitative'), Value(0))),
+        When(indicateur__type_calcul='MOYENNE',
+             then=Coalesce(Cast(Round(Avg('valeur_quantitative')), IntegerField()), Value(0))),
+        When(indicateur__type_calcul='DENOMBREMENT',
+             then=Count('id')),
+        output_field=IntegerField(),
+    )
+
+
+def calculer_indicateurs(projet_id: int, date_mesure: date | None = None) -> list[ValeurIndicateur]:
+    """
+    Calcule les valeurs de tous les indicateurs calculables d'un projet.
+
+    Chaque indicateur non MANUEL reçoit une valeur globale (0 sans
+    intervention terminée) et une valeur par commune ayant des réalisations.
+    Seules les interventions datées au plus tard de date_mesure comptent :
+    un calcul rétroactif reproduit la valeur de l'époque.
+
+    Args:
+        projet_id: ID du projet
+        date_mesure: Date des valeurs produites (aujourd'hui par défaut)
+
+    Returns:
+        Liste de ValeurIndicateur non enregistrées
+    """
+    date_mesure = date_mesure or date.today()
+
+    interventions = Intervention.objects.filter(
+        FILTRE_REALISE,
+        indicateur__projet_id=projet_id,
+        indicateur__type_calcul__in=TYPES_CALCULES,
+        date_intervention__lte=date_mesure,
+    )
+
+    par_commune = interventions.values(
+        'indicateur_id', 'indicateur__type_calcul', 'commune_id'
+    ).annotate(valeur=_expression_valeur()).order_by()
+
+    globales = dict(
+        interventions.values(
+            'indicateur_id', 'indicateur__type_calcul'
+        ).annotate(valeur=_expression_valeur()).order_by().values_list('indicateur_id', 'valeur')
+    )
+
+    valeurs = [
+        ValeurIndicateur(
+            indicateur_id=ligne['indicateur_id'],
+            commune_id=ligne['commune_id'],
+            valeur_realisee=ligne['valeur'],
+            date_mesure=date_mesure,
+            source='CALCUL_AUTO',
+        )
+        for ligne in par_commune
+    ]
+
+    indicateurs_calcules = Indicateur.objects.filter(
+        projet_id=projet_id, type_calcul__in=TYPES_CALCULES
+    ).values_list('id', flat=True)
+
+    valeurs.extend(
+        ValeurIndicateur(
+            indicateur_id=indicateur_id,
+            commune_id=None,
+            valeur_realisee=globales.get(indicateur_id, 0),
+            date_mesure=date_mesure,
+            source='CALCUL_AUTO',
+        )
+        for indicateur_id in indicateurs_calcules
+    )
+
+    return valeurs
+
+
+@transaction.atomic
+def enregistrer_calculs(projet_id: int, date_mesure: date | None = None, statut: str = 'VALIDE') -> int:
+    """
+    Calcule et enregistre les valeurs automatiques d'un projet.
+
+    Les valeurs CALCUL_AUTO déjà enregistrées à la même date sont
+    remplacées (relancer le calcul dans la journée est idempotent).
+    ValeurIndicateur n'ayant pas de contrainte d'unicité, le remplacement
+    se fait par suppression + bulk_create dans la même transaction, signaux
+    suspendus : la synthèse est reconstruite et le cache du projet invalidé
+    une seule fois.
+
+    Args:
+        projet_id: ID du projet
+        date_mesure: Date des valeurs (aujourd'hui par défaut)
+        statut: Statut des valeurs créées
+
+    Returns:
+        Nombre de valeurs enregistrées
+    """
+    date_mesure = date_mesure or date.today()
+    valeurs = calculer_indicateurs(projet_id, date_mesure)
+    for valeur in valeurs:
+        valeur.statut = statut
+
+    # Les post_delete par ligne ne rafraîchissent ni la synthèse ni le cache :
+    # les deux sont mis à jour une seule fois ci-dessous
+    with synthese_suspendue(), invalidation_suspendue():
+        ValeurIndicateur.objects.filter(
+            indicateur__projet_id=projet_id,
+            source='CALCUL_AUTO',
+            date_mesure=date_mesure,
+        ).delete()
+        ValeurIndicateur.objects.bulk_create(valeurs, batch_size=1000)
+    reconstruire_synthese(projet_id, date_mesure)
+
+    transaction.on_commit(lambda: invalider_projet(projet_id))
+
+    return len(valeurs)
@@ -0,0 +1,46 @@
+"""
+Calcul automatique des indicateurs (SOMME, MOYENNE, DENOMBREMENT)
+
+Usage:
+    python manage.py calculer_indicateurs
+    python manage.py calculer_indicateurs --projet 3
+    python manage.py calculer_indicateurs --projet 3 --date 2025-06-30
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Projet
+from suivi.calculs import enregistrer_calculs
+
+
+class Command(BaseCommand):
+    help = "Calcule les valeurs des indicateurs non manuels et les enregistre (source CALCUL_AUTO)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projet', type=int, default=None,
+                            help="Limiter à un projet (ID)")
+        parser.add_argument('--date', default=None,
+                            help="Date de mesure AAAA-MM-JJ (aujourd'hui par défaut)")
+        parser.add_argument('--statut', default='VALIDE', choices=['BROUILLON', 'VALIDE', 'PUBLIE'],
+                            help="Statut des valeurs créées (défaut : VALIDE)")
+
+    def handle(self, *args, **options):
+        try:
+            date_mesure = date.fromisoformat(options['date']) if options['date'] else date.today()
+        except ValueError:
+            raise CommandError(f"Date invalide : {options['date']} (format attendu AAAA-MM-JJ)")
+
+        projets = Projet.objects.order_by('id')
+        if options['projet']:
+            projets = projets.filter(pk=options['projet'])
+            if not projets.exists():
+                raise CommandError(f"Projet {options['projet']} introuvable.")
+
+        total = 0
+        for projet_id in projets.values_list('id', flat=True):
+            nb_valeurs = enregistrer_calculs(projet_id, date_mesure, options['statut'])
+            self.stdout.write(f"Projet {projet_id} : {nb_valeurs} valeur(s) calculée(s)")
+            total += nb_valeurs
+
+        self.stdout.write(self.style.SUCCESS(f"{total} valeur(s) enregistrée(s) au {date_mesure:%d/%m/%Y}."))
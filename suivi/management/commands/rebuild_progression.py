@@ -0,0 +1,40 @@
+"""
+Reconstruction ou vérification de la table ProgressionIndicateur
+
+Usage:
+    python manage.py rebuild_progression
+    python manage.py rebuild_progression --projet 3
+    python manage.py rebuild_progression --verifier
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from suivi.progression import reconstruire_progression, verifier_progression
+
+
+class Command(BaseCommand):
+    help = "Reconstruit (ou vérifie) la table de progression des indicateurs depuis les interventions et cibles"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projet', type=int, default=None,
+                            help="Limiter à un projet (ID)")
+        parser.add_argument('--verifier', action='store_true',
+                            help="Vérifier la table sans la modifier (erreur si écarts)")
+
+    def handle(self, *args, **options):
+        projet_id = options['projet']
+
+        if options['verifier']:
+            ecarts = verifier_progression(projet_id)
+            for ecart in ecarts:
+                indicateur_id, commune_id, annee = ecart['cle']
+                self.stdout.write(
+                    f"Indicateur {indicateur_id} / commune {commune_id or 'globale'} / {annee} : "
+                    f"attendu {ecart['attendu']}, stocké {ecart['stocke']}"
+                )
+            if ecarts:
+                raise CommandError(f"{len(ecarts)} écart(s) détecté(s). Relancer sans --verifier pour reconstruire.")
+            self.stdout.write(self.style.SUCCESS("Table de progression cohérente."))
+            return
+
+        nb_cellules = reconstruire_progression(projet_id)
+        self.stdout.write(self.style.SUCCESS(f"{nb_cellules} cellule(s) de progression reconstruite(s)."))
@@ -0,0 +1,22 @@
+"""
+Reconstruction de la synthèse trimestrielle des valeurs d'indicateurs
+
+Usage:
+    python manage.py rebuild_synthese
+    python manage.py rebuild_synthese --projet 3
+"""
+from django.core.management.base import BaseCommand
+
+from suivi.syntheses import reconstruire_synthese
+
+
+class Command(BaseCommand):
+    help = "Reconstruit la synthèse trimestrielle (SyntheseTrimestrielle) depuis les valeurs d'indicateurs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projet', type=int, default=None,
+                            help="Limiter à un projet (ID)")
+
+    def handle(self, *args, **options):
+        nb_cellules = reconstruire_synthese(options['projet'])
+        self.stdout.write(self.style.SUCCESS(f"{nb_cellules} cellule(s) de synthèse reconstruite(s)."))
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractYear
+
+
+def remplir_progression(apps, schema_editor):
+    """Initialiser la table de progression depuis les interventions et cibles existantes"""
+    Intervention = apps.get_model('suivi', 'Intervention')
+    CibleIndicateur = apps.get_model('suivi', 'CibleIndicateur')
+    ProgressionIndicateur = apps.get_model('suivi', 'ProgressionIndicateur')
+
+    cellules = {}
+
+    def cellule(ligne):
+        cle = (ligne['indicateur_id'], ligne['commune_id'], ligne['annee'])
+        if cle not in cellules:
+            cellules[cle] = ProgressionIndicateur(
+                projet_id=ligne['indicateur__projet_id'],
+                indicateur_id=ligne['indicateur_id'],
+                commune_id=ligne['commune_id'],
+                annee=ligne['annee'],
+            )
+        return cellules[cle]
+
+    for ligne in Intervention.objects.filter(statut='TERMINE').values(
+        'indicateur_id', 'indicateur__projet_id', 'commune_id',
+        annee=ExtractYear('date_intervention'),
+    ).annotate(total=Sum('valeur_quantitative'), nombre=Count('id')).order_by():
+        progression = cellule(ligne)
+        progression.total_realise = ligne['total'] or 0
+        progression.nb_interventions = ligne['nombre']
+
+    for ligne in CibleIndicateur.objects.values(
+        'indicateur_id', 'indicateur__projet_id', 'commune_id', 'annee'
+    ).annotate(total=Sum('valeur_cible')).order_by():
+        cellule(ligne).total_cible = ligne['total'] or 0
+
+    ProgressionIndicateur.objects.bulk_create(cellules.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_cleanup_old_fields'),
+        ('referentiels', '0002_equipegrdr'),
+        ('suivi', '0005_simplify_intervention_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgressionIndicateur',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('annee', models.IntegerField(help_text="Année de l'intervention ou de la cible")),
+                ('total_realise', models.BigIntegerField(default=0, help_text='Somme des valeur_quantitative des interventions terminées')),
+                ('nb_interventions', models.IntegerField(default=0, help_text="Nombre d'interventions terminées")),
+                ('total_cible', models.BigIntegerField(default=0, help_text='Somme des valeur_cible')),
+                ('date_maj', models.DateTimeField(default=django.utils.timezone.now)),
+                ('commune', models.ForeignKey(blank=True, help_text='Vide pour les cibles globales projet', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='progressions', to='referentiels.commune')),
+                ('indicateur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progressions', to='suivi.indicateur')),
+                ('projet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progressions', to='core.projet')),
+            ],
+            options={
+                'verbose_name': "Progression d'indicateur",
+                'verbose_name_plural': 'Progressions des indicateurs',
+                'ordering': ['indicateur', 'annee', 'commune'],
+                'indexes': [models.Index(fields=['projet', 'annee'], name='suivi_progr_projet__0a7530_idx')],
+                'constraints': [models.UniqueConstraint(fields=('indicateur', 'commune', 'annee'), name='unique_progression_indicateur_commune_annee', nulls_distinct=False)],
+            },
+        ),
+        migrations.RunPython(remplir_progression, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import ExtractQuarter, ExtractYear
+
+
+def remplir_synthese(apps, schema_editor):
+    """Initialiser la synthèse trimestrielle depuis les valeurs existantes"""
+    ValeurIndicateur = apps.get_model('suivi', 'ValeurIndicateur')
+    SyntheseTrimestrielle = apps.get_model('suivi', 'SyntheseTrimestrielle')
+
+    cellules = {}
+    for ligne in ValeurIndicateur.objects.values(
+        'indicateur_id', 'indicateur__projet_id', 'commune_id', 'statut',
+        annee=ExtractYear('date_mesure'),
+        trimestre=ExtractQuarter('date_mesure'),
+    ).annotate(
+        nb_valeurs=Count('id'),
+        somme=Sum('valeur_realisee'),
+        minimum=Min('valeur_realisee'),
+        maximum=Max('valeur_realisee'),
+    ).order_by():
+        cle = (ligne['indicateur_id'], ligne['commune_id'], ligne['annee'], ligne['trimestre'], ligne['statut'])
+        cellules[cle] = SyntheseTrimestrielle(
+            projet_id=ligne['indicateur__projet_id'],
+            indicateur_id=ligne['indicateur_id'],
+            commune_id=ligne['commune_id'],
+            annee=ligne['annee'],
+            trimestre=ligne['trimestre'],
+            statut=ligne['statut'],
+            nb_valeurs=ligne['nb_valeurs'],
+            somme=ligne['somme'],
+            minimum=ligne['minimum'],
+            maximum=ligne['maximum'],
+        )
+
+    for valeur in ValeurIndicateur.objects.order_by('date_mesure', 'id').iterator(chunk_size=2000):
+        cle = (
+            valeur.indicateur_id, valeur.commune_id, valeur.date_mesure.year,
+            (valeur.date_mesure.month - 1) // 3 + 1, valeur.statut,
+        )
+        cellules[cle].derniere_valeur = valeur.valeur_realisee
+        cellules[cle].date_derniere_valeur = valeur.date_mesure
+
+    SyntheseTrimestrielle.objects.bulk_create(cellules.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_cleanup_old_fields'),
+        ('referentiels', '0002_equipegrdr'),
+        ('suivi', '0006_progressionindicateur'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyntheseTrimestrielle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('annee', models.IntegerField()),
+                ('trimestre', models.PositiveSmallIntegerField(help_text='Trimestre (1 à 4)')),
+                ('statut', models.CharField(choices=[('BROUILLON', 'Brouillon'), ('VALIDE', 'Validé'), ('PUBLIE', 'Publié')], max_length=20)),
+                ('nb_valeurs', models.IntegerField(default=0)),
+                ('somme', models.BigIntegerField(default=0)),
+                ('minimum', models.IntegerField()),
+                ('maximum', models.IntegerField()),
+                ('derniere_valeur', models.IntegerField(help_text='Valeur de la mesure la plus récente du trimestre')),
+                ('date_derniere_valeur', models.DateField()),
+                ('date_maj', models.DateTimeField(default=django.utils.timezone.now)),
+                ('commune', models.ForeignKey(blank=True, help_text='Vide pour les valeurs globales projet', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='syntheses_trimestrielles', to='referentiels.commune')),
+                ('indicateur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='syntheses_trimestrielles', to='suivi.indicateur')),
+                ('projet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='syntheses_trimestrielles', to='core.projet')),
+            ],
+            options={
+                'verbose_name': 'Synthèse trimestrielle',
+                'verbose_name_plural': 'Synthèses trimestrielles',
+                'ordering': ['indicateur', 'annee', 'trimestre', 'commune'],
+                'indexes': [models.Index(fields=['projet', 'annee', 'trimestre'], name='suivi_synth_projet__17353a_idx')],
+                'constraints': [models.UniqueConstraint(fields=('indicateur', 'commune', 'annee', 'trimestre', 'statut'), name='unique_synthese_indicateur_commune_trimestre_statut', nulls_distinct=False)],
+            },
+        ),
+        migrations.RunPython(remplir_synthese, migrations.RunPython.noop),
+    ]
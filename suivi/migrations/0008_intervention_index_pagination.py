@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suivi', '0007_synthesetrimestrielle'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='intervention',
+            name='suivi_inter_projet__22a040_idx',
+        ),
+        migrations.AddIndex(
+            model_name='intervention',
+            index=models.Index(fields=['projet', '-date_creation', '-id'], name='suivi_inter_projet__9f34da_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='intervention',
+            index=models.Index(fields=['projet', 'statut', '-date_creation', '-id'], name='suivi_inter_projet__ce7815_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='intervention',
+            index=models.Index(fields=['projet', 'commune', '-date_creation', '-id'], name='suivi_inter_projet__e1bec2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='intervention',
+            index=models.Index(fields=['projet', 'indicateur', '-date_creation', '-id'], name='suivi_inter_projet__6147c5_idx'),
+        ),
+    ]
@@ -6,6 +6,8 @@ from django.contrib.gis.db import models as gis_models
 from django.db import models
 from django.utils import timezone
 from core.models import Projet, User
+from core.querysets import ListeQuerySet
+from geo.models import CommuneDuPointMixin
 from referentiels.models import Commune, TypeIntervention
 
 
@@ -35,6 +37,41 @@ class Thematique(models.Model):
         return f"{self.projet.code_projet} - {self.code}: {self.libelle}"
 
 
+class IndicateurQuerySet(ListeQuerySet):
+    """QuerySet des indicateurs avec valeurs courantes annotées"""
+
+    def with_current_values(self, projet=None, statut=None):
+        """
+        Annoter chaque indicateur avec sa dernière valeur et sa cible globale
+        en une seule requête (sous-requêtes corrélées).
+
+        Annotations : valeur_courante, date_valeur_courante, cible_courante
+
+        Args:
+            projet: Projet (ou ID) à filtrer, tous les projets si None
+            statut: Ne retenir que les valeurs de ce statut (ex: 'PUBLIE')
+        """
+        valeurs = ValeurIndicateur.objects.filter(indicateur=models.OuterRef('pk'))
+        if statut:
+            valeurs = valeurs.filter(statut=statut)
+        valeurs = valeurs.order_by('-date_mesure', '-id')
+
+        cibles = CibleIndicateur.objects.filter(
+            indicateur=models.OuterRef('pk'),
+            commune__isnull=True,
+        ).order_by('-annee')
+
+        queryset = self
+        if projet is not None:
+            queryset = queryset.filter(projet=projet)
+
+        return queryset.annotate(
+            valeur_courante=models.Subquery(valeurs.values('valeur_realisee')[:1]),
+            date_valeur_courante=models.Subquery(valeurs.values('date_mesure')[:1]),
+            cible_courante=models.Subquery(cibles.values('valeur_cible')[:1]),
+        )
+
+
 class Indicateur(models.Model):
     """
     Indicateurs du cadre logique
@@ -69,6 +106,8 @@ class Indicateur(models.Model):
     # Ordre d'affichage
     ordre = models.IntegerField(default=0)
 
+    objects = IndicateurQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Indicateur"
         verbose_name_plural = "Indicateurs"
@@ -121,7 +160,7 @@ class CibleIndicateur(models.Model):
         return f"{self.indicateur.code}{commune_str}: {self.valeur_cible} ({self.annee})"
 
 
-class Intervention(gis_models.Model):
+class Intervention(CommuneDuPointMixin, gis_models.Model):
     """
     Interventions/Activités/Réalisations du projet
     Unifie les notions d'activités (immatériel) et réalisations (matériel)
@@ -188,26 +227,40 @@ class Intervention(gis_models.Model):
     # Médias
     photo = models.ImageField(upload_to='interventions/', null=True, blank=True)
 
+    objects = ListeQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Intervention"
         verbose_name_plural = "Interventions"
         ordering = ['-date_intervention']
         indexes = [
             models.Index(fields=['projet', 'indicateur', 'commune', 'date_intervention']),
-            models.Index(fields=['projet', 'statut']),
             models.Index(fields=['statut']),
+            # Pagination par curseur des listes (core.pagination), avec et sans filtre
+            models.Index(fields=['projet', '-date_creation', '-id']),
+            models.Index(fields=['projet', 'statut', '-date_creation', '-id']),
+            models.Index(fields=['projet', 'commune', '-date_creation', '-id']),
+            models.Index(fields=['projet', 'indicateur', '-date_creation', '-id']),
         ]
 
     def __str__(self):
         return f"{self.projet.code_projet} - {self.libelle} - {self.commune.nom} ({self.date_intervention})"
 
     def clean(self):
-        """Valider que l'indicateur appartient bien au même projet"""
+        """Valider l'indicateur (même projet) et la localisation (commune, zone du projet)"""
         from django.core.exceptions import ValidationError
         if self.indicateur and self.projet and self.indicateur.projet_id != self.projet_id:
             raise ValidationError({
                 'indicateur': f"L'indicateur doit appartenir au projet {self.projet.code_projet}"
             })
+        # Commune contenant le point (CommuneDuPointMixin)
+        super().clean()
+        if self.geom and self.projet_id:
+            from geo.zones import dans_zone
+            if dans_zone(self.projet_id, self.geom) is False:
+                raise ValidationError({
+                    'geom': "La localisation est en dehors de la zone d'intervention du projet"
+                })
 
 
 class ValeurIndicateur(models.Model):
@@ -274,6 +327,100 @@ class ValeurIndicateur(models.Model):
         return self.date_mesure.year
 
 
+class ProgressionIndicateur(models.Model):
+    """
+    Table dénormalisée des réalisations et cibles par (indicateur, commune, année)
+    Maintenue de façon incrémentale par suivi.signals à chaque écriture
+    d'Intervention ou de CibleIndicateur. Reconstruction/vérification :
+    python manage.py rebuild_progression
+    """
+    projet = models.ForeignKey(Projet, on_delete=models.CASCADE,
+                              related_name='progressions')
+    indicateur = models.ForeignKey(Indicateur, on_delete=models.CASCADE,
+                                  related_name='progressions')
+    commune = models.ForeignKey(Commune, on_delete=models.CASCADE,
+                               null=True, blank=True,
+                               related_name='progressions',
+                               help_text="Vide pour les cibles globales projet")
+    annee = models.IntegerField(help_text="Année de l'intervention ou de la cible")
+
+    # Réalisations (interventions terminées)
+    total_realise = models.BigIntegerField(default=0,
+                                          help_text="Somme des valeur_quantitative des interventions terminées")
+    nb_interventions = models.IntegerField(default=0,
+                                          help_text="Nombre d'interventions terminées")
+
+    # Cibles
+    total_cible = models.BigIntegerField(default=0,
+                                        help_text="Somme des valeur_cible")
+
+    date_maj = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Progression d'indicateur"
+        verbose_name_plural = "Progressions des indicateurs"
+        ordering = ['indicateur', 'annee', 'commune']
+        constraints = [
+            models.UniqueConstraint(fields=['indicateur', 'commune', 'annee'],
+                                    nulls_distinct=False,
+                                    name='unique_progression_indicateur_commune_annee'),
+        ]
+        indexes = [
+            models.Index(fields=['projet', 'annee']),
+        ]
+
+    def __str__(self):
+        commune_str = f" - {self.commune.nom}" if self.commune else " (global)"
+        return f"{self.indicateur.code}{commune_str} ({self.annee}): {self.total_realise}/{self.total_cible}"
+
+
+class SyntheseTrimestrielle(models.Model):
+    """
+    Synthèse des ValeurIndicateur par (indicateur, commune, année, trimestre, statut)
+    Alimente les graphiques d'évolution sans relire l'historique des valeurs.
+    Maintenue par suivi.signals à chaque écriture de ValeurIndicateur.
+    Reconstruction : python manage.py rebuild_synthese
+    """
+    projet = models.ForeignKey(Projet, on_delete=models.CASCADE,
+                              related_name='syntheses_trimestrielles')
+    indicateur = models.ForeignKey(Indicateur, on_delete=models.CASCADE,
+                                  related_name='syntheses_trimestrielles')
+    commune = models.ForeignKey(Commune, on_delete=models.CASCADE,
+                               null=True, blank=True,
+                               related_name='syntheses_trimestrielles',
+                               help_text="Vide pour les valeurs globales projet")
+    annee = models.IntegerField()
+    trimestre = models.PositiveSmallIntegerField(help_text="Trimestre (1 à 4)")
+    statut = models.CharField(max_length=20, choices=ValeurIndicateur.STATUT_CHOICES)
+
+    # Agrégats des valeur_realisee du trimestre
+    nb_valeurs = models.IntegerField(default=0)
+    somme = models.BigIntegerField(default=0)
+    minimum = models.IntegerField()
+    maximum = models.IntegerField()
+    derniere_valeur = models.IntegerField(help_text="Valeur de la mesure la plus récente du trimestre")
+    date_derniere_valeur = models.DateField()
+
+    date_maj = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Synthèse trimestrielle"
+        verbose_name_plural = "Synthèses trimestrielles"
+        ordering = ['indicateur', 'annee', 'trimestre', 'commune']
+        constraints = [
+            models.UniqueConstraint(fields=['indicateur', 'commune', 'annee', 'trimestre', 'statut'],
+                                    nulls_distinct=False,
+                                    name='unique_synthese_indicateur_commune_trimestre_statut'),
+        ]
+        indexes = [
+            models.Index(fields=['projet', 'annee', 'trimestre']),
+        ]
+
+    def __str__(self):
+        commune_str = f" - {self.commune.nom}" if self.commune else " (global)"
+        return f"{self.indicateur.code}{commune_str} ({self.annee} T{self.trimestre}, {self.statut}): {self.somme}"
+
+
 # Tables de liaison Many-to-Many
 
 class InterventionActeur(models.Model):
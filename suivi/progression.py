@@ -0,0 +1,260 @@
+"""
+Maintenance de la table dénormalisée ProgressionIndicateur.
+
+Chaque Intervention terminée et chaque CibleIndicateur contribue à une
+cellule (indicateur, commune, année). Les signaux de suivi.signals
+appliquent la différence entre l'ancienne et la nouvelle contribution ;
+les fonctions de reconstruction/vérification repartent des tables sources.
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractYear
+from django.utils import timezone
+
+from core.cache import invalider_projet
+
+from .models import CibleIndicateur, Indicateur, Intervention, ProgressionIndicateur
+
+# Clé d'une cellule : (indicateur_id, commune_id, annee)
+Cle = tuple[int, Optional[int], int]
+Contribution = Optional[tuple[Cle, dict[str, int]]]
+
+COMPTEURS = ('total_realise', 'nb_interventions', 'total_cible')
+
+
+def _annee(valeur: date | str) -> int:
+    """Année d'une date (accepte une chaîne ISO, cas des formulaires non nettoyés)."""
+    if isinstance(valeur, str):
+        valeur = date.fromisoformat(valeur[:10])
+    return valeur.year
+
+
+def contribution_intervention(intervention: Intervention) -> Contribution:
+    """
+    Contribution d'une intervention à la table de progression.
+
+    Args:
+        intervention: Intervention (éventuellement non sauvegardée)
+
+    Returns:
+        (clé, compteurs) ou None si l'intervention n'est pas terminée
+    """
+    if intervention.statut != 'TERMINE':
+        return None
+
+    cle = (
+        intervention.indicateur_id,
+        intervention.commune_id,
+        _annee(intervention.date_intervention),
+    )
+    return cle, {
+        'total_realise': int(intervention.valeur_quantitative or 0),
+        'nb_interventions': 1,
+    }
+
+
+def contribution_cible(cible: CibleIndicateur) -> Contribution:
+    """
+    Contribution d'une cible à la table de progression.
+
+    Args:
+        cible: Cible d'indicateur
+
+    Returns:
+        (clé, compteurs)
+    """
+    cle = (cible.indicateur_id, cible.commune_id, int(cible.annee))
+    return cle, {'total_cible': int(cible.valeur_cible or 0)}
+
+
+def appliquer_delta(cle: Cle, delta: dict[str, int], creer: bool = True) -> None:
+    """
+    Ajoute un delta aux compteurs d'une cellule.
+
+    La mise à jour se fait en SQL (F expressions) pour rester correcte en
+    cas d'écritures concurrentes. La cellule est créée si besoin, sauf lors
+    d'une suppression (creer=False) où l'indicateur ou la commune peuvent
+    être en cours de suppression en cascade.
+
+    Args:
+        cle: (indicateur_id, commune_id, annee)
+        delta: Variation de chaque compteur
+        creer: Créer la cellule si elle n'existe pas
+    """
+    delta = {champ: valeur for champ, valeur in delta.items() if valeur}
+    if not delta:
+        return
+
+    indicateur_id, commune_id, annee = cle
+    cellule = ProgressionIndicateur.objects.filter(
+        indicateur_id=indicateur_id, commune_id=commune_id, annee=annee
+    )
+    maj = {champ: F(champ) + valeur for champ, valeur in delta.items()}
+
+    if cellule.update(date_maj=timezone.now(), **maj) or not creer:
+        return
+
+    projet_id = Indicateur.objects.values_list('projet_id', flat=True).get(pk=indicateur_id)
+    try:
+        with transaction.atomic():
+            ProgressionIndicateur.objects.create(
+                projet_id=projet_id,
+                indicateur_id=indicateur_id,
+                commune_id=commune_id,
+                annee=annee,
+                **delta,
+            )
+    except IntegrityError:
+        # Cellule créée entre-temps par une transaction concurrente
+        cellule.update(date_maj=timezone.now(), **maj)
+
+
+def deplacer_contribution(avant: Contribution, apres: Contribution) -> None:
+    """
+    Remplace une contribution par une autre dans la table de progression.
+
+    Args:
+        avant: Contribution avant modification (None si création)
+        apres: Contribution après modification (None si suppression)
+    """
+    if avant and apres and avant[0] == apres[0]:
+        delta = {
+            champ: apres[1].get(champ, 0) - avant[1].get(champ, 0)
+            for champ in set(avant[1]) | set(apres[1])
+        }
+        appliquer_delta(apres[0], delta)
+        return
+
+    if avant:
+        appliquer_delta(avant[0], {champ: -valeur for champ, valeur in avant[1].items()}, creer=False)
+    if apres:
+        appliquer_delta(apres[0], apres[1])
+
+
+def calculer_progression(projet_id: int | None = None) -> dict[Cle, dict[str, int]]:
+    """
+    Calcule la progression attendue depuis les tables sources.
+
+    Args:
+        projet_id: Limiter à un projet (tous les projets si None)
+
+    Returns:
+        Dictionnaire {clé: {projet_id, total_realise, nb_interventions, total_cible}}
+    """
+    interventions = Intervention.objects.filter(statut='TERMINE')
+    cibles = CibleIndicateur.objects.all()
+    if projet_id:
+        interventions = interventions.filter(indicateur__projet_id=projet_id)
+        cibles = cibles.filter(indicateur__projet_id=projet_id)
+
+    cellules: dict[Cle, dict[str, int]] = {}
+
+    def cellule(ligne: dict[str, Any]) -> dict[str, int]:
+        cle = (ligne['indicateur_id'], ligne['commune_id'], ligne['annee'])
+        if cle not in cellules:
+            cellules[cle] = {
+                'projet_id': ligne['indicateur__projet_id'],
+                **{champ: 0 for champ in COMPTEURS},
+            }
+        return cellules[cle]
+
+    realises = interventions.values(
+        'indicateur_id', 'indicateur__projet_id', 'commune_id',
+        annee=ExtractYear('date_intervention'),
+    ).annotate(total=Sum('valeur_quantitative'), nombre=Count('id')).order_by()
+
+    for ligne in realises:
+        valeurs = cellule(ligne)
+        valeurs['total_realise'] = ligne['total'] or 0
+        valeurs['nb_interventions'] = ligne['nombre']
+
+    for ligne in cibles.values(
+        'indicateur_id', 'indicateur__projet_id', 'commune_id', 'annee'
+    ).annotate(total=Sum('valeur_cible')).order_by():
+        cellule(ligne)['total_cible'] = ligne['total'] or 0
+
+    return cellules
+
+
+@transaction.atomic
+def reconstruire_progression(projet_id: int | None = None) -> int:
+    """
+    Reconstruit entièrement la table de progression.
+
+    bulk_create n'émet aucun signal : le cache de chaque projet reconstruit
+    est invalidé explicitement après validation de la transaction.
+
+    Args:
+        projet_id: Limiter à un projet (tous les projets si None)
+
+    Returns:
+        Nombre de cellules écrites
+    """
+    cellules = calculer_progression(projet_id)
+
+    existantes = ProgressionIndicateur.objects.all()
+    if projet_id:
+        existantes = existantes.filter(projet_id=projet_id)
+    projets = set(existantes.values_list('projet_id', flat=True).distinct())
+    projets.update(valeurs['projet_id'] for valeurs in cellules.values())
+    existantes.delete()
+
+    maintenant = timezone.now()
+    ProgressionIndicateur.objects.bulk_create(
+        [
+            ProgressionIndicateur(
+                indicateur_id=indicateur_id,
+                commune_id=commune_id,
+                annee=annee,
+                date_maj=maintenant,
+                **valeurs,
+            )
+            for (indicateur_id, commune_id, annee), valeurs in cellules.items()
+        ],
+        batch_size=1000,
+    )
+
+    for pk in sorted(projets):
+        transaction.on_commit(lambda pk=pk: invalider_projet(pk))
+    return len(cellules)
+
+
+def verifier_progression(projet_id: int | None = None) -> list[dict[str, Any]]:
+    """
+    Compare la table de progression aux tables sources.
+
+    Les cellules stockées à zéro et absentes des sources sont ignorées
+    (elles apparaissent après suppression de toutes leurs contributions).
+
+    Args:
+        projet_id: Limiter à un projet (tous les projets si None)
+
+    Returns:
+        Liste des écarts {cle, attendu, stocke}
+    """
+    attendues = calculer_progression(projet_id)
+
+    stockees = ProgressionIndicateur.objects.all()
+    if projet_id:
+        stockees = stockees.filter(projet_id=projet_id)
+    stockees = {
+        (ligne['indicateur_id'], ligne['commune_id'], ligne['annee']): {
+            champ: ligne[champ] for champ in COMPTEURS
+        }
+        for ligne in stockees.values('indicateur_id', 'commune_id', 'annee', *COMPTEURS)
+    }
+
+    zero = {champ: 0 for champ in COMPTEURS}
+    ecarts = []
+    for cle in set(attendues) | set(stockees):
+        attendu = {champ: attendues.get(cle, zero)[champ] for champ in COMPTEURS}
+        stocke = stockees.get(cle, zero)
+        if attendu != stocke:
+            ecarts.append({'cle': cle, 'attendu': attendu, 'stocke': stocke})
+
+    return ecarts
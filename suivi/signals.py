@@ -0,0 +1,103 @@
+"""
+Signaux de l'application suivi
+
+Maintien incrémental de la table ProgressionIndicateur lors des écritures
+sur Intervention et CibleIndicateur, et de la synthèse trimestrielle lors
+des écritures sur ValeurIndicateur.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import CibleIndicateur, Intervention, ValeurIndicateur
+from .progression import contribution_cible, contribution_intervention, deplacer_contribution
+from .syntheses import cle_valeur, maintenance_suspendue, rafraichir_cellules
+
+# Champs dont dépend la contribution de chaque modèle
+CHAMPS_INTERVENTION = {'indicateur', 'commune', 'date_intervention', 'statut', 'valeur_quantitative'}
+CHAMPS_CIBLE = {'indicateur', 'commune', 'annee', 'valeur_cible'}
+CHAMPS_VALEUR = {'indicateur', 'commune', 'date_mesure', 'statut', 'valeur_realisee'}
+
+
+def _concerne(update_fields, champs):
+    """Vrai si la sauvegarde touche au moins un des champs suivis."""
+    return update_fields is None or bool(champs & set(update_fields))
+
+
+@receiver(pre_save, sender=Intervention)
+def memoriser_intervention(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Mémoriser la contribution de l'intervention avant modification"""
+    instance._progression_avant = None
+    if raw or not instance.pk or not _concerne(update_fields, CHAMPS_INTERVENTION):
+        return
+
+    ancienne = Intervention.objects.filter(pk=instance.pk).only(*CHAMPS_INTERVENTION).first()
+    if ancienne:
+        instance._progression_avant = contribution_intervention(ancienne)
+
+
+@receiver(post_save, sender=Intervention)
+def maj_progression_intervention(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Répercuter la création ou la modification d'une intervention"""
+    if raw or not _concerne(update_fields, CHAMPS_INTERVENTION):
+        return
+    deplacer_contribution(instance._progression_avant, contribution_intervention(instance))
+
+
+@receiver(post_delete, sender=Intervention)
+def retirer_intervention(sender, instance, **kwargs):
+    """Retirer la contribution d'une intervention supprimée"""
+    deplacer_contribution(contribution_intervention(instance), None)
+
+
+@receiver(pre_save, sender=CibleIndicateur)
+def memoriser_cible(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Mémoriser la contribution de la cible avant modification"""
+    instance._progression_avant = None
+    if raw or not instance.pk or not _concerne(update_fields, CHAMPS_CIBLE):
+        return
+
+    ancienne = CibleIndicateur.objects.filter(pk=instance.pk).only(*CHAMPS_CIBLE).first()
+    if ancienne:
+        instance._progression_avant = contribution_cible(ancienne)
+
+
+@receiver(post_save, sender=CibleIndicateur)
+def maj_progression_cible(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Répercuter la création ou la modification d'une cible"""
+    if raw or not _concerne(update_fields, CHAMPS_CIBLE):
+        return
+    deplacer_contribution(instance._progression_avant, contribution_cible(instance))
+
+
+@receiver(post_delete, sender=CibleIndicateur)
+def retirer_cible(sender, instance, **kwargs):
+    """Retirer la contribution d'une cible supprimée"""
+    deplacer_contribution(contribution_cible(instance), None)
+
+
+@receiver(pre_save, sender=ValeurIndicateur)
+def memoriser_valeur(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Mémoriser la cellule de synthèse de la valeur avant modification"""
+    instance._synthese_avant = None
+    if raw or not instance.pk or maintenance_suspendue() or not _concerne(update_fields, CHAMPS_VALEUR):
+        return
+
+    ancienne = ValeurIndicateur.objects.filter(pk=instance.pk).only(*CHAMPS_VALEUR).first()
+    if ancienne:
+        instance._synthese_avant = cle_valeur(ancienne)
+
+
+@receiver(post_save, sender=ValeurIndicateur)
+def maj_synthese_valeur(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Recalculer les cellules de synthèse touchées par la valeur"""
+    if raw or maintenance_suspendue() or not _concerne(update_fields, CHAMPS_VALEUR):
+        return
+    rafraichir_cellules([getattr(instance, '_synthese_avant', None), cle_valeur(instance)])
+
+
+@receiver(post_delete, sender=ValeurIndicateur)
+def retirer_valeur(sender, instance, **kwargs):
+    """Recalculer la cellule de synthèse d'une valeur supprimée"""
+    if maintenance_suspendue():
+        return
+    rafraichir_cellules([cle_valeur(instance)])
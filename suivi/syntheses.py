@@ -0,0 +1,304 @@
+"""
+Maintenance de la synthèse trimestrielle des valeurs d'indicateurs.
+
+Chaque ValeurIndicateur appartient à une cellule (indicateur, commune,
+année, trimestre, statut) de SyntheseTrimestrielle. Les minimum, maximum et
+dernière valeur ne pouvant pas être décrémentés, une écriture recalcule sa
+cellule depuis les valeurs du trimestre (quelques lignes, via l'index
+(indicateur, date_mesure)). Les écritures en masse suspendent cette
+maintenance puis reconstruisent le trimestre en une fois.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date
+from typing import Any, Iterable, Iterator, Optional
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import ExtractQuarter, ExtractYear
+from django.utils import timezone
+
+from .models import Indicateur, SyntheseTrimestrielle, ValeurIndicateur
+
+# Clé d'une cellule : (indicateur_id, commune_id, annee, trimestre, statut)
+Cle = tuple[int, Optional[int], int, int, str]
+
+AGREGATS = ('nb_valeurs', 'somme', 'minimum', 'maximum', 'derniere_valeur', 'date_derniere_valeur')
+
+_suspendue: ContextVar[bool] = ContextVar('synthese_suspendue', default=False)
+
+
+def _date(valeur: date | str) -> date:
+    """Date (accepte une chaîne ISO, cas des formulaires non nettoyés)."""
+    if isinstance(valeur, str):
+        return date.fromisoformat(valeur[:10])
+    return valeur
+
+
+def bornes_trimestre(annee: int, trimestre: int) -> tuple[date, date]:
+    """
+    Premier jour du trimestre et premier jour du trimestre suivant.
+
+    Args:
+        annee: Année
+        trimestre: Trimestre (1 à 4)
+
+    Returns:
+        (début inclus, fin exclue)
+    """
+    debut = date(annee, 3 * (trimestre - 1) + 1, 1)
+    fin = date(annee + 1, 1, 1) if trimestre == 4 else date(annee, 3 * trimestre + 1, 1)
+    return debut, fin
+
+
+def cle_valeur(valeur: ValeurIndicateur) -> Cle:
+    """
+    Cellule de synthèse d'une valeur d'indicateur.
+
+    Args:
+        valeur: Valeur d'indicateur (éventuellement non sauvegardée)
+
+    Returns:
+        (indicateur_id, commune_id, annee, trimestre, statut)
+    """
+    date_mesure = _date(valeur.date_mesure)
+    return (
+        valeur.indicateur_id,
+        valeur.commune_id,
+        date_mesure.year,
+        (date_mesure.month - 1) // 3 + 1,
+        valeur.statut,
+    )
+
+
+@contextmanager
+def synthese_suspendue() -> Iterator[None]:
+    """
+    Suspend la maintenance par signaux (écritures en masse).
+
+    L'appelant doit ensuite appeler reconstruire_synthese sur la période
+    concernée.
+    """
+    jeton = _suspendue.set(True)
+    try:
+        yield
+    finally:
+        _suspendue.reset(jeton)
+
+
+def maintenance_suspendue() -> bool:
+    """Vrai si la maintenance par signaux est suspendue."""
+    return _suspendue.get()
+
+
+def rafraichir_cellule(cle: Cle) -> None:
+    """
+    Recalcule une cellule depuis les valeurs du trimestre.
+
+    La cellule est supprimée si elle ne contient plus aucune valeur (cas
+    notamment des suppressions en cascade d'indicateur ou de commune).
+
+    Args:
+        cle: (indicateur_id, commune_id, annee, trimestre, statut)
+    """
+    indicateur_id, commune_id, annee, trimestre, statut = cle
+    debut, fin = bornes_trimestre(annee, trimestre)
+    valeurs = ValeurIndicateur.objects.filter(
+        indicateur_id=indicateur_id,
+        commune_id=commune_id,
+        statut=statut,
+        date_mesure__gte=debut,
+        date_mesure__lt=fin,
+    )
+    cellule = SyntheseTrimestrielle.objects.filter(
+        indicateur_id=indicateur_id, commune_id=commune_id,
+        annee=annee, trimestre=trimestre, statut=statut,
+    )
+
+    derniere = valeurs.order_by('-date_mesure', '-id').values('valeur_realisee', 'date_mesure').first()
+    if derniere is None:
+        cellule.delete()
+        return
+
+    agregats = valeurs.aggregate(
+        nb_valeurs=Count('id'),
+        somme=Sum('valeur_realisee'),
+        minimum=Min('valeur_realisee'),
+        maximum=Max('valeur_realisee'),
+    )
+    agregats.update(
+        derniere_valeur=derniere['valeur_realisee'],
+        date_derniere_valeur=derniere['date_mesure'],
+        date_maj=timezone.now(),
+    )
+
+    if cellule.update(**agregats):
+        return
+
+    projet_id = Indicateur.objects.values_list('projet_id', flat=True).get(pk=indicateur_id)
+    SyntheseTrimestrielle.objects.update_or_create(
+        indicateur_id=indicateur_id, commune_id=commune_id,
+        annee=annee, trimestre=trimestre, statut=statut,
+        defaults={'projet_id': projet_id, **agregats},
+    )
+
+
+def rafraichir_cellules(cles: Iterable[Cle | None]) -> None:
+    """
+    Recalcule un ensemble de cellules (les doublons et None sont ignorés).
+
+    Args:
+        cles: Cellules à recalculer
+    """
+    for cle in {cle for cle in cles if cle}:
+        rafraichir_cellule(cle)
+
+
+def calculer_synthese(projet_id: int | None = None,
+                      date_mesure: date | None = None) -> dict[Cle, dict[str, Any]]:
+    """
+    Calcule la synthèse attendue depuis les valeurs d'indicateurs.
+
+    Args:
+        projet_id: Limiter à un projet (tous les projets si None)
+        date_mesure: Limiter au trimestre contenant cette date
+
+    Returns:
+        Dictionnaire {clé: {projet_id, nb_valeurs, somme, minimum, maximum,
+        derniere_valeur, date_derniere_valeur}}
+    """
+    valeurs = ValeurIndicateur.objects.all()
+    if projet_id:
+        valeurs = valeurs.filter(indicateur__projet_id=projet_id)
+    if date_mesure:
+        debut, fin = bornes_trimestre(date_mesure.year, (date_mesure.month - 1) // 3 + 1)
+        valeurs = valeurs.filter(date_mesure__gte=debut, date_mesure__lt=fin)
+
+    cellules: dict[Cle, dict[str, Any]] = {}
+    lignes = valeurs.values(
+        'indicateur_id', 'indicateur__projet_id', 'commune_id', 'statut',
+        annee=ExtractYear('date_mesure'),
+        trimestre=ExtractQuarter('date_mesure'),
+    ).annotate(
+        nb_valeurs=Count('id'),
+        somme=Sum('valeur_realisee'),
+        minimum=Min('valeur_realisee'),
+        maximum=Max('valeur_realisee'),
+    ).order_by()
+
+    for ligne in lignes:
+        cle = (ligne['indicateur_id'], ligne['commune_id'], ligne['annee'], ligne['trimestre'], ligne['statut'])
+        cellules[cle] = {
+            'projet_id': ligne['indicateur__projet_id'],
+            'nb_valeurs': ligne['nb_valeurs'],
+            'somme': ligne['somme'],
+            'minimum': ligne['minimum'],
+            'maximum': ligne['maximum'],
+        }
+
+    # Parcours chronologique : la dernière valeur lue est la plus récente
+    for valeur in valeurs.only(
+        'indicateur', 'commune', 'statut', 'date_mesure', 'valeur_realisee'
+    ).order_by('date_mesure', 'id').iterator(chunk_size=2000):
+        cellule = cellules[cle_valeur(valeur)]
+        cellule['derniere_valeur'] = valeur.valeur_realisee
+        cellule['date_derniere_valeur'] = valeur.date_mesure
+
+    return cellules
+
+
+@transaction.atomic
+def reconstruire_synthese(projet_id: int | None = None, date_mesure: date | None = None) -> int:
+    """
+    Reconstruit la synthèse trimestrielle.
+
+    Args:
+        projet_id: Limiter à un projet (tous les projets si None)
+        date_mesure: Limiter au trimestre contenant cette date
+
+    Returns:
+        Nombre de cellules écrites
+    """
+    cellules = calculer_synthese(projet_id, date_mesure)
+
+    existantes = SyntheseTrimestrielle.objects.all()
+    if projet_id:
+        existantes = existantes.filter(projet_id=projet_id)
+    if date_mesure:
+        existantes = existantes.filter(
+            annee=date_mesure.year, trimestre=(date_mesure.month - 1) // 3 + 1
+        )
+    existantes.delete()
+
+    maintenant = timezone.now()
+    SyntheseTrimestrielle.objects.bulk_create(
+        [
+            SyntheseTrimestrielle(
+                indicateur_id=indicateur_id,
+                commune_id=commune_id,
+                annee=annee,
+                trimestre=trimestre,
+                statut=statut,
+                date_maj=maintenant,
+                **valeurs,
+            )
+            for (indicateur_id, commune_id, annee, trimestre, statut), valeurs in cellules.items()
+        ],
+        batch_size=1000,
+    )
+    return len(cellules)
+
+
+def evolution_indicateur(indicateur: Indicateur, commune_id: int | None = None,
+                         statuts: Iterable[str] | None = None) -> dict[str, Any]:
+    """
+    Série trimestrielle d'un indicateur au format Chart.js.
+
+    Lorsque plusieurs statuts sont retenus, les cellules d'un même trimestre
+    sont combinées (somme, min, max, valeur la plus récente).
+
+    Args:
+        indicateur: Indicateur
+        commune_id: Commune (valeurs globales projet si None)
+        statuts: Statuts retenus (tous si None)
+
+    Returns:
+        Dictionnaire {indicateur, labels, datasets}
+    """
+    cellules = SyntheseTrimestrielle.objects.filter(indicateur=indicateur, commune_id=commune_id)
+    if statuts:
+        cellules = cellules.filter(statut__in=list(statuts))
+
+    trimestres: dict[tuple[int, int], dict[str, Any]] = {}
+    for cellule in cellules.values('annee', 'trimestre', *AGREGATS).order_by('annee', 'trimestre'):
+        periode = (cellule['annee'], cellule['trimestre'])
+        cumul = trimestres.get(periode)
+        if cumul is None:
+            trimestres[periode] = cellule
+            continue
+        cumul['nb_valeurs'] += cellule['nb_valeurs']
+        cumul['somme'] += cellule['somme']
+        cumul['minimum'] = min(cumul['minimum'], cellule['minimum'])
+        cumul['maximum'] = max(cumul['maximum'], cellule['maximum'])
+        if cellule['date_derniere_valeur'] > cumul['date_derniere_valeur']:
+            cumul['derniere_valeur'] = cellule['derniere_valeur']
+            cumul['date_derniere_valeur'] = cellule['date_derniere_valeur']
+
+    series = trimestres.values()
+    return {
+        'indicateur': {
+            'id': indicateur.id,
+            'code': indicateur.code,
+            'libelle': indicateur.libelle,
+            'unite': indicateur.unite_mesure,
+        },
+        'labels': [f"{annee} T{trimestre}" for annee, trimestre in trimestres],
+        'datasets': [
+            {'label': 'Somme', 'data': [s['somme'] for s in series]},
+            {'label': 'Dernière valeur', 'data': [s['derniere_valeur'] for s in series]},
+            {'label': 'Minimum', 'data': [s['minimum'] for s in series]},
+            {'label': 'Maximum', 'data': [s['maximum'] for s in series]},
+        ],
+    }
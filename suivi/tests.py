@@ -488,3 +488,431 @@ class CalculAvancementTest(TestCase):
 
         # Seule l'intervention terminée doit être comptée
         self.assertEqual(total_realise, 50)
+
+
+class AgregationProjetTest(TestCase):
+    """Tests pour le service d'agrégation (suivi.aggregations)"""
+
+    def setUp(self):
+        """Créer un projet avec deux thématiques et deux communes"""
+        from referentiels.models import ProjetCommune
+
+        self.projet = Projet.objects.create(
+            libelle='Projet Test',
+            bailleurs='Bailleur Test',
+            date_debut=date.today(),
+            date_fin=date.today() + timedelta(days=365)
+        )
+        self.r1 = Thematique.objects.create(projet=self.projet, code='R1', libelle='R1', ordre=1)
+        self.r2 = Thematique.objects.create(projet=self.projet, code='R2', libelle='R2', ordre=2)
+        self.ind1 = Indicateur.objects.create(
+            projet=self.projet, thematique=self.r1, code='R1.1', libelle='Indicateur 1'
+        )
+        self.ind2 = Indicateur.objects.create(
+            projet=self.projet, thematique=self.r2, code='R2.1', libelle='Indicateur 2'
+        )
+        self.gathiary = Commune.objects.create(nom='Gathiary', code_commune='SN-KED-GAT')
+        self.sadatou = Commune.objects.create(nom='Sadatou', code_commune='SN-KED-SAD')
+        ProjetCommune.objects.create(projet=self.projet, commune=self.gathiary)
+        ProjetCommune.objects.create(projet=self.projet, commune=self.sadatou)
+        self.type_intervention = TypeIntervention.objects.create(libelle='Formation', code='FORM')
+
+        CibleIndicateur.objects.create(indicateur=self.ind1, commune=None, valeur_cible=100, annee=2025)
+        CibleIndicateur.objects.create(indicateur=self.ind1, commune=self.gathiary, valeur_cible=40, annee=2025)
+
+        for commune, statut, valeur in [
+            (self.gathiary, 'TERMINE', 30),
+            (self.gathiary, 'PROGRAMME', 500),
+            (self.sadatou, 'TERMINE', 20),
+        ]:
+            Intervention.objects.create(
+                projet=self.projet,
+                indicateur=self.ind1,
+                type_intervention=self.type_intervention,
+                commune=commune,
+                libelle='Intervention',
+                valeur_quantitative=valeur,
+                date_intervention=date.today(),
+                statut=statut,
+            )
+
+    def test_kpis_projet(self):
+        """Seules les interventions terminées sont comptées"""
+        from .aggregations import calculer_kpis_projet
+
+        kpis = calculer_kpis_projet(self.projet.id)
+        self.assertEqual(kpis['interventions_realisees'], 2)
+        self.assertEqual(kpis['interventions_ce_mois'], 2)
+        self.assertEqual(kpis['beneficiaires_touches'], 50)
+
+    def test_stats_thematiques(self):
+        """Vérifier les totaux par thématique, y compris sans données"""
+        from .aggregations import calculer_avancement_global, calculer_stats_thematiques
+
+        stats = calculer_stats_thematiques(self.projet.id)
+        self.assertEqual([t['code'] for t in stats], ['R1', 'R2'])
+        self.assertEqual(stats[0]['total_realise'], 50)
+        self.assertEqual(stats[0]['total_cible'], 140)
+        self.assertEqual(stats[0]['pourcentage'], 35.7)
+        self.assertEqual(stats[1]['pourcentage'], 0)
+        self.assertAlmostEqual(calculer_avancement_global(stats), 17.85, places=1)
+
+    def test_stats_communes(self):
+        """Vérifier les totaux par commune"""
+        from .aggregations import calculer_stats_communes
+
+        stats = {c['nom']: c for c in calculer_stats_communes(self.projet.id)}
+        self.assertEqual(stats['Gathiary']['realise'], 30)
+        self.assertEqual(stats['Gathiary']['cible'], 40)
+        self.assertEqual(stats['Gathiary']['pourcentage'], 75.0)
+        self.assertEqual(stats['Sadatou']['interventions_count'], 1)
+        self.assertEqual(stats['Sadatou']['pourcentage'], 0)
+
+    def test_stats_indicateurs(self):
+        """Seule la cible globale est utilisée au niveau indicateur"""
+        from .aggregations import calculer_stats_indicateurs
+
+        stats = calculer_stats_indicateurs(self.r1)
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0]['realise'], 50)
+        self.assertEqual(stats[0]['cible'], 100)
+        self.assertEqual(stats[0]['pourcentage'], 50.0)
+
+    def test_nombre_de_requetes_constant(self):
+        """Le nombre de requêtes ne dépend pas du nombre de communes"""
+        from .aggregations import calculer_stats_communes
+
+        with self.assertNumQueries(2):
+            calculer_stats_communes(self.projet.id)
+
+
+class ProgressionIndicateurTest(TestCase):
+    """Tests pour la maintenance incrémentale de la table de progression"""
+
+    def setUp(self):
+        """Créer un indicateur, une commune et une intervention programmée"""
+        self.projet = Projet.objects.create(
+            libelle='Projet Test',
+            bailleurs='Bailleur Test',
+            date_debut=date.today(),
+            date_fin=date.today() + timedelta(days=365)
+        )
+        self.thematique = Thematique.objects.create(projet=self.projet, code='R1', libelle='R1')
+        self.indicateur = Indicateur.objects.create(
+            projet=self.projet, thematique=self.thematique, code='R1.1', libelle='Indicateur'
+        )
+        self.commune = Commune.objects.create(nom='Gathiary', code_commune='SN-KED-GAT')
+        self.type_intervention = TypeIntervention.objects.create(libelle='Formation', code='FORM')
+        self.intervention = Intervention.objects.create(
+            projet=self.projet,
+            indicateur=self.indicateur,
+            type_intervention=self.type_intervention,
+            commune=self.commune,
+            libelle='Formation',
+            valeur_quantitative=30,
+            date_intervention=date(2025, 5, 10),
+            statut='PROGRAMME',
+        )
+
+    def cellule(self, commune=None, annee=2025):
+        from .models import ProgressionIndicateur
+        return ProgressionIndicateur.objects.filter(
+            indicateur=self.indicateur, commune=commune, annee=annee
+        ).first()
+
+    def test_intervention_programmee_ignoree(self):
+        """Une intervention programmée ne contribue pas"""
+        self.assertIsNone(self.cellule(self.commune))
+
+    def test_changement_statut(self):
+        """Passer à TERMINE puis ANNULEE met à jour la cellule"""
+        self.intervention.statut = 'TERMINE'
+        self.intervention.save()
+        cellule = self.cellule(self.commune)
+        self.assertEqual(cellule.total_realise, 30)
+        self.assertEqual(cellule.nb_interventions, 1)
+
+        self.intervention.statut = 'ANNULEE'
+        self.intervention.save()
+        cellule.refresh_from_db()
+        self.assertEqual(cellule.total_realise, 0)
+        self.assertEqual(cellule.nb_interventions, 0)
+
+    def test_modification_et_suppression(self):
+        """Changer d'année déplace la contribution, la suppression la retire"""
+        self.intervention.statut = 'TERMINE'
+        self.intervention.save()
+        self.intervention.date_intervention = date(2026, 1, 15)
+        self.intervention.valeur_quantitative = 45
+        self.intervention.save()
+
+        self.assertEqual(self.cellule(self.commune, 2025).total_realise, 0)
+        self.assertEqual(self.cellule(self.commune, 2026).total_realise, 45)
+
+        self.intervention.delete()
+        self.assertEqual(self.cellule(self.commune, 2026).total_realise, 0)
+
+    def test_cibles(self):
+        """Les cibles globales et communales alimentent leur cellule"""
+        cible = CibleIndicateur.objects.create(indicateur=self.indicateur, valeur_cible=100, annee=2025)
+        CibleIndicateur.objects.create(
+            indicateur=self.indicateur, commune=self.commune, valeur_cible=40, annee=2025
+        )
+        self.assertEqual(self.cellule().total_cible, 100)
+        self.assertEqual(self.cellule(self.commune).total_cible, 40)
+
+        cible.valeur_cible = 120
+        cible.save()
+        self.assertEqual(self.cellule().total_cible, 120)
+
+    def test_reconstruction_et_verification(self):
+        """La reconstruction corrige toute dérive détectée par la vérification"""
+        from .models import ProgressionIndicateur
+        from .progression import reconstruire_progression, verifier_progression
+
+        self.intervention.statut = 'TERMINE'
+        self.intervention.save()
+        self.assertEqual(verifier_progression(self.projet.id), [])
+
+        ProgressionIndicateur.objects.update(total_realise=999)
+        self.assertEqual(len(verifier_progression(self.projet.id)), 1)
+
+        reconstruire_progression(self.projet.id)
+        self.assertEqual(verifier_progression(self.projet.id), [])
+        self.assertEqual(self.cellule(self.commune).total_realise, 30)
+
+    def test_reconstruction_invalide_le_cache(self):
+        """Chaque projet reconstruit voit sa version de cache incrémentée"""
+        from core.cache import version_projet
+        from .progression import reconstruire_progression
+
+        self.intervention.statut = 'TERMINE'
+        self.intervention.save()
+        version = version_projet(self.projet.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reconstruire_progression()
+
+        self.assertEqual(version_projet(self.projet.id), version + 1)
+
+
+class IndicateurValeursCourantesTest(TestCase):
+    """Tests pour Indicateur.objects.with_current_values"""
+
+    def setUp(self):
+        """Créer deux indicateurs, des valeurs et des cibles"""
+        self.projet = Projet.objects.create(
+            libelle='Projet Test',
+            bailleurs='Bailleur Test',
+            date_debut=date.today(),
+            date_fin=date.today() + timedelta(days=365)
+        )
+        self.thematique = Thematique.objects.create(projet=self.projet, code='R1', libelle='R1')
+        self.indicateur = Indicateur.objects.create(
+            projet=self.projet, thematique=self.thematique, code='R1.1', libelle='Avec valeurs'
+        )
+        self.vide = Indicateur.objects.create(
+            projet=self.projet, thematique=self.thematique, code='R1.2', libelle='Sans valeur'
+        )
+        ValeurIndicateur.objects.create(
+            indicateur=self.indicateur, valeur_realisee=10, date_mesure=date(2025, 3, 31), statut='PUBLIE'
+        )
+        ValeurIndicateur.objects.create(
+            indicateur=self.indicateur, valeur_realisee=25, date_mesure=date(2025, 6, 30), statut='BROUILLON'
+        )
+        CibleIndicateur.objects.create(indicateur=self.indicateur, valeur_cible=80, annee=2025)
+        CibleIndicateur.objects.create(indicateur=self.indicateur, valeur_cible=100, annee=2026)
+
+    def test_derniere_valeur_et_cible(self):
+        """La dernière valeur et la cible globale la plus récente sont annotées"""
+        with self.assertNumQueries(1):
+            indicateurs = {i.code: i for i in Indicateur.objects.with_current_values(self.projet)}
+
+        self.assertEqual(indicateurs['R1.1'].valeur_courante, 25)
+        self.assertEqual(indicateurs['R1.1'].date_valeur_courante, date(2025, 6, 30))
+        self.assertEqual(indicateurs['R1.1'].cible_courante, 100)
+        self.assertIsNone(indicateurs['R1.2'].valeur_courante)
+
+    def test_filtre_statut(self):
+        """Le filtre de statut ne retient que les valeurs publiées"""
+        indicateur = Indicateur.objects.with_current_values(statut='PUBLIE').get(pk=self.indicateur.pk)
+        self.assertEqual(indicateur.valeur_courante, 10)
+
+
+class CalculIndicateursTest(TestCase):
+    """Tests pour le calcul automatique selon type_calcul"""
+
+    def setUp(self):
+        """Créer un indicateur par type de calcul et des interventions terminées"""
+        self.projet = Projet.objects.create(
+            libelle='Projet Test',
+            bailleurs='Bailleur Test',
+            date_debut=date.today(),
+            date_fin=date.today() + timedelta(days=365)
+        )
+        thematique = Thematique.objects.create(projet=self.projet, code='R1', libelle='R1')
+        self.indicateurs = {
+            type_calcul: Indicateur.objects.create(
+                projet=self.projet, thematique=thematique, code=f'R1.{i}',
+                libelle=type_calcul, type_calcul=type_calcul
+            )
+            for i, type_calcul in enumerate(['SOMME', 'MOYENNE', 'DENOMBREMENT', 'MANUEL'], start=1)
+        }
+        self.commune_a = Commune.objects.create(nom='Gathiary', code_commune='SN-KED-GAT')
+        self.commune_b = Commune.objects.create(nom='Bakel', code_commune='SN-TAM-BAK')
+        type_intervention = TypeIntervention.objects.create(libelle='Formation', code='FORM')
+
+        for indicateur in self.indicateurs.values():
+            for commune, valeur, statut in [
+                (self.commune_a, 10, 'TERMINE'),
+                (self.commune_a, 21, 'TERMINE'),
+                (self.commune_b, 40, 'TERMINE'),
+                (self.commune_b, 500, 'PROGRAMME'),
+            ]:
+                Intervention.objects.create(
+                    projet=self.projet, indicateur=indicateur, type_intervention=type_intervention,
+                    commune=commune, libelle='Formation', valeur_quantitative=valeur,
+                    date_intervention=date(2025, 5, 10), statut=statut,
+                )
+
+    def valeur(self, type_calcul, commune=None):
+        return ValeurIndicateur.objects.get(
+            indicateur=self.indicateurs[type_calcul], commune=commune, source='CALCUL_AUTO'
+        ).valeur_realisee
+
+    def test_valeurs_par_type_calcul(self):
+        """Chaque type de calcul produit sa valeur globale et par commune"""
+        from .calculs import enregistrer_calculs
+
+        enregistrer_calculs(self.projet.id, date(2025, 6, 30))
+
+        self.assertEqual(self.valeur('SOMME'), 71)
+        self.assertEqual(self.valeur('SOMME', self.commune_a), 31)
+        self.assertEqual(self.valeur('MOYENNE'), 24)
+        self.assertEqual(self.valeur('MOYENNE', self.commune_a), 16)
+        self.assertEqual(self.valeur('DENOMBREMENT'), 3)
+        self.assertEqual(self.valeur('DENOMBREMENT', self.commune_b), 1)
+        self.assertFalse(
+            ValeurIndicateur.objects.filter(indicateur=self.indicateurs['MANUEL']).exists()
+        )
+
+    def test_calcul_retroactif(self):
+        """Un calcul à une date passée ignore les interventions postérieures"""
+        from .calculs import calculer_indicateurs, enregistrer_calculs
+
+        valeurs = calculer_indicateurs(self.projet.id, date(2025, 5, 9))
+        self.assertTrue(valeurs)
+        self.assertEqual({v.valeur_realisee for v in valeurs}, {0})
+        self.assertEqual({v.commune_id for v in valeurs}, {None})
+
+        Intervention.objects.filter(valeur_quantitative=10).update(date_intervention=date(2025, 4, 1))
+        enregistrer_calculs(self.projet.id, date(2025, 5, 9))
+        self.assertEqual(self.valeur('SOMME'), 10)
+        self.assertEqual(self.valeur('DENOMBREMENT', self.commune_a), 1)
+
+    def test_recalcul_idempotent(self):
+        """Relancer le calcul à la même date remplace les valeurs automatiques"""
+        from .calculs import enregistrer_calculs
+
+        premier = enregistrer_calculs(self.projet.id, date(2025, 6, 30))
+        ValeurIndicateur.objects.create(
+            indicateur=self.indicateurs['SOMME'], valeur_realisee=5, date_mesure=date(2025, 6, 30)
+        )
+        second = enregistrer_calculs(self.projet.id, date(2025, 6, 30))
+
+        self.assertEqual(premier, second)
+        self.assertEqual(
+            ValeurIndicateur.objects.filter(source='CALCUL_AUTO').count(), second
+        )
+        self.assertTrue(ValeurIndicateur.objects.filter(source='SAISIE_MANUELLE').exists())
+
+    def test_recalcul_invalide_une_fois(self):
+        """Le remplacement des valeurs n'invalide le cache du projet qu'une fois"""
+        from core.cache import version_projet
+        from .calculs import enregistrer_calculs
+
+        enregistrer_calculs(self.projet.id, date(2025, 6, 30))
+        version = version_projet(self.projet.id)
+
+        with self.captureOnCommitCallbacks(execute=True) as rappels:
+            enregistrer_calculs(self.projet.id, date(2025, 6, 30))
+
+        self.assertEqual(len(rappels), 1)
+        self.assertEqual(version_projet(self.projet.id), version + 1)
+
+
+class SyntheseTrimestrielleTest(TestCase):
+    """Tests pour la maintenance de la synthèse trimestrielle"""
+
+    def setUp(self):
+        """Créer un indicateur et deux valeurs du même trimestre"""
+        self.projet = Projet.objects.create(
+            libelle='Projet Test',
+            bailleurs='Bailleur Test',
+            date_debut=date.today(),
+            date_fin=date.today() + timedelta(days=365)
+        )
+        thematique = Thematique.objects.create(projet=self.projet, code='R1', libelle='R1')
+        self.indicateur = Indicateur.objects.create(
+            projet=self.projet, thematique=thematique, code='R1.1', libelle='Indicateur'
+        )
+        self.premiere = ValeurIndicateur.objects.create(
+            indicateur=self.indicateur, valeur_realisee=40, date_mesure=date(2025, 4, 15), statut='VALIDE'
+        )
+        self.seconde = ValeurIndicateur.objects.create(
+            indicateur=self.indicateur, valeur_realisee=25, date_mesure=date(2025, 6, 30), statut='VALIDE'
+        )
+
+    def cellule(self, trimestre=2, statut='VALIDE'):
+        from .models import SyntheseTrimestrielle
+        return SyntheseTrimestrielle.objects.filter(
+            indicateur=self.indicateur, commune=None, annee=2025, trimestre=trimestre, statut=statut
+        ).first()
+
+    def test_agregats(self):
+        """Somme, min, max et dernière valeur du trimestre"""
+        cellule = self.cellule()
+        self.assertEqual(cellule.nb_valeurs, 2)
+        self.assertEqual(cellule.somme, 65)
+        self.assertEqual(cellule.minimum, 25)
+        self.assertEqual(cellule.maximum, 40)
+        self.assertEqual(cellule.derniere_valeur, 25)
+
+    def test_modification_et_suppression(self):
+        """Changer de statut ou de trimestre déplace la valeur, la suppression la retire"""
+        self.seconde.statut = 'PUBLIE'
+        self.seconde.save()
+        self.assertEqual(self.cellule().derniere_valeur, 40)
+        self.assertEqual(self.cellule(statut='PUBLIE').somme, 25)
+
+        self.premiere.date_mesure = date(2025, 8, 1)
+        self.premiere.save()
+        self.assertIsNone(self.cellule())
+        self.assertEqual(self.cellule(trimestre=3).somme, 40)
+
+        self.premiere.delete()
+        self.assertIsNone(self.cellule(trimestre=3))
+
+    def test_reconstruction(self):
+        """La reconstruction produit les mêmes cellules que la maintenance"""
+        from .models import SyntheseTrimestrielle
+        from .syntheses import reconstruire_synthese
+
+        SyntheseTrimestrielle.objects.update(somme=0)
+        reconstruire_synthese(self.projet.id)
+        self.assertEqual(self.cellule().somme, 65)
+        self.assertEqual(self.cellule().derniere_valeur, 25)
+
+    def test_evolution_chart_js(self):
+        """La série combine les statuts d'un même trimestre"""
+        from .syntheses import evolution_indicateur
+
+        ValeurIndicateur.objects.create(
+            indicateur=self.indicateur, valeur_realisee=10, date_mesure=date(2025, 2, 1), statut='PUBLIE'
+        )
+        evolution = evolution_indicateur(self.indicateur)
+        self.assertEqual(evolution['labels'], ['2025 T1', '2025 T2'])
+        self.assertEqual(evolution['datasets'][0]['data'], [10, 65])
+
+        evolution = evolution_indicateur(self.indicateur, statuts=['PUBLIE'])
+        self.assertEqual(evolution['labels'], ['2025 T1'])